@@ -6,6 +6,7 @@ import bottlechest as bn
 
 from Orange.data import Table, Storage, Instance, Value
 from Orange.preprocess import Continuize, RemoveNaNColumns, SklImpute
+from Orange.preprocess.cache import active_cache
 from Orange.misc.wrapper_meta import WrapperMeta
 
 __all__ = ["Learner", "Model", "SklLearner", "SklModel"]
@@ -61,10 +62,13 @@ class Learner:
 
     def preprocess(self, data):
         """
-        Apply the `preprocessors` to the data.
+        Apply the `preprocessors` to the data. If a
+        :obj:`~Orange.preprocess.cache.PreprocessCache` is active, the
+        preprocessed data is taken from it when possible.
         """
+        cache = active_cache()
         for pp in self.preprocessors:
-            data = pp(data)
+            data = pp(data) if cache is None else cache.preprocess(pp, data)
         return data
 
     def __repr__(self):
@@ -80,6 +84,10 @@ class Model:
     Value = 0
     Probs = 1
     ValueProbs = 2
+    #: Tables and lists with more rows are converted to the domain of the
+    #: model and predicted in blocks of this many rows (see
+    #: :obj:`predict_batches`); None predicts all rows at once
+    batch_size = 100000
 
     def __init__(self, domain=None):
         if isinstance(self, Learner):
@@ -112,6 +120,15 @@ class Model:
             and any(v.is_continuous for v in self.domain.class_vars)):
             raise ValueError("cannot predict continuous distributions")
 
+        # Predict large tables and lists in blocks
+        if self.batch_size is not None and active_cache() is None and (
+                isinstance(data, Table) and
+                data.approx_len() > self.batch_size or
+                isinstance(data, (list, tuple)) and
+                len(data) > self.batch_size and
+                isinstance(data[0], (list, tuple))):
+            return self.predict_batches(data, self.batch_size, ret)
+
         # Call the predictor
         if isinstance(data, np.ndarray):
             prediction = self.predict(np.atleast_2d(data))
@@ -124,7 +141,11 @@ class Model:
             prediction = self.predict_storage(data)
         elif isinstance(data, Table):
             if data.domain != self.domain:
-                data = data.from_table(self.domain, data)
+                cache = active_cache()
+                if cache is None:
+                    data = data.from_table(self.domain, data)
+                else:
+                    data = cache.convert(self.domain, data)
             prediction = self.predict_storage(data)
         elif isinstance(data, (list, tuple)):
             if not isinstance(data[0], (list, tuple)):
@@ -177,6 +198,88 @@ class Model:
         else:  # ret == Model.ValueProbs
             return value, probs
 
+    def predict_batches(self, source, batch_size=None, ret=Value):
+        """
+        Predict the rows of `source` in blocks of at most `batch_size` rows
+        (:obj:`batch_size` by default) and return the values and/or
+        probabilities, as selected by `ret` (see :obj:`__call__`).
+
+        Each block is converted to the domain of the model and predicted on
+        its own, and the predictions are written into arrays that are
+        allocated once, so the converted data is never stored as a whole.
+        The source can be a table, including the tables that are not held
+        in memory (:obj:`~Orange.data.sql.table.SqlTable` and
+        :obj:`~Orange.data.lazytable.LazyTable`), which are read with their
+        `iter_chunks`, an iterable of tables (e.g. the chunks from
+        :obj:`Orange.data.io.TabDelimFormat.iter_chunks`) or a list of rows
+        in the original domain.
+        """
+        if not 0 <= ret <= 2:
+            raise ValueError("invalid value of argument 'ret'")
+        batch_size = batch_size or self.batch_size or Model.batch_size
+        if isinstance(source, Table):
+            n_rows = source.approx_len()
+        elif isinstance(source, (list, tuple)):
+            n_rows = len(source)
+        else:
+            n_rows = 0
+
+        outputs = None
+        start = 0
+        for block in self._iter_blocks(source, batch_size):
+            predictions = self(block, ret)
+            if ret != Model.ValueProbs:
+                predictions = (predictions, )
+            stop = start + len(predictions[0])
+            if outputs is None:
+                outputs = [np.empty((max(n_rows, stop), ) + pred.shape[1:],
+                                    dtype=pred.dtype)
+                           for pred in predictions]
+            elif stop > len(outputs[0]):
+                # the source has more rows than estimated
+                size = max(stop, 2 * len(outputs[0]))
+                outputs = [np.concatenate(
+                    (out, np.empty((size - len(out), ) + out.shape[1:],
+                                   dtype=out.dtype)))
+                           for out in outputs]
+            for out, pred in zip(outputs, predictions):
+                out[start:stop] = pred
+            start = stop
+
+        if outputs is None:
+            outputs = self._empty_predictions(ret)
+        outputs = tuple(out[:start] for out in outputs)
+        return outputs if ret == Model.ValueProbs else outputs[0]
+
+    def _iter_blocks(self, source, batch_size):
+        if isinstance(source, Table):
+            yield from source.iter_chunks(batch_size)
+        elif isinstance(source, (list, tuple)):
+            for start in range(0, len(source), batch_size):
+                yield Table(self.original_domain,
+                            source[start:start + batch_size])
+        else:
+            for chunk in source:
+                if len(chunk) > batch_size:
+                    yield from chunk.iter_chunks(batch_size)
+                else:
+                    yield chunk
+
+    def _empty_predictions(self, ret):
+        class_vars = self.domain.class_vars
+        if len(class_vars) > 1:
+            max_card = max(len(getattr(cvar, "values", ())) or 1
+                           for cvar in class_vars)
+            shapes = [(0, len(class_vars)), (0, len(class_vars), max_card)]
+        else:
+            n_values = len(getattr(self.domain.class_var, "values", ()))
+            shapes = [(0, ), (0, n_values)]
+        if ret == Model.Value:
+            shapes = shapes[:1]
+        elif ret == Model.Probs:
+            shapes = shapes[1:]
+        return [np.empty(shape) for shape in shapes]
+
     def __repr__(self):
         return self.name
 
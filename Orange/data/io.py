@@ -5,7 +5,10 @@ import pickle
 from itertools import chain
 
 import os
-from collections import namedtuple
+import shutil
+import tempfile
+import threading
+from collections import namedtuple, OrderedDict
 
 import bottlechest as bn
 import numpy as np
@@ -61,6 +64,53 @@ class FileReader:
         return values, decimals
 
 
+def decode_column(strings, reader):
+    """
+    Returns the values of a column given as a numpy array of stripped str
+    or bytes strings. The reader is the val_from_str_add of the variable of
+    the column, or None for a column of floats, e.g. weights.
+
+    Continuous values are converted at once. Discrete and string values are
+    converted by calling the reader only once for every distinct value, in
+    the order of their first appearance, so new values are added to
+    discrete variables in the same order as when reading line by line.
+    """
+    var = getattr(reader, '__self__', None)
+    if var is None or isinstance(var, ContinuousVariable):
+        return _decode_continuous(strings, var)
+    uniques, first, inverse = np.unique(
+        strings, return_index=True, return_inverse=True)
+    if uniques.dtype.kind == 'S':
+        uniques = np.char.decode(uniques)
+    order = np.argsort(first)
+    dtype = float if var.is_primitive() else object
+    values = np.empty(len(uniques), dtype=dtype)
+    values[order] = [reader(value) for value in uniques[order].tolist()]
+    return values[inverse.ravel()]
+
+
+def _decode_continuous(strings, var):
+    encode = (lambda s: s.encode()) if strings.dtype.kind == 'S' else str
+    unknown_str = var.unknown_str if var is not None \
+        else Variable._DefaultUnknownStr
+    unknown = np.in1d(strings, [encode(s) for s in unknown_str
+                                if s is not None])
+    values = np.full(len(strings), np.nan)
+    values[~unknown] = strings[~unknown].astype(float)
+    if var is not None and var.adjust_decimals and len(strings):
+        # Let the variable see the value with the most decimals, so it
+        # adjusts its number of decimals like val_from_str_add() does.
+        position_dot = np.char.find(strings, encode("."))
+        decimals = np.where(position_dot >= 0,
+                            np.char.str_len(strings) - position_dot - 1,
+                            0)
+        most_decimals = strings[np.argmax(decimals)]
+        if isinstance(most_decimals, bytes):
+            most_decimals = most_decimals.decode()
+        var.val_from_str_add(str(most_decimals))
+    return values
+
+
 @FileFormats.register("Tab-delimited file", ".tab")
 class TabDelimFormat:
     non_escaped_spaces = re.compile(r"(?<!\\) +")
@@ -224,6 +274,127 @@ class TabDelimFormat:
         with open(filename) as file:
             return self._read_file(file, cls)
 
+    def iter_chunks(self, filename, rows_per_chunk=10000, prescan=True,
+                    cls=None):
+        """
+        Read the file in chunks and yield every chunk of rows_per_chunk
+        rows, the last one possibly shorter, as a table with the same
+        domain.
+
+        With prescan, the values of discrete variables whose values are not
+        given in the header are collected first, so the domain is the same
+        as that of read_file() and does not change while reading. Files
+        without such variables are not prescanned. Without prescan, the
+        file is read in a single pass and those variables get their values
+        chunk by chunk, as they are encountered; earlier chunks stay valid
+        because values are only added. The domain then differs from that
+        of read_file(): the values stay in the order of appearance instead
+        of being sorted as in reorder_values(), which needs all values
+        before the first row is decoded.
+
+        The columns of each chunk are parsed as a whole, see
+        decode_column(). Basket columns are not supported.
+        """
+        with open(filename) as file:
+            yield from self._iter_chunks(file, rows_per_chunk, prescan, cls)
+
+    def _iter_chunks(self, f, rows_per_chunk=10000, prescan=True, cls=None):
+        from ..data import Table
+
+        if cls is None:
+            cls = Table
+        domain = self.read_header(f)
+        if prescan:
+            domain = self._prescan_values(f, domain)
+        f.seek(0)
+        f.readline()
+        f.readline()
+        f.readline()
+        lines = []
+        for line_number, lne in enumerate(f, start=4):
+            if not lne.strip():
+                continue
+            values = lne.rstrip("\n\r").split("\t")
+            if len(values) > self.n_columns:
+                raise ValueError("Too many columns in line {}".
+                                 format(line_number))
+            values += [""] * (self.n_columns - len(values))
+            lines.append(values)
+            if len(lines) == rows_per_chunk:
+                yield self._table_from_lines(cls, domain, lines)
+                lines = []
+        if lines:
+            yield self._table_from_lines(cls, domain, lines)
+
+    def _prescan_values(self, f, domain):
+        """
+        Collect the values of the discrete variables that get their values
+        from the data and return the domain with these variables replaced
+        like reorder_values() does. The readers in attribute_columns etc.
+        are updated accordingly.
+        """
+        columns = [
+            (col, reader.__self__) for (col, reader) in
+            self.attribute_columns + self.classvar_columns + self.meta_columns
+            if getattr(reader.__self__, "fix_order", False)
+        ]
+        if not columns:
+            return domain
+        f.seek(0)
+        f.readline()
+        f.readline()
+        f.readline()
+        # Dictionaries keep the values in the order of appearance.
+        values = [{} for _ in columns]
+        for lne in f:
+            if not lne.strip():
+                continue
+            lne = lne.rstrip("\n\r").split("\t")
+            for (col, _), vs in zip(columns, values):
+                if col < len(lne):
+                    vs[lne[col].strip()] = None
+        new_vars = {}
+        for (_, var), vs in zip(columns, values):
+            for value in vs:
+                var.val_from_str_add(value)
+            new_var = var.make(var.name, var.values, var.ordered)
+            new_var.attributes = var.attributes
+            new_vars[var] = new_var
+
+        def replace(column_readers):
+            return [(col, new_vars[reader.__self__].val_from_str_add)
+                    if reader.__self__ in new_vars else (col, reader)
+                    for (col, reader) in column_readers]
+
+        self.attribute_columns = replace(self.attribute_columns)
+        self.classvar_columns = replace(self.classvar_columns)
+        self.meta_columns = replace(self.meta_columns)
+        return Domain(
+            [new_vars.get(var, var) for var in domain.attributes],
+            [new_vars.get(var, var) for var in domain.class_vars],
+            [new_vars.get(var, var) for var in domain.metas])
+
+    def _table_from_lines(self, cls, domain, lines):
+        """
+        Returns a table with the values in lines, which are lists of
+        n_columns strings.
+        """
+        cells = np.char.strip(np.array(lines))
+
+        def decode(column_readers, dtype):
+            values = np.empty((len(lines), len(column_readers)), dtype=dtype)
+            for i, (col, reader) in enumerate(column_readers):
+                values[:, i] = decode_column(cells[:, col], reader)
+            return values
+
+        X = decode(self.attribute_columns, float)
+        Y = decode(self.classvar_columns, float)
+        metas = decode(self.meta_columns, object)
+        W = None
+        if self.weight_column >= 0:
+            W = cells[:, self.weight_column].astype(float)
+        return cls.from_numpy(domain, X, Y, metas, W)
+
     def _read_file(self, file, cls=None):
         from ..data import Table
 
@@ -685,6 +856,130 @@ class PickleFormat:
         self.write_file(filename, table)
 
 
+@FileFormats.register("Columnar binary table", ".npytable")
+class NumpyDirectoryFormat:
+    """
+    NumpyDirectoryFormat stores a table as a directory with a .npy file for
+    each of X, Y and W, which are memory-mapped when the table is read, a
+    .npy file with the (object) metas and a pickle with the domain.
+
+    The memory maps are opened with mmap_mode, copy-on-write by default:
+    pages are only read when they are used and processes that read the same
+    table share them, while the table can still be changed in memory
+    without changing the files. Set it to 'r' for read-only arrays or to
+    None to read the arrays into memory.
+
+    Table.from_file() uses this format as a cache, see write_cache() and
+    read_cache().
+    """
+    mmap_mode = 'c'
+
+    # Files in the directory.
+    header_file = "header.pickle"
+    array_files = ("X", "Y", "W", "metas")
+
+    @classmethod
+    def read_file(cls, filename, storage_class=None):
+        from ..data import Table
+
+        if storage_class is None:
+            storage_class = Table
+        with open(os.path.join(filename, cls.header_file), "rb") as f:
+            header = pickle.load(f)
+        arrays = {
+            name: np.load(os.path.join(filename, name + ".npy"),
+                          mmap_mode=None if name == "metas" else cls.mmap_mode,
+                          allow_pickle=name == "metas")
+            for name in cls.array_files
+        }
+        table = storage_class()
+        table.domain = header["domain"]
+        table.X = arrays["X"]
+        table.Y = arrays["Y"]
+        table.W = arrays["W"]
+        table.metas = arrays["metas"]
+        table.attributes = header.get("attributes", {})
+        storage_class._init_ids(table)
+        return table
+
+    @classmethod
+    def write_file(cls, filename, table, **header):
+        """
+        Write the table to the directory filename. Items of header are
+        stored with the domain, e.g. by write_cache(). The directory is
+        written next to filename first and then renamed, so readers never
+        see a partially written table.
+        """
+        if sparse.issparse(table.X) or sparse.issparse(table._Y) or \
+                sparse.issparse(table.metas):
+            raise ValueError("Sparse tables cannot be stored as {}".format(
+                FileFormats.names.get(".npytable", "npytable")))
+        directory, name = os.path.split(os.path.abspath(filename))
+        directory_tmp = tempfile.mkdtemp(prefix=name + ".tmp", dir=directory)
+        try:
+            header["domain"] = table.domain
+            header["attributes"] = getattr(table, "attributes", {})
+            with open(os.path.join(directory_tmp, cls.header_file), "wb") as f:
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+            arrays = {"X": table.X, "Y": table._Y, "W": table.W,
+                      "metas": table.metas}
+            for name in cls.array_files:
+                np.save(os.path.join(directory_tmp, name + ".npy"),
+                        np.asarray(arrays[name]),
+                        allow_pickle=name == "metas")
+            if os.path.exists(filename):
+                shutil.rmtree(filename)
+            os.rename(directory_tmp, filename)
+        finally:
+            if os.path.exists(directory_tmp):
+                shutil.rmtree(directory_tmp)
+
+    def write(self, filename, table):
+        self.write_file(filename, table)
+
+    @staticmethod
+    def cache_filename(filename):
+        """
+        Returns the name of the cache of the given file: a hidden
+        directory next to it.
+        """
+        directory, name = os.path.split(os.path.abspath(filename))
+        return os.path.join(directory, ".{}.npytable".format(name))
+
+    @classmethod
+    def read_cache(cls, filename, storage_class=None):
+        """
+        Returns the table cached for the file, or None if there is no cache
+        or the file has changed since the cache was written.
+        """
+        cache = cls.cache_filename(filename)
+        try:
+            with open(os.path.join(cache, cls.header_file), "rb") as f:
+                header = pickle.load(f)
+            stat = os.stat(filename)
+            if (header.get("source_mtime"), header.get("source_size")) != \
+                    (stat.st_mtime_ns, stat.st_size):
+                return None
+            return cls.read_file(cache, storage_class)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+
+    @classmethod
+    def write_cache(cls, filename, table):
+        """
+        Write the table as the cache of the file. Returns whether the cache
+        could be written, e.g. the directory might be read-only.
+        """
+        stat = os.stat(filename)
+        try:
+            cls.write_file(cls.cache_filename(filename), table,
+                           source_mtime=stat.st_mtime_ns,
+                           source_size=stat.st_size)
+        except (OSError, ValueError, pickle.PicklingError):
+            return False
+        return True
+
+
 @FileFormats.register("Dot Tree File", ".dot")
 class DotFormat:
     @classmethod
@@ -699,6 +994,17 @@ class DotFormat:
         self.write_graph(filename, tree)
 
 
+# The parsed header of a fixed width file. The lines of the file are
+# len_line bytes long, including the newline, and start after the offset
+# bytes of the header. See FixedWidthFormat.describe().
+FixedWidthDescriptor = namedtuple(
+    'FixedWidthDescriptor',
+    ['filename', 'mtime', 'size', 'info_columns', 'columns', 'domain',
+     'readers', 'attribute_columns', 'classvar_columns', 'meta_columns',
+     'weight_column', 'basket_column', 'offset', 'len_line', 'n_rows'],
+)
+
+
 @FileFormats.register("Fixed width textfile", ".fixed")
 class FixedWidthFormat(TabDelimFormat):
     """
@@ -711,12 +1017,21 @@ class FixedWidthFormat(TabDelimFormat):
     This allows the FixedWidthFormat to be used with the LazyFile
     widget to 'read' extremely large files.
     
+    FixedWidthMemmapReader gives random access to ranges of rows through
+    a memory map of the file, see read_rows().
+
     TODO:
-    - Add read_row() without reading entire file.
-    - Allow spaces in column names and cell values.
+    - Allow spaces in column names.
     - Ensure compatibility with all tables in the tests directory.
     - Do metas and class properly.
     """
+    # The descriptors of the files read by describe(), by absolute path.
+    # At most max_descriptors are kept; the least recently used ones are
+    # removed first.
+    descriptors = OrderedDict()
+    max_descriptors = 32
+    _descriptors_lock = threading.Lock()
+
     def read_ends_columns(self, filename):
         """
         Returns the location where each column ends in a line in the
@@ -843,112 +1158,139 @@ class FixedWidthFormat(TabDelimFormat):
                     self.attribute_columns.append((col, var.val_from_str_add))
             domain = Domain(attributes, class_vars, metas)
             return domain
+    def read_descriptor(self, filename):
+        """
+        Parses the header of the file and returns a FixedWidthDescriptor
+        with the domain, the column offsets, the length of the lines and
+        the number of rows. Like read_header(), this sets the
+        attribute_columns etc. of self.
+        """
+        stat = os.stat(filename)
+        info_columns = self.read_ends_columns(filename)
+        domain = self.read_header(filename)
+        with open(filename, 'rb') as f:
+            offset = sum(len(f.readline()) for _ in range(3))
+        len_line = sum(ic.width for ic in info_columns) + 1 # for \n
+        self.descriptor = FixedWidthDescriptor(
+            filename=filename,
+            mtime=stat.st_mtime_ns,
+            size=stat.st_size,
+            info_columns=info_columns,
+            columns={ic.name: ic for ic in info_columns},
+            domain=domain,
+            readers=dict(self.attribute_columns + self.classvar_columns +
+                         self.meta_columns),
+            attribute_columns=self.attribute_columns,
+            classvar_columns=self.classvar_columns,
+            meta_columns=self.meta_columns,
+            weight_column=self.weight_column,
+            basket_column=self.basket_column,
+            offset=offset,
+            len_line=len_line,
+            n_rows=max(0, (stat.st_size - offset) // len_line),
+        )
+        return self.descriptor
+
+    def describe(self, filename):
+        """
+        Returns the FixedWidthDescriptor of the file, see read_descriptor().
+
+        The descriptor is parsed once and shared until the modification
+        time or the size of the file changes, so its domain, with the same
+        variables, is shared as well. The attribute_columns etc. of self
+        are set from the descriptor.
+        """
+        stat = os.stat(filename)
+        key = os.path.abspath(filename)
+        with self._descriptors_lock:
+            descriptor = self.descriptors.get(key)
+            if descriptor is not None:
+                self.descriptors.move_to_end(key)
+        if descriptor is None or \
+                (descriptor.mtime, descriptor.size) != (stat.st_mtime_ns, stat.st_size):
+            descriptor = self.read_descriptor(filename)
+            with self._descriptors_lock:
+                self.descriptors[key] = descriptor
+                self.descriptors.move_to_end(key)
+                while len(self.descriptors) > self.max_descriptors:
+                    self.descriptors.popitem(last=False)
+        self.descriptor = descriptor
+        self.n_columns = len(descriptor.info_columns)
+        self.attribute_columns = descriptor.attribute_columns
+        self.classvar_columns = descriptor.classvar_columns
+        self.meta_columns = descriptor.meta_columns
+        self.weight_column = descriptor.weight_column
+        self.basket_column = descriptor.basket_column
+        return descriptor
+
     def count_lines(self, filename):
         """
         Counts the number of lines in the file. This can be done
         without reading the entire file because the file
         has fixed width columns.
         """
-        len_file = os.stat(filename).st_size
-        with open(filename) as f:
-            f.seek(0)
-            line = f.readline()
-            len_line = len(line)
-        
-        count = int(len_file / len_line) - 3
-        return count
+        return self.describe(filename).n_rows
+
     def read_cell(self, filename, index_row, name_attribute):
         """
         Reads one specific cell value without reading the entire file.
+        The header is taken from the cached descriptor of the file.
         
         TODO:
-        - Cleanup this function.
         - Test with discrete and class attributes.
-        - Cache the header information.
         """
-        info_columns = self.read_ends_columns(filename)
-        header = self.read_header(filename)
-        with open(filename) as f:
-            f.seek(0)
-            line = f.readline()
-            len_line1 = len(line)
-        len_line = sum(ic.width for ic in info_columns) + 1 # for \n
-        col = [ic for ic in info_columns if ic.name == name_attribute][0]
+        descriptor = self.describe(filename)
+        col = descriptor.columns[name_attribute]
         with open(filename) as f:
-            f.seek( (3+index_row) * len_line + col.start )
+            f.seek(descriptor.offset + index_row * descriptor.len_line + col.start)
             value = f.read(col.width)
-            value_n = None
-            # Parse the string in the correct format. This is a kludge
-            # based on code from read_data().
-            if self.attribute_columns:
-                for i, (coli, reader) in enumerate(self.attribute_columns):
-                    if coli == col.index:
-                        value_n = reader(value.strip())
-            for i, (coli, reader) in enumerate(self.classvar_columns):
-                if coli == col.index:
-                    value_n = reader(value.strip())
-            return value_n
-        
+        # Metas are not parsed.
+        reader = dict(descriptor.attribute_columns +
+                      descriptor.classvar_columns).get(col.index)
+        value_n = reader(value.strip()) if reader is not None else None
+        return value_n
+
+
+    def read_rows(self, filename, row_indices, names_attributes):
+        """
+        Reads the given rows without reading the entire file.
+
+        The header is parsed only once for all requested rows, instead of
+        once per cell as with read_cell(). Returns an array with one row for
+        every index in row_indices and one column for every name in
+        names_attributes.
+        """
+        reader = FixedWidthMemmapReader(filename)
+        return reader.read_rows(row_indices, names_attributes)
+
     def read_data(self, filename, table):
         """
         Read the data portion of the file.
-        
-        This function is based on the one in TabDelimFormat.
-        TODO:
-        - Use the actual known width of the columns instead
-          of splitting on space, because that will allow spaces
-          to be part of the cell values.
-          That is, use read_ends_columns.
-        """        
-        with open(filename) as f:
-            #X, Y = table.X, table.Y
-            X, Y = table.X, table._Y
-            W = table.W if table.W.shape[-1] else None
-            f.seek(0)
-            f.readline()
-            f.readline()
-            f.readline()
-            padding = [""] * self.n_columns
-            if self.basket_column >= 0:
-                # TODO how many columns?!
-                table._Xsparse = sparse.lil_matrix(len(X), 100)
-            table.metas = metas = (
-                np.empty((len(X), len(self.meta_columns)), dtype=object))
-            line_count = 0
-            Xr = None
-            for lne in f:
-                values = lne.strip()
-                if not values:
-                    continue
-                # Only difference with TabDelimReader
-                #values = values.split("\t")
-                values = values.split()
-                if len(values) > self.n_columns:
-                    raise ValueError("Too many columns in line {}".
-                                     format(4 + line_count))
-                elif len(values) < self.n_columns:
-                    values += padding
-                if self.attribute_columns:
-                    Xr = X[line_count]
-                    for i, (col, reader) in enumerate(self.attribute_columns):
-                        Xr[i] = reader(values[col].strip())
-                for i, (col, reader) in enumerate(self.classvar_columns):
-                    Y[line_count, i] = reader(values[col].strip())
-                if W is not None:
-                    W[line_count] = float(values[self.weight_column])
-                for i, (col, reader) in enumerate(self.meta_columns):
-                    metas[line_count, i] = reader(values[col].strip())
-                line_count += 1
-            if line_count != len(X):
-                del Xr, X, Y, W, metas
-                table.X.resize(line_count, len(table.domain.attributes))
-                table.Y.resize(line_count, len(table.domain.class_vars))
-                if table.W.ndim == 1:
-                    table.W.resize(line_count)
-                else:
-                    table.W.resize((line_count, 0))
-                table.metas.resize((line_count, len(self.meta_columns)))
-            table.n_rows = line_count
+
+        The file is memory-mapped and every column is decoded as a whole by
+        a FixedWidthMemmapReader, instead of splitting each line on
+        whitespace. This uses the known width of the columns, so cell values
+        can contain spaces.
+        """
+        reader = FixedWidthMemmapReader(filename, self.descriptor)
+        names = [ic.name for ic in reader.info_columns]
+        X, Y = table.X, table._Y
+        W = table.W if table.W.shape[-1] else None
+        if self.basket_column >= 0:
+            # TODO how many columns?!
+            table._Xsparse = sparse.lil_matrix(len(X), 100)
+        table.metas = metas = (
+            np.empty((len(X), len(self.meta_columns)), dtype=object))
+        for i, (col, _) in enumerate(self.attribute_columns):
+            X[:, i] = reader.read_column(names[col])
+        for i, (col, _) in enumerate(self.classvar_columns):
+            Y[:, i] = reader.read_column(names[col])
+        if W is not None:
+            W[:] = reader.read_column(names[self.weight_column])
+        for i, (col, _) in enumerate(self.meta_columns):
+            metas[:, i] = reader.read_column(names[col])
+        table.n_rows = len(reader)
+
     def read_file(self, filename, cls=None):
         """
         Read a file.
@@ -959,9 +1301,96 @@ class FixedWidthFormat(TabDelimFormat):
         from ..data import Table
         if cls is None:
             cls = Table
-        domain = self.read_header(filename)
-        nExamples = self.count_lines(filename)
+        descriptor = self.read_descriptor(filename)
+        domain = descriptor.domain
+        nExamples = descriptor.n_rows
         table = cls.from_domain(domain, nExamples, self.weight_column >= 0)
         self.read_data(filename, table)
         self.reorder_values(table)
         return table
+
+
+class FixedWidthMemmapReader:
+    """
+    FixedWidthMemmapReader gives random access to the rows of a fixed width
+    file without reading the file into memory.
+
+    The header is taken from the FixedWidthDescriptor of the file, which is
+    cached by FixedWidthFormat.describe() unless a descriptor is given. The
+    data part of the file is memory-mapped as a two dimensional array of
+    bytes, one row per line, so any range or selection of rows can be
+    accessed directly. Columns are decoded as a whole: continuous values
+    with a vectorized conversion from bytes to float and discrete and
+    string values by converting only the distinct values.
+
+    The reader is used by FixedWidthFormat.read_data(), and through
+    read_rows() by the LazyFile widget to materialize LazyTable rows.
+    """
+    def __init__(self, filename, descriptor=None):
+        self.filename = filename
+        if descriptor is None:
+            descriptor = FixedWidthFormat().describe(filename)
+        self.descriptor = descriptor
+        self.info_columns = descriptor.info_columns
+        self.domain = descriptor.domain
+        self.columns = descriptor.columns
+        self.readers = descriptor.readers
+        self.len_line = descriptor.len_line
+        n_rows = descriptor.n_rows
+        if n_rows > 0:
+            self.lines = np.memmap(filename, dtype=np.uint8, mode='r',
+                                   offset=descriptor.offset,
+                                   shape=(n_rows, self.len_line))
+        else:
+            self.lines = np.zeros((0, self.len_line), dtype=np.uint8)
+
+    def __len__(self):
+        return self.lines.shape[0]
+
+    def is_current(self):
+        """
+        Returns False if the modification time or the size of the file
+        changed since its descriptor was read; a new reader should then be
+        created.
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == \
+            (self.descriptor.mtime, self.descriptor.size)
+
+    def read_column(self, name_attribute, rows=slice(None)):
+        """
+        Returns the values of one column for the given rows, which can be a
+        slice or a sequence of row indices. Only these rows are read from
+        the file.
+        """
+        col = self.columns[name_attribute]
+        if not isinstance(rows, slice):
+            rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        block = np.ascontiguousarray(self.lines[rows, col.start:col.end])
+        strings = np.char.strip(block.view('S{}'.format(col.width)).ravel())
+        return decode_column(strings, self.readers.get(col.index))
+
+    def read_rows(self, rows, names_attributes=None):
+        """
+        Returns a two dimensional array with the values of the given rows,
+        a slice or a sequence of row indices, for the given columns. All
+        variables of the domain are returned if no names are given.
+        The array has dtype object if any of the columns holds strings.
+        """
+        if names_attributes is None:
+            names_attributes = [var.name for var in chain(
+                self.domain.variables, self.domain.metas)]
+        columns = [self.read_column(name_attribute, rows)
+                   for name_attribute in names_attributes]
+        if isinstance(rows, slice):
+            n_rows = len(range(*rows.indices(len(self))))
+        else:
+            n_rows = len(rows)
+        dtype = object if any(c.dtype == object for c in columns) else float
+        values = np.empty((n_rows, len(columns)), dtype=dtype)
+        for i, column in enumerate(columns):
+            values[:, i] = column
+        return values
@@ -24,6 +24,8 @@ from Orange.data import filter as orange_filter
 
 import numpy
 import threading
+import queue
+import weakref
 import copy
 
 import collections.abc
@@ -78,6 +80,419 @@ def eq_lazyaware(data1, data2):
     return equal
 
 
+class LazyDataSource:
+    """
+    LazyDataSource is the interface through which a LazyTable pulls the data
+    that it does not hold yet. The widget_origin of a LazyTable is a
+    LazyDataSource, although any object with the same methods will do.
+
+    A data source must implement pull_length() and pull_rows(). pull_cell()
+    has a default implementation in terms of pull_rows(), and the other
+    methods are optional. (The methods are not declared with abc, since
+    widgets, whose metaclass is not an ABCMeta, are data sources too.)
+    """
+
+    def pull_length(self):
+        """
+        Returns the number of rows of the full data. Must be implemented.
+        """
+        raise NotImplementedError
+
+    def pull_rows(self, row_indices, variables):
+        """
+        Returns the values of the given variables for the given rows,
+        as an array with one row per row index. Must be implemented.
+        """
+        raise NotImplementedError
+
+    def pull_cell(self, row_index, variable):
+        """
+        Returns the value of the given variable in the given row.
+        """
+        return self.pull_rows([row_index], [variable])[0, 0]
+
+    def pull_region_of_interest(self):
+        """
+        Pull rows in the region of interest of the LazyTable.
+        """
+
+    def set_region_of_interest(self, region_of_interest):
+        """
+        A region of interest has been indicated, probably by the user.
+        """
+
+
+class LazyPrefetcher:
+    """
+    LazyPrefetcher reads rows of a LazyTable ahead from its widget_origin in
+    a worker thread.
+
+    The rows are read in chunks of chunk_size rows that are not materialized
+    yet and put in a bounded queue, from which LazyTable.store_prefetched()
+    stores them in the table. The worker waits when the queue is full, so it
+    never reads more than queue_size chunks ahead of the table.
+
+    Data sources without pull_rows() cannot be read ahead. For those, the
+    worker asks the table to pull_region_of_interest() every interval
+    seconds instead.
+
+    The worker only holds a weak reference to the table between chunks and
+    stops when the table is garbage collected or cancel() is called. It
+    finds the missing rows with RowMapping.missing(), which locks the
+    row_mapping, so the table can be changed in the meantime.
+    """
+
+    def __init__(self, table, chunk_size=1000, queue_size=4, interval=10):
+        self.table_ref = weakref.ref(table)
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.cancelled = threading.Event()
+        # The row_index_full from where to look for rows to prefetch.
+        self.position = 0
+        self.thread = threading.Thread(
+            target=self.run, name="LazyPrefetcher", daemon=True)
+        weakref.finalize(table, self.cancelled.set)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def is_alive(self):
+        return self.thread.is_alive() and not self.cancelled.is_set()
+
+    def running(self):
+        """
+        Returns whether the worker should continue.
+        """
+        return not self.cancelled.is_set() and threading.main_thread().is_alive()
+
+    def run(self):
+        """
+        The loop of the worker thread.
+        """
+        while self.running():
+            table = self.table_ref()
+            if table is None:
+                break
+            if hasattr(table.widget_origin, 'pull_rows'):
+                chunk = self.read_chunk(table)
+                del table
+                if chunk is None:
+                    # All rows have been read.
+                    break
+                while self.running():
+                    try:
+                        self.queue.put(chunk, timeout=self.interval)
+                        break
+                    except queue.Full:
+                        pass
+            else:
+                table.pull_region_of_interest()
+                del table
+                self.cancelled.wait(self.interval)
+
+    def read_chunk(self, table):
+        """
+        Returns the next chunk of rows that are not yet materialized as a
+        tuple of an array with their row_index_full and an array with their
+        values, or None if there are no more rows.
+        """
+        row_indices = table.row_mapping.missing(
+            self.position, table.len_full_data(), self.chunk_size)
+        if not len(row_indices):
+            return None
+        self.position = int(row_indices[-1]) + 1
+        return row_indices, table._pull_rows(row_indices)
+
+    def get_chunks(self):
+        """
+        Returns the chunks that are in the queue, without waiting.
+        """
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.queue.get_nowait())
+            except queue.Empty:
+                return chunks
+
+
+class RowMapping:
+    """
+    RowMapping is a two-way index between the row_index_full and the
+    row_index_materialized of the rows of a LazyTable.
+
+    It is backed by int64 arrays instead of a dictionary:
+    - materialized_from_full holds, for every row_index_full up to the
+      largest one that is mapped, the row_index_materialized or -1 if the
+      row is not materialized and
+    - full_from_materialized holds, for every row_index_materialized, the
+      row_index_full or -1 if that position is not used.
+    Membership tests and lookups are therefore O(1) and can be done for
+    many rows at once with contains() and lookup(). Inverting the mapping
+    is free.
+
+    When the rows are scattered over a range of row_index_full that is
+    more than sparse_factor times larger than the number of mapped rows
+    (and larger than sparse_minimum), materialized_from_full is None and
+    the mapped row_index_full are instead kept sorted in sorted_full, with
+    their row_index_materialized in sorted_materialized. Lookups are then
+    O(log n) binary searches.
+
+    The dictionary interface (in, get, [], len, iteration, update) is kept
+    so the RowMapping can be used wherever the old dictionary was used.
+
+    The arrays are never resized in place, so views that were returned
+    earlier stay valid, although they do not see later changes.
+
+    add() and keep() change the mapping under lock, and missing() reads it
+    under the same lock, so a LazyPrefetcher can look for missing rows in
+    its own thread while the table is changed.
+    """
+
+    sparse_factor = 8
+    sparse_minimum = 65536
+
+    def __init__(self):
+        self.materialized_from_full = numpy.full(0, -1, dtype=numpy.int64)
+        self.sorted_full = self.sorted_materialized = None
+        self.full_from_materialized_all = numpy.full(0, -1, dtype=numpy.int64)
+        # Number of positions used in full_from_materialized_all.
+        self.n_materialized = 0
+        # Number of rows that are mapped.
+        self.n_mapped = 0
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    @classmethod
+    def identity(cls, length):
+        """
+        Create a RowMapping that maps the first length rows onto themselves.
+        """
+        mapping = cls()
+        mapping.add(numpy.arange(length), numpy.arange(length))
+        return mapping
+
+    @staticmethod
+    def _grown(array, length):
+        """
+        Return array if it is at least length long, otherwise a copy of it
+        that is, amortized, long enough, padded with -1.
+        """
+        if len(array) >= length:
+            return array
+        new_array = numpy.full(max(length, 2 * len(array)), -1, dtype=numpy.int64)
+        new_array[:len(array)] = array
+        return new_array
+
+    def is_sparse(self):
+        """
+        Returns True if the mapping is kept as a sorted index instead of
+        the dense materialized_from_full.
+        """
+        return self.materialized_from_full is None
+
+    def _to_sparse(self):
+        """
+        Replace materialized_from_full with the sorted index.
+        """
+        self.sorted_full = numpy.flatnonzero(self.materialized_from_full >= 0)
+        self.sorted_materialized = self.materialized_from_full[self.sorted_full]
+        self.materialized_from_full = None
+
+    def _find_sorted(self, row_indices_full):
+        """
+        Returns the positions of row_indices_full in sorted_full and a mask
+        telling which of them are there.
+        """
+        positions = numpy.searchsorted(self.sorted_full, row_indices_full)
+        positions = numpy.minimum(positions, max(len(self.sorted_full) - 1, 0))
+        if not len(self.sorted_full):
+            return positions, numpy.zeros(positions.shape, dtype=bool)
+        return positions, self.sorted_full[positions] == row_indices_full
+
+    def lookup(self, row_indices_full):
+        """
+        Returns the row_index_materialized for every row_index_full in
+        row_indices_full, or -1 for the rows that are not materialized.
+        """
+        row_indices_full = numpy.asarray(row_indices_full, dtype=numpy.int64)
+        result = numpy.full(row_indices_full.shape, -1, dtype=numpy.int64)
+        if self.is_sparse():
+            positions, found = self._find_sorted(row_indices_full)
+            result[found] = self.sorted_materialized[positions[found]]
+            return result
+        known = (row_indices_full >= 0) & (row_indices_full < len(self.materialized_from_full))
+        result[known] = self.materialized_from_full[row_indices_full[known]]
+        return result
+
+    def contains(self, row_indices_full):
+        """
+        Returns a boolean array telling for every row_index_full in
+        row_indices_full whether the row is materialized.
+        """
+        return self.lookup(row_indices_full) >= 0
+
+    def full_from_materialized(self):
+        """
+        Returns an array with the row_index_full for every
+        row_index_materialized, -1 for positions that are not used.
+        """
+        return self.full_from_materialized_all[:self.n_materialized]
+
+    def add(self, row_indices_full, row_indices_materialized):
+        """
+        Map all row_indices_full to the respective row_indices_materialized.
+        Earlier mappings of either are replaced. Neither argument should
+        contain duplicates.
+        """
+        with self.lock:
+            row_indices_full = numpy.asarray(row_indices_full, dtype=numpy.int64).ravel()
+            row_indices_materialized = numpy.asarray(row_indices_materialized, dtype=numpy.int64).ravel()
+            if not len(row_indices_full):
+                return
+            length_full = int(row_indices_full.max()) + 1
+            if not self.is_sparse() and length_full > len(self.materialized_from_full) and \
+                    length_full > max(self.sparse_minimum,
+                                      self.sparse_factor * (self.n_mapped + len(row_indices_full))):
+                self._to_sparse()
+            if not self.is_sparse():
+                self.materialized_from_full = self._grown(
+                    self.materialized_from_full, length_full)
+            self.full_from_materialized_all = self._grown(
+                self.full_from_materialized_all, int(row_indices_materialized.max()) + 1)
+            self.n_materialized = max(self.n_materialized, int(row_indices_materialized.max()) + 1)
+            # Remove the old mappings in both directions.
+            materialized_old = self.lookup(row_indices_full)
+            materialized_old = materialized_old[materialized_old >= 0]
+            self.full_from_materialized_all[materialized_old] = -1
+            full_old = self.full_from_materialized_all[row_indices_materialized]
+            full_old = full_old[full_old >= 0]
+            if self.is_sparse():
+                removed = numpy.concatenate((full_old, row_indices_full))
+                positions, found = self._find_sorted(removed)
+                if found.any():
+                    self.sorted_full = numpy.delete(self.sorted_full, positions[found])
+                    self.sorted_materialized = numpy.delete(self.sorted_materialized, positions[found])
+                order = numpy.argsort(row_indices_full)
+                positions = numpy.searchsorted(self.sorted_full, row_indices_full[order])
+                self.sorted_full = numpy.insert(
+                    self.sorted_full, positions, row_indices_full[order])
+                self.sorted_materialized = numpy.insert(
+                    self.sorted_materialized, positions, row_indices_materialized[order])
+            else:
+                self.materialized_from_full[full_old] = -1
+                self.materialized_from_full[row_indices_full] = row_indices_materialized
+            self.full_from_materialized_all[row_indices_materialized] = row_indices_full
+            self.n_mapped += len(row_indices_full) - len(materialized_old) - len(full_old)
+
+    def keep(self, row_indices_materialized):
+        """
+        Keep only the rows at row_indices_materialized, which will get the
+        new row_index_materialized 0, 1, 2, ... in that order. This mirrors
+        compacting X, Y and metas with the same indices.
+        """
+        with self.lock:
+            row_indices_full = self.full_from_materialized()[row_indices_materialized]
+            if self.is_sparse():
+                self.materialized_from_full = numpy.full(0, -1, dtype=numpy.int64)
+                self.sorted_full = self.sorted_materialized = None
+            else:
+                self.materialized_from_full = numpy.full(len(self.materialized_from_full), -1, dtype=numpy.int64)
+            self.full_from_materialized_all = numpy.full(0, -1, dtype=numpy.int64)
+            self.n_materialized = 0
+            self.n_mapped = 0
+            mapped = row_indices_full >= 0
+            self.add(row_indices_full[mapped], numpy.flatnonzero(mapped))
+
+    def missing(self, start, stop, number_of_rows, chunk_size=65536):
+        """
+        Returns an array with the first number_of_rows row indices in
+        range(start, stop) that are not materialized.
+        """
+        with self.lock:
+            missing = []
+            number_missing = 0
+            while start < stop and number_missing < number_of_rows:
+                row_indices = numpy.arange(start, min(stop, start + chunk_size), dtype=numpy.int64)
+                row_indices = row_indices[~self.contains(row_indices)]
+                missing.append(row_indices[:number_of_rows - number_missing])
+                number_missing += len(missing[-1])
+                start += chunk_size
+            if not missing:
+                return numpy.zeros(0, dtype=numpy.int64)
+            return numpy.concatenate(missing)
+
+    def iter_missing(self, start, stop, chunk_size=1024):
+        """
+        Iterate over the row indices in range(start, stop) that are not
+        materialized. Membership is checked in chunks, so rows materialized
+        while iterating are only noticed in later chunks.
+        """
+        while start < stop:
+            for row_index in self.missing(start, min(stop, start + chunk_size), chunk_size):
+                yield int(row_index)
+            start += chunk_size
+
+    def _lookup_one(self, row_index_full):
+        if self.is_sparse():
+            return int(self.lookup([row_index_full])[0])
+        if 0 <= row_index_full < len(self.materialized_from_full):
+            return int(self.materialized_from_full[row_index_full])
+        return -1
+
+    def __contains__(self, row_index_full):
+        return self._lookup_one(row_index_full) >= 0
+
+    def get(self, row_index_full, default=None):
+        row_index_materialized = self._lookup_one(row_index_full)
+        if row_index_materialized >= 0:
+            return row_index_materialized
+        return default
+
+    def __getitem__(self, row_index_full):
+        row_index_materialized = self._lookup_one(row_index_full)
+        if row_index_materialized < 0:
+            raise KeyError(row_index_full)
+        return row_index_materialized
+
+    def __setitem__(self, row_index_full, row_index_materialized):
+        self.add([row_index_full], [row_index_materialized])
+
+    def update(self, pairs):
+        pairs = list(pairs)
+        if pairs:
+            row_indices_full, row_indices_materialized = zip(*pairs)
+            self.add(row_indices_full, row_indices_materialized)
+
+    def __len__(self):
+        return self.n_mapped
+
+    def __iter__(self):
+        """
+        Iterate over the row_index_full of the mapped rows in the order in
+        which they are materialized.
+        """
+        row_indices_full = self.full_from_materialized()
+        return iter(row_indices_full[row_indices_full >= 0].tolist())
+
+    def items(self):
+        row_indices_full = self.full_from_materialized()
+        row_indices_materialized = numpy.flatnonzero(row_indices_full >= 0)
+        return zip(row_indices_full[row_indices_materialized].tolist(),
+                   row_indices_materialized.tolist())
+
+
 class LazyRowInstance(RowInstance):
     """
     LazyRowInstance is a lazy version of RowInstance.
@@ -123,8 +538,7 @@ class LazyRowInstance(RowInstance):
     #   used instead of row_index whenever possible for clarity.
     # For example when rows are removed from table.X, Y and metas because of
     # memory constraints, then the row_index_full of each row will stay the
-    # same, but the row_index_materialized will change. Such functionality
-    # has not yet been implemented.
+    # same, but the row_index_materialized will change. See LazyTable.evict().
 
     row_index_full = None
     row_index_materialized = None
@@ -140,10 +554,10 @@ class LazyRowInstance(RowInstance):
         in the table if it's in the region_of_interest. It should only be
         necessary to set this flag internally.
 
+        Rows that are appended can be evicted again when the table exceeds
+        its memory_budget, rows outside the region of interest first.
+
         TODO:
-        - Ensure that rows that are not in the region of interest are
-          removed from memory because saving memory is the reason they are
-          not appended to the table.
         - Perhaps cache whether an instance is in the region of interest
           so they can be skipped later.
         """
@@ -259,7 +673,10 @@ class LazyRowInstance(RowInstance):
             #   to do this in the LazyTable itself? E.g. preventing this
             #   pylint warning:
             # pylint: disable=protected-access
-            if self.row_index_materialized is not None:
+            # The row might have been moved or evicted from self.table in
+            # the meantime, see LazyTable.evict().
+            if self.row_index_materialized is not None and \
+                    self.table.row_mapping.get(self.row_index_full) == self.row_index_materialized:
                 if 0 <= key_id < len(self._domain.attributes):
                     self.table.X[self.row_index_materialized][key_id] = value
                 elif key_id >= len(self._domain.attributes):
@@ -361,21 +778,17 @@ class LazyTable(Table):
     # The widget_origin has created this LazyTable. It is used to
     # 1) pull data that is not yet available and
     #
-    # Data pulling (1) might better be implemented in another way. At the
-    # moment, the LazyTable has to ask widget_origin for more data. It
-    # might be better if widget_origin tells the LazyTable instance how
-    # it should retrieve more data itself. That has two benefits:
-    # - the LazyTable instance is more self-contained and
-    # - it will be easier for widget_origin to have multiple outputs.
-    #
-    # TODO: Implement this 'teaching' of the LazyTable
-    widget_origin = None
+    # The widget_origin is a LazyDataSource, which tells the LazyTable how
+    # it can retrieve more data itself. Therefore it does not have to be a
+    # widget. Setting the widget_origin starts the prefetching of rows in
+    # the background, unless stop_pulling is set. See widget_origin below.
+    _widget_origin = None
 
     # Or this LazyTable can be created from another LazyTable, by some
     # widget like SelectingData.
     table_origin = None
 
-    # row_mapping is a dictionary that maps other identifiers to rows of
+    # row_mapping is a RowMapping that maps other identifiers to rows of
     # .X, .Y and .metas. This is necessary because the rows might be fetched
     # in non-sequential order. That is, if row 10 is requested first (e.g.
     # by table[10]), then the first row in X, Y and metas refers to row
@@ -391,10 +804,42 @@ class LazyTable(Table):
     # Similar to SQLTable.
     row_filters = None
     
-    stop_pulling = False
+    _stop_pulling = False
+
+    # The rows in X, Y and metas are materialized and evicted while the
+    # table is used, so their statistics are not memoized.
+    cache_statistics = False
+
+    # The LazyPrefetcher that reads rows ahead from the widget_origin.
+    prefetcher = None
+
+    # The number of rows the prefetcher reads at once, the number of those
+    # chunks it reads ahead and the interval, in seconds, with which data
+    # sources without pull_rows() are asked to pull_region_of_interest().
+    prefetch_chunk_size = 1000
+    prefetch_queue_size = 4
+    prefetch_interval = 10
+
+    # memory_budget is the maximum number of bytes that the materialized
+    # rows may use in X, Y, metas, W and ids. Rows are evicted when the
+    # budget is exceeded: rows outside the region_of_interest first and
+    # the least recently used rows first within those. This also bounds
+    # prefetching, which pauses while the table is at its budget. None
+    # means that the table can grow without limit.
+    memory_budget = 256 * 2 ** 20
+
+    # The fraction of the memory_budget that is freed when rows are evicted,
+    # so rows are not evicted on every access.
+    eviction_fraction = 0.1
+
+    # row_last_used holds, for every materialized row, the value of
+    # access_counter at the last access of that row.
+    row_last_used = None
+    access_counter = 0
 
     
-    debug_all_lazytables = []
+    # Weak references, so the LazyTables are not kept alive by this.
+    debug_all_lazytables = weakref.WeakSet()
     
 
     def __init__(self, *args, **kwargs):
@@ -402,28 +847,37 @@ class LazyTable(Table):
         Initialize this LazyTable.
         """
     
-        self.debug_all_lazytables.append(self)
+        self.debug_all_lazytables.add(self)
     
 
         # No rows to map yet.
-        self.row_mapping = {}
+        self.row_mapping = RowMapping()
 
         
         if 'stop_pulling' in kwargs:
             self.stop_pulling = kwargs['stop_pulling']
 
+        self.memory_budget = kwargs.get('memory_budget', self.memory_budget)
+        self.row_last_used = numpy.zeros(0, dtype=numpy.int64)
+
         super().__init__(*args, **kwargs)
 
         self.row_filters = ()
         # row_filters is used like in SqlTable.
 
-        self.widget_origin = kwargs.get('widget_origin', None)
+        # passing_rows holds the row_index_full in table_origin of the rows
+        # that pass the row_filters, in order, as far as table_origin has
+        # been scanned. passing_rows_scanned is the number of rows of
+        # table_origin that have been scanned.
+        self.passing_rows = numpy.zeros(0, dtype=numpy.int64)
+        self.n_passing_rows = 0
+        self.passing_rows_scanned = 0
 
         # This name is used for example in the Predictions widget.
         self.name = "A LazyTable"
 
-        if not self.stop_pulling:
-            self.pull_in_the_background()
+        # Setting the widget_origin starts pulling in the background.
+        self.widget_origin = kwargs.get('widget_origin', None)
         
             
             
@@ -433,14 +887,258 @@ class LazyTable(Table):
         but in practice it is because some non-lazy aware widgets will
         access the numpy arrays directly. Any NaN's in there will cause
         problems.
+
+        All values are pulled with a single _pull_rows() call. The row
+        arrays of a materialized row are views on X, Y and metas, so
+        the values end up in the table as well.
         """
-        for key_id, key_var in enumerate(self.domain):
-            # Directly call __getitem__ with key_id and key_var, because this
-            # prevents superfluous dictionary lookups.
-            # TODO: something smarter that doesn't trigger the pylint error.
-            # pylint: disable=unused-variable
-            value = row.__getitem__(key=key_id, key_id=key_id, key_var=key_var)
-    
+        n_attributes = len(self.domain.attributes)
+        n_class_vars = len(self.domain.class_vars)
+        values = self._pull_rows([row.row_index_full])[0]
+        row._x[:] = values[:n_attributes]
+        row._y[:] = values[n_attributes:n_attributes + n_class_vars]
+        row._metas[:] = values[n_attributes + n_class_vars:]
+
+    def _pull_rows(self, row_indices):
+        """
+        Pull the values of the given rows of the full dataset from the
+        widget_origin. Returns an array with one row per row index and one
+        column per variable in the domain, metas last.
+
+        The widget_origin can provide a pull_rows(row_indices, variables)
+        method to return such a block at once. Otherwise the block is
+        assembled with pull_cell().
+        """
+        variables = self.domain.variables + self.domain.metas
+        if hasattr(self.widget_origin, 'pull_rows'):
+            values = self.widget_origin.pull_rows(row_indices, variables)
+        else:
+            values = [
+                [self.widget_origin.pull_cell(row_index, variable) for variable in variables]
+                for row_index in row_indices
+            ]
+        values = numpy.asarray(values, dtype=object if self.domain.metas else float)
+        return values.reshape(len(row_indices), len(variables))
+
+    def materialize(self, row_indices):
+        """
+        Materialize the given rows of the full dataset in one go.
+
+        Rows that are not yet materialized are pulled with one _pull_rows()
+        call and stored with one assignment to each of X, Y and metas,
+        instead of appending and pulling them cell by cell. Rows that are
+        already materialized are left alone.
+
+        Returns the row_index_materialized of every requested row.
+
+        Filtered tables always have a table_origin, their rows are mapped
+        through the passing rows of the table_origin one by one. The
+        requested rows are stored whether or not they are in the
+        region_of_interest, like with __getitem__(); the region_of_interest
+        only decides which rows are evicted first.
+        """
+        row_indices = [int(row_index) for row_index in row_indices]
+        if self.widget_origin is None:
+            # Rows of derived tables are materialized through their origin,
+            # which also applies the row_filters.
+            # Rows are only evicted afterwards, so the first rows of the
+            # block are not evicted for the last ones.
+            memory_budget, self.memory_budget = self.memory_budget, None
+            try:
+                for row_index_full in row_indices:
+                    self.__getitem__(row_index_full)
+            finally:
+                self.memory_budget = memory_budget
+        else:
+            if self.row_filters:
+                # Filtered tables are created with copy(), which pulls
+                # through a table_origin instead of a widget_origin.
+                raise ValueError("A LazyTable with a widget_origin cannot have row_filters.")
+            len_full_data = self.len_full_data()
+            if any(not 0 <= row_index < len_full_data for row_index in row_indices):
+                raise IndexError
+            # dict.fromkeys() removes duplicates but keeps the order.
+            row_indices_new = list(dict.fromkeys(
+                numpy.asarray(row_indices, dtype=numpy.int64)[
+                    ~self.row_mapping.contains(row_indices)].tolist()
+            ))
+            if row_indices_new:
+                self._store_rows(row_indices_new, self._pull_rows(row_indices_new))
+        self._touch_rows(self.row_mapping.lookup(row_indices))
+        self._evict_if_over_budget()
+        return self.row_mapping.lookup(row_indices)
+
+    def iter_chunks(self, rows_per_chunk=10000):
+        """
+        Yield the rows of the full dataset as ordinary tables of at most
+        rows_per_chunk rows.
+
+        The rows of a table with a widget_origin are pulled with one
+        _pull_rows() call per chunk and are not materialized, so the whole
+        dataset can be processed in the memory of a single chunk. The rows
+        of derived tables are materialized through their origin.
+        """
+        n_attributes = len(self.domain.attributes)
+        n_variables = len(self.domain.variables)
+        len_full_data = self.len_full_data()
+        for start in range(0, len_full_data, rows_per_chunk):
+            row_indices = range(start, min(start + rows_per_chunk, len_full_data))
+            if self.widget_origin is not None:
+                values = self._pull_rows(row_indices)
+                X = values[:, :n_attributes]
+                Y = values[:, n_attributes:n_variables]
+                metas = values[:, n_variables:]
+            else:
+                rows_materialized = self.materialize(row_indices)
+                X = self.X[rows_materialized]
+                Y = self._Y[rows_materialized]
+                metas = self.metas[rows_materialized]
+            yield Table.from_numpy(
+                self.domain, X.astype(float), Y.astype(float), metas)
+
+    def _store_rows(self, row_indices_full, values):
+        """
+        Append a block of pulled values as new materialized rows and
+        update the row_mapping accordingly.
+        """
+        n_attributes = len(self.domain.attributes)
+        n_class_vars = len(self.domain.class_vars)
+        start = self.len_instantiated_data()
+        stop = start + len(row_indices_full)
+        self._resize_all(stop)
+        self.X[start:stop] = values[:, :n_attributes]
+        self._Y[start:stop] = values[:, n_attributes:n_attributes + n_class_vars]
+        self.metas[start:stop] = values[:, n_attributes + n_class_vars:]
+        if self.W.shape[-1]:
+            self.W[start:stop] = 1
+        with Table._next_instance_lock:
+            self.ids[start:stop] = numpy.arange(Table._next_instance_id, Table._next_instance_id + stop - start)
+            Table._next_instance_id += stop - start
+        self.row_mapping.add(row_indices_full, numpy.arange(start, stop))
+
+    def _resize_all(self, new_length):
+        old_length = self.len_instantiated_data()
+        super()._resize_all(new_length)
+        # Like the arrays of the table, row_last_used grows geometrically;
+        # only its first len_instantiated_data() entries are used.
+        if len(self.row_last_used) < new_length:
+            self.row_last_used.resize(
+                max(new_length,
+                    int(len(self.row_last_used) * self.growth_factor)),
+                refcheck=False)
+        self.row_last_used[old_length:new_length] = 0
+
+    def _touch_rows(self, row_indices_materialized):
+        """
+        Mark the given materialized rows as the most recently used ones.
+        """
+        self.access_counter += 1
+        n_rows = self.len_instantiated_data()
+        if len(self.row_last_used) < n_rows:
+            self.row_last_used.resize(n_rows, refcheck=False)
+        self.row_last_used[row_indices_materialized] = self.access_counter
+
+    def _bytes_per_row(self):
+        """
+        Returns the number of bytes a materialized row uses in X, Y, metas,
+        W and ids. Objects referred to by metas are not counted.
+        """
+        arrays = [self.X, self._Y, self.metas, self.W, self.ids, self.row_last_used]
+        return sum(
+            array.itemsize * (array.shape[1] if array.ndim == 2 else 1)
+            for array in arrays
+        )
+
+    def max_rows_materialized(self):
+        """
+        Returns the number of rows that fit in the memory_budget, or None
+        if there is no budget.
+        """
+        if self.memory_budget is None:
+            return None
+        return max(1, int(self.memory_budget // max(1, self._bytes_per_row())))
+
+    def _evict_if_over_budget(self):
+        """
+        Evict rows if the materialized rows exceed the memory_budget.
+        Returns whether rows have been evicted.
+        """
+        max_rows = self.max_rows_materialized()
+        n_rows = self.len_instantiated_data()
+        if max_rows is None or n_rows <= max_rows:
+            return False
+        n_rows_keep = int(max_rows * (1 - self.eviction_fraction))
+        self.evict(n_rows - n_rows_keep)
+        return True
+
+    def evict(self, number_of_rows):
+        """
+        Remove number_of_rows materialized rows from X, Y and metas.
+
+        Rows outside the region_of_interest are evicted before rows inside
+        it, and within those the least recently used rows are evicted first.
+        The rows of the most recent access are never evicted. The evicted
+        rows are removed from the row_mapping and the remaining rows get
+        new, consecutive, row_index_materialized values. The row_index_full
+        of the rows does not change, so evicted rows are simply pulled
+        again when they are needed.
+        """
+        n_rows = self.len_instantiated_data()
+        row_last_used = self.row_last_used[:n_rows]
+        protected = row_last_used == self.access_counter
+        keep_first = self._materialized_in_region_of_interest() | protected
+        # lexsort sorts on the last key first.
+        order = numpy.lexsort((row_last_used, keep_first))
+        rows_evicted = order[:number_of_rows]
+        rows_evicted = rows_evicted[~protected[rows_evicted]]
+        if not len(rows_evicted):
+            return
+        keep = numpy.ones(n_rows, dtype=bool)
+        keep[rows_evicted] = False
+        rows_kept = numpy.flatnonzero(keep)
+
+        self.X = self.X[rows_kept]
+        self._Y = self._Y[rows_kept]
+        self.metas = self.metas[rows_kept]
+        self.W = self.W[rows_kept]
+        self.ids = self.ids[rows_kept]
+        self.row_last_used = row_last_used[rows_kept]
+        self.row_mapping.keep(rows_kept)
+
+    def _materialized_in_region_of_interest(self):
+        """
+        Returns a boolean array telling for every materialized row whether
+        it is in the region_of_interest. The materialized values are used,
+        so nothing is pulled.
+        """
+        return self._in_region_of_interest_indicators(self)
+
+    def _in_region_of_interest_indicators(self, table):
+        """
+        Returns a boolean array telling for every row in table.X, Y and
+        metas whether it is in the region_of_interest. The table is either
+        this LazyTable or a Table with the same domain.
+        """
+        n_rows = table.X.shape[0]
+        region_of_interest = self.region_of_interest
+        if region_of_interest is None:
+            in_region = numpy.ones(n_rows, dtype=bool)
+        elif isinstance(region_of_interest, orange_filter.Values):
+            in_region = Table._filter_values_indicators(table, region_of_interest)
+        elif isinstance(region_of_interest, orange_filter.Filter):
+            in_region = numpy.fromiter(
+                (region_of_interest(RowInstance(table, row_index))
+                 for row_index in range(n_rows)),
+                dtype=bool, count=n_rows
+            )
+        else:
+            # Backwards compatibility with a dictionary as ROI.
+            in_region = numpy.ones(n_rows, dtype=bool)
+            for (attribute_name, (minimum, maximum)) in region_of_interest.items():
+                column = table.get_column_view(attribute_name)[0]
+                in_region &= (minimum <= column) & (column <= maximum)
+        return in_region
+
     
     def __getitem__(self, index_row, region_of_interest_only=False):
         # pylint: disable=too-many-ancestors, too-many-branches, arguments-differ
@@ -472,6 +1170,11 @@ class LazyTable(Table):
             if row_index_materialized is not None:
                 # TODO: or row_index_materialized here?
                 row = LazyRowInstance(self, row_index_full, region_of_interest_only=region_of_interest_only)
+            elif self.widget_origin is not None and not region_of_interest_only:
+                # Materialize the whole row at once and then treat it like
+                # any other materialized row.
+                self.materialize([row_index_full])
+                row = LazyRowInstance(self, row_index_full)
             elif self.widget_origin is not None:
                 # Actually do the same thing, since the pulling logic is
                 # currently implemented in LazyRowInstance.
@@ -484,54 +1187,37 @@ class LazyTable(Table):
                     # therefore we don't need to loop through the rows.
                     # The columns might be different though, this is handled
                     # by RowInstance?
-                    row = self.table_origin[row_index_full]
-                    # The code below is copied from the for loop below.
-                    # TODO: Perhaps refactor this.
-                    row.table = self
-                    row.row_index_full = row_index_full
-                    row.row_index_materialized = self.len_instantiated_data()
-                    row.row_index = row.row_index_materialized
-                    self.append(row)
-                    self.row_mapping[row.row_index_full] = row.row_index_materialized
-                    row = LazyRowInstance(self, row.row_index_full, region_of_interest_only=region_of_interest_only)
+                    row_index_origin = row_index_full
                 else:
                     # The rows of this table might be different from the
-                    # table_origin.
-                    # Go through the original table and see whether we find
-                    # a row that fits in the table.
-                    row_index_counter = 0
-                    # TODO: Start as far as possible into table_origin instead
-                    #   of at the beginning. However, this is only possible if
-                    #   we would have kept the row_index_full of the original
-                    #   table, because that would tell us were to start..
-                    #   That is, we need instance_identifier_global !
-                    for row_origin in self.table_origin:
-                        if row_origin.in_filters(self.row_filters):
-                            row_index_counter += 1
-                            # TODO: Off by one error here?
-                            if row_index_counter > row_index_full:
-                                # Found it!
-                                #row = row_origin.copy()
-                                row = row_origin
-                                row.table = self
-                                row.row_index_full = row_index_full
-                                # TODO: The below is similar to LazyRowInstance.
-                                #   __getitem__(), perhaps that code there should
-                                #   go to here?
-                                row.row_index_materialized = self.len_instantiated_data()
-                                row.row_index = row.row_index_materialized
-                                self.append(row)
-                                self.row_mapping[row.row_index_full] = row.row_index_materialized
-                                # A full RowInstance can now be initialized because the row
-                                # is indeed available in the table.
-                                row = LazyRowInstance(self, row.row_index_full, region_of_interest_only=region_of_interest_only)
-                                break
-                    else:
+                    # table_origin. The passing rows index tells which row
+                    # of the table_origin this is.
+                    row_index_origin = self.row_index_origin(row_index_full)
+                    if row_index_origin is None:
                         # Went through all the rows in origin_table, no dice..
                         raise IndexError
+                row = self.table_origin[row_index_origin]
+                # TODO: The below is similar to LazyRowInstance.
+                #   __getitem__(), perhaps that code there should
+                #   go to here?
+                row.table = self
+                row.row_index_full = row_index_full
+                row.row_index_materialized = self.len_instantiated_data()
+                row.row_index = row.row_index_materialized
+                self.append(row)
+                self.row_mapping[row.row_index_full] = row.row_index_materialized
+                # A full RowInstance can now be initialized because the row
+                # is indeed available in the table.
+                row = LazyRowInstance(self, row.row_index_full, region_of_interest_only=region_of_interest_only)
             else:
                 raise NotImplementedError
 
+            if row.row_index_materialized is not None:
+                self._touch_rows([row.row_index_materialized])
+                if self._evict_if_over_budget():
+                    # The row itself is never evicted, but it has moved.
+                    row = LazyRowInstance(self, row_index_full)
+
             return row
 
         # TODO: See documentation of tabular data classes to determine
@@ -591,11 +1277,12 @@ class LazyTable(Table):
         #   t2.widget_origin = self.widget_origin
         t2 = LazyTable.from_domain(self.domain)
         t2.stop_pulling = self.stop_pulling if stop_pulling is None else stop_pulling
+        t2.memory_budget = self.memory_budget
         t2.table_origin = self
         return t2
 
     @classmethod
-    def from_table(cls, domain, source, row_indices=...):
+    def from_table(cls, domain, source, row_indices=..., lazy=False):
         """
         Create a new table from selected columns and/or rows of an existing
         one. The columns are chosen using a domain. The domain may also include
@@ -616,6 +1303,8 @@ class LazyTable(Table):
         :type source: Orange.data.Table
         :param row_indices: indices of the rows to include
         :type row_indices: a slice or a sequence
+        :param lazy: passed on to `Table.from_table`
+        :type lazy: bool
         :return: a new table
         :rtype: Orange.data.Table
         """
@@ -629,9 +1318,7 @@ class LazyTable(Table):
             table_new.table_origin = source
             # Fill the table with the rows that were already materialized.
             # TODO: Do something smarter here?
-            #   Definitely, currently we need the copy.copy to prevent 
-            #   RuntimeError: dictionary changed size during iteration
-            for row_index_full in copy.copy(table_new.table_origin.row_mapping):
+            for row_index_full in list(table_new.table_origin.row_mapping):
                 for variable in table_new.domain:
                     # pylint: disable=unused-variable
                     value = table_new[row_index_full][variable]
@@ -640,6 +1327,7 @@ class LazyTable(Table):
                 domain=domain,
                 source=source,
                 row_indices=row_indices,
+                lazy=lazy,
             )
 
         return table_new
@@ -672,21 +1360,95 @@ class LazyTable(Table):
         elif self.table_origin is not None:
             self.table_origin.pull_region_of_interest()
 
+    @property
+    def widget_origin(self):
+        """
+        The LazyDataSource from which this LazyTable pulls its data.
+        """
+        return self._widget_origin
+
+    @widget_origin.setter
+    def widget_origin(self, widget_origin):
+        self._widget_origin = widget_origin
+        if widget_origin is not None and not self.stop_pulling:
+            self.pull_in_the_background()
+
+    @property
+    def stop_pulling(self):
+        """
+        Whether pulling data in the background is stopped. Setting this
+        cancels the prefetcher.
+        """
+        return self._stop_pulling
+
+    @stop_pulling.setter
+    def stop_pulling(self, stop_pulling):
+        self._stop_pulling = stop_pulling
+        if stop_pulling and self.prefetcher is not None:
+            self.prefetcher.cancel()
+            self.prefetcher = None
+
     def pull_in_the_background(self):
         """
-        Keep pulling data in the background.
+        Start pulling data in the background with a LazyPrefetcher, unless
+        one is running already. The prefetched rows are stored in the table
+        by store_prefetched().
 
         TODO:
-        - Stop pulling when running out of memory. Perhaps start deleting rows
-          that are not in the region of interest?
         - Continue to pull data outside the region_of_interest when we got
           all of that?
 
         """
-        if (not self.stop_pulling) and threading.main_thread().is_alive():
-            self.pull_region_of_interest()
-            if (not self.stop_pulling) and threading.main_thread().is_alive():
-                threading.Timer(10, self.pull_in_the_background).start()
+        if self.stop_pulling or (self.prefetcher is not None and self.prefetcher.is_alive()):
+            return
+        self.prefetcher = LazyPrefetcher(
+            self,
+            chunk_size=self.prefetch_chunk_size,
+            queue_size=self.prefetch_queue_size,
+            interval=self.prefetch_interval,
+        )
+        self.prefetcher.start()
+
+    def store_prefetched(self):
+        """
+        Store the rows that have been prefetched in the background and
+        returns the number of rows stored. Only rows in the region of
+        interest are stored.
+
+        This should be called from the thread that uses the table, e.g. by
+        the widget_origin before it sends the table again.
+
+        Without a region_of_interest, nothing is stored while the table is
+        at its memory_budget, because new rows would only replace old ones.
+        The prefetcher then waits until there is room again. With a
+        region_of_interest, rows outside the region of interest are evicted
+        in favour of those inside it.
+        """
+        if self.stop_pulling or self.prefetcher is None:
+            return 0
+        max_rows = self.max_rows_materialized()
+        at_memory_budget = max_rows is not None and self.len_instantiated_data() >= max_rows
+        if self.region_of_interest is None and at_memory_budget:
+            return 0
+        n_attributes = len(self.domain.attributes)
+        n_class_vars = len(self.domain.class_vars)
+        n_stored = 0
+        for (row_indices, values) in self.prefetcher.get_chunks():
+            # Rows might have been materialized in the meantime.
+            new = ~self.row_mapping.contains(row_indices)
+            if self.region_of_interest is not None and new.any():
+                block = Table.from_numpy(
+                    self.domain,
+                    values[:, :n_attributes].astype(float),
+                    values[:, n_attributes:n_attributes + n_class_vars].astype(float),
+                    values[:, n_attributes + n_class_vars:],
+                )
+                new &= self._in_region_of_interest_indicators(block)
+            if new.any():
+                self._store_rows(row_indices[new], values[new])
+                n_stored += int(new.sum())
+        self._evict_if_over_budget()
+        return n_stored
 
 
 
@@ -723,13 +1485,65 @@ class LazyTable(Table):
         return numpy.random.randint(10000000)
 
 
+    # Number of rows of table_origin that are scanned at once for rows
+    # that pass the row_filters.
+    passing_rows_batch_size = 1000
+
+    def row_index_origin(self, row_index_full):
+        """
+        Returns the row_index_full in table_origin of the row_index_full-th
+        row that passes the row_filters, or None if there is no such row.
+
+        The rows that pass are remembered, so table_origin is scanned only
+        once, in batches, and only as far as needed.
+        """
+        len_origin = self.table_origin.len_full_data()
+        while self.n_passing_rows <= row_index_full and self.passing_rows_scanned < len_origin:
+            start = self.passing_rows_scanned
+            stop = min(start + self.passing_rows_batch_size, len_origin)
+            row_indices = numpy.arange(start, stop, dtype=numpy.int64)
+            passing = row_indices[self._in_row_filters(row_indices)]
+            n_passing_rows = self.n_passing_rows + len(passing)
+            if n_passing_rows > len(self.passing_rows):
+                passing_rows = numpy.zeros(max(n_passing_rows, 2 * len(self.passing_rows)), dtype=numpy.int64)
+                passing_rows[:self.n_passing_rows] = self.passing_rows[:self.n_passing_rows]
+                self.passing_rows = passing_rows
+            self.passing_rows[self.n_passing_rows:n_passing_rows] = passing
+            self.n_passing_rows = n_passing_rows
+            self.passing_rows_scanned = stop
+        if row_index_full < self.n_passing_rows:
+            return int(self.passing_rows[row_index_full])
+        return None
+
+    def _in_row_filters(self, row_indices_origin):
+        """
+        Returns a boolean array telling for each of the rows of table_origin
+        whether it passes the row_filters.
+
+        The rows are materialized in table_origin as one block. Values
+        filters are then evaluated on the columns of that block, other
+        filters row by row.
+        """
+        row_indices_materialized = self.table_origin.materialize(row_indices_origin)
+        block = Table.from_table_rows(self.table_origin, row_indices_materialized)
+        in_filters = numpy.ones(len(row_indices_origin), dtype=bool)
+        for filter_ in self.row_filters:
+            if isinstance(filter_, orange_filter.Values):
+                in_filters &= Table._filter_values_indicators(block, filter_)
+            else:
+                in_filters &= numpy.fromiter(
+                    (filter_(block[row_index]) for row_index in range(len(block))),
+                    dtype=bool, count=len(block)
+                )
+        return in_filters
+
     def row_mapping_full_from_materialized(self):
         # pylint: disable=invalid-name
         """
-        Invert the row mapping.
+        Invert the row mapping. Returns an array with the row_index_full
+        for every row_index_materialized.
         """
-        row_mapping_inverse = {v:k for (k, v) in self.row_mapping.items()}
-        return row_mapping_inverse
+        return self.row_mapping.full_from_materialized()
 
     def set_region_of_interest(self, region_of_interest):
         """
@@ -755,6 +1569,10 @@ class LazyTable(Table):
         """
         if self.widget_origin is not None:
             length = self.widget_origin.pull_length()
+        elif self.table_origin is not None and self.row_filters and \
+                self.passing_rows_scanned >= self.table_origin.len_full_data():
+            # The whole table_origin has been scanned, so the length is known.
+            length = self.n_passing_rows
         elif self.table_origin is not None:
             # TODO: The below is incorrect. Either
             # - Iterate through all rows and get the result. This materializes
@@ -812,7 +1630,7 @@ class LazyTable(Table):
         # Hack for row_mapping so OWTable works with OWSAMP.
         # This destroys all other use of the LazyTable.
         new_length = self.len_instantiated_data()
-        self.row_mapping = {i: i for i in range(new_length)}
+        self.row_mapping = RowMapping.identity(new_length)
 
 
     def has_weights(self):
@@ -0,0 +1,3 @@
+from .base import Backend
+from .postgres import PostgresBackend
+from .sqlite import SQLiteBackend
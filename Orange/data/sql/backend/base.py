@@ -0,0 +1,107 @@
+"""
+Database-specific parts of :obj:`Orange.data.sql.table.SqlTable`.
+"""
+
+# Kinds of columns, as reported by Backend.get_fields
+CONTINUOUS = "continuous"
+INTEGER = "integer"
+BOOLEAN = "boolean"
+TEXT = "text"
+
+
+class Backend:
+    """
+    A backend creates connections to the database and provides the SQL
+    that differs between databases: quoting, casting, sampling and
+    statistics.
+
+    Queries are composed by :obj:`~Orange.data.sql.table.SqlTable`, which
+    passes itself to the methods that need to run queries.
+    """
+    #: Exception raised by the database module when a query fails
+    Error = Exception
+
+    #: Whether the database supports GROUP BY GROUPING SETS
+    supports_grouping_sets = False
+
+    def create_connection_pool(self, connection_params):
+        """Return a pool with methods getconn, putconn and closeall."""
+        raise NotImplementedError
+
+    def cursor(self, connection, server_side=False):
+        """Return a cursor for connection. Server side cursors keep the
+        results on the server until they are fetched."""
+        return connection.cursor()
+
+    def cancel(self, connection):
+        """Cancel the query that is running on connection, if possible."""
+
+    def get_fields(self, table):
+        """Return a list of (name, kind) for the columns of table, where
+        kind is one of CONTINUOUS, INTEGER, BOOLEAN, TEXT or None."""
+        raise NotImplementedError
+
+    def quote_identifier(self, value):
+        return '"%s"' % value
+
+    def unquote_identifier(self, value):
+        if value.startswith('"'):
+            return value[1:len(value) - 1]
+        else:
+            return value
+
+    def quote_string(self, value):
+        return "'%s'" % value
+
+    def cast_continuous(self, expression):
+        """Return SQL that casts expression to a floating point number."""
+        raise NotImplementedError
+
+    def cast_text(self, expression):
+        """Return SQL that casts expression to text."""
+        raise NotImplementedError
+
+    def discrete_stats(self, field):
+        """Return SQL for the number of unknown and known values."""
+        return ("SUM(CASE TRUE WHEN {0} IS NULL THEN 1 ELSE 0 END), "
+                "SUM(CASE TRUE WHEN {0} IS NULL THEN 0 ELSE 1 END)"
+                ).format(field)
+
+    def continuous_stats(self, field):
+        """Return SQL for the minimum, maximum, mean and standard deviation,
+        followed by discrete_stats."""
+        return ", ".join(
+            [self.cast_continuous("%s(%s)" % (function, field))
+             for function in ("MIN", "MAX", "AVG", "STDDEV")] +
+            [self.discrete_stats(field)])
+
+    def count_approx(self, table, query):
+        """Return the estimated number of rows returned by query or None if
+        the database cannot estimate it."""
+        return None
+
+    def sample_query(self, table, method, parameter):
+        """Return a query that selects a sample of table. Method 'system'
+        samples a percentage of rows, 'system_time' samples for the given
+        number of milliseconds."""
+        raise NotImplementedError
+
+    def row_order(self, table):
+        """Return a list of expressions that order the rows of table in a
+        repeatable way, or None if rows cannot be ordered."""
+        return None
+
+    def paging(self, offset, limit):
+        """Return the clauses that skip the first offset rows and return at
+        most limit rows; either may be None."""
+        sql = []
+        if limit is not None:
+            sql.append("LIMIT %d" % limit)
+        if offset is not None:
+            sql.append("OFFSET %d" % offset)
+        return " ".join(sql)
+
+    def row_set_query(self, fields, numbered_query, row_numbers, large=False):
+        """Return a query and its parameters that select fields from rows of
+        numbered_query whose __row_number is in row_numbers."""
+        raise NotImplementedError
@@ -0,0 +1,94 @@
+import re
+import uuid
+
+import Orange.misc
+psycopg2 = Orange.misc.import_late_warning("psycopg2")
+psycopg2.pool = Orange.misc.import_late_warning("psycopg2.pool")
+
+from .base import Backend, CONTINUOUS, INTEGER, BOOLEAN, TEXT
+
+FLOATISH_TYPES = (700, 701, 1700)  # real, float8, numeric
+INT_TYPES = (20, 21, 23)  # bigint, int, smallint
+CHAR_TYPES = (25, 1042, 1043,)  # text, char, varchar
+BOOLEAN_TYPES = (16,)  # bool
+
+
+class PostgresBackend(Backend):
+    """Backend for PostgreSQL, using psycopg2."""
+    supports_grouping_sets = True
+
+    @property
+    def Error(self):
+        return psycopg2.ProgrammingError
+
+    def create_connection_pool(self, connection_params):
+        return psycopg2.pool.ThreadedConnectionPool(1, 16, **connection_params)
+
+    def cursor(self, connection, server_side=False):
+        if server_side:
+            # Named cursors keep the result on the server, so rows are
+            # transferred only when they are fetched.
+            return connection.cursor("orange_%s" % uuid.uuid4().hex)
+        return connection.cursor()
+
+    def cancel(self, connection):
+        connection.cancel()
+
+    def get_fields(self, table):
+        query = "SELECT * FROM %s LIMIT 0" % table.table_name
+        with table._execute_sql_query(query) as cur:
+            description = cur.description
+        fields = []
+        for field_name, type_code, *rest in description:
+            if type_code in FLOATISH_TYPES:
+                kind = CONTINUOUS
+            elif type_code in INT_TYPES:
+                kind = INTEGER
+            elif type_code in BOOLEAN_TYPES:
+                kind = BOOLEAN
+            elif type_code in CHAR_TYPES:
+                kind = TEXT
+            else:
+                kind = None
+            fields.append((field_name, kind))
+        return fields
+
+    def cast_continuous(self, expression):
+        return "(%s)::double precision" % expression
+
+    def cast_text(self, expression):
+        return "(%s)::text" % expression
+
+    def count_approx(self, table, query):
+        with table._execute_sql_query("EXPLAIN " + query) as cur:
+            s = ''.join(row[0] for row in cur.fetchall())
+        return int(re.findall(r'rows=(\d*)', s)[0])
+
+    def sample_query(self, table, method, parameter):
+        return "SELECT * FROM {source} TABLESAMPLE {method}({param})".format(
+            source=table.table_name, method=method, param=parameter)
+
+    def row_order(self, table):
+        if table.table_name.startswith("("):
+            return None
+        query = ("SELECT a.attname FROM pg_index i JOIN pg_attribute a "
+                 "ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+                 "WHERE i.indrelid = %s::regclass AND i.indisprimary "
+                 "ORDER BY a.attnum")
+        with table._execute_sql_query(query, (table.table_name,)) as cur:
+            key = [self.quote_identifier(row[0]) for row in cur.fetchall()]
+        # Tables without a primary key are ordered by the physical location
+        # of rows, which changes only when the table is modified
+        return key or ["ctid"]
+
+    def row_set_query(self, fields, numbered_query, row_numbers, large=False):
+        if large:
+            # The planner can hash join with the unnested array, while
+            # = ANY compares every row with each element.
+            query = ("SELECT {} FROM ({}) AS __numbered "
+                     "JOIN unnest(%s::bigint[]) AS __selected(__row_number) "
+                     "USING (__row_number)")
+        else:
+            query = ("SELECT {} FROM ({}) AS __numbered "
+                     "WHERE __row_number = ANY(%s)")
+        return query.format(", ".join(fields), numbered_query), (row_numbers,)
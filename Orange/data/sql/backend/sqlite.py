@@ -0,0 +1,169 @@
+import json
+import math
+import sqlite3
+import threading
+from functools import lru_cache
+
+from .base import Backend, CONTINUOUS, INTEGER, TEXT
+
+
+class ConnectionPool:
+    """A pool of connections to a database file with the interface of
+    psycopg2's pools."""
+    def __init__(self, connect):
+        self.connect = connect
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            if self.connections:
+                return self.connections.pop()
+        return self.connect()
+
+    def putconn(self, connection):
+        with self.lock:
+            self.connections.append(connection)
+
+    def closeall(self):
+        with self.lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections = []
+
+
+class StdDev:
+    """Aggregate for the sample standard deviation, which SQLite lacks."""
+    def __init__(self):
+        self.n = 0
+        self.mean = self.m2 = 0.
+
+    def step(self, value):
+        if value is None:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        if self.n < 2:
+            return None
+        return math.sqrt(self.m2 / (self.n - 1))
+
+
+def width_bucket(value, low, high, n_buckets):
+    if value is None:
+        return None
+    if value < low:
+        return 0
+    if value >= high:
+        return n_buckets + 1
+    return int((value - low) / (high - low) * n_buckets) + 1
+
+
+@lru_cache(maxsize=None)
+def has_json():
+    """Return whether the SQLite library includes the JSON functions,
+    which are optional before SQLite 3.38."""
+    try:
+        sqlite3.connect(":memory:").execute(
+            "SELECT value FROM json_each('[]')")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+class SQLiteBackend(Backend):
+    """
+    Backend for database files, using the standard library's sqlite3.
+
+    SQLite cannot sample for a given time; time-limited samples take a
+    fraction of rows that gives about `time_sample_rows` rows instead.
+    """
+    Error = sqlite3.Error
+    time_sample_rows = 100000
+    # The number of parameters a statement may have in SQLite before 3.32
+    max_parameters = 999
+
+    def create_connection_pool(self, connection_params):
+        params = dict(connection_params)
+        database = params.pop("database")
+
+        def connect():
+            connection = sqlite3.connect(
+                database, check_same_thread=False, **params)
+            connection.create_aggregate("STDDEV", 1, StdDev)
+            connection.create_function("width_bucket", 4, width_bucket)
+            # Match the semantics of LIKE in PostgreSQL
+            connection.execute("PRAGMA case_sensitive_like = ON")
+            return connection
+        return ConnectionPool(connect)
+
+    def cancel(self, connection):
+        connection.interrupt()
+
+    def get_fields(self, table):
+        query = "SELECT * FROM %s LIMIT 0" % table.table_name
+        with table._execute_sql_query(query) as cur:
+            names = [column[0] for column in cur.description]
+        if not names:
+            return []
+        # Columns have no types in SQLite; use the type of the first value
+        query = "SELECT " + ", ".join(
+            "(SELECT typeof({0}) FROM {1} WHERE {0} IS NOT NULL LIMIT 1)"
+            .format(self.quote_identifier(name), table.table_name)
+            for name in names)
+        with table._execute_sql_query(query) as cur:
+            types = cur.fetchone()
+        kinds = {"real": CONTINUOUS, "integer": INTEGER, "text": TEXT}
+        return [(name, kinds.get(type_)) for name, type_ in zip(names, types)]
+
+    def cast_continuous(self, expression):
+        return "CAST(%s AS REAL)" % expression
+
+    def cast_text(self, expression):
+        return "CAST(%s AS TEXT)" % expression
+
+    def sample_query(self, table, method, parameter):
+        if method == "system_time":
+            n_rows = len(table)
+            percentage = 100 * self.time_sample_rows / max(n_rows, 1)
+        elif method == "system":
+            percentage = parameter
+        else:
+            raise ValueError("Unknown sampling method '%s'" % method)
+        threshold = int(min(percentage, 100) / 100 * 2 ** 24)
+        return "SELECT * FROM {} WHERE (random() & {}) < {}".format(
+            table.table_name, 2 ** 24 - 1, threshold)
+
+    def row_order(self, table):
+        if table.table_name.startswith("("):
+            return None
+        query = "PRAGMA table_info(%s)" % table.table_name
+        with table._execute_sql_query(query) as cur:
+            key = sorted((row[5], row[1]) for row in cur.fetchall() if row[5])
+        return [self.quote_identifier(name) for _, name in key] or ["rowid"]
+
+    def paging(self, offset, limit):
+        # SQLite has no OFFSET without LIMIT; a negative limit means none
+        if offset is not None and limit is None:
+            limit = -1
+        return super().paging(offset, limit)
+
+    def row_set_query(self, fields, numbered_query, row_numbers, large=False):
+        query = "SELECT {} FROM ({}) AS __numbered WHERE __row_number IN ({})"
+        fields = ", ".join(fields)
+        if large and has_json():
+            return (query.format(fields, numbered_query,
+                                 "SELECT value FROM json_each(?)"),
+                    (json.dumps(row_numbers),))
+        if len(row_numbers) <= self.max_parameters:
+            return (query.format(fields, numbered_query,
+                                 ", ".join("?" * len(row_numbers))),
+                    tuple(row_numbers))
+        # Too many for parameters; row numbers are integers, so they can
+        # be put into the query itself
+        return (query.format(fields, numbered_query,
+                             ", ".join(str(int(n)) for n in row_numbers)),
+                ())
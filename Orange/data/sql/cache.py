@@ -0,0 +1,79 @@
+"""
+A cache of query results shared by SqlTables.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_quoted_or_space = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\s+""")
+
+
+def normalize_query(query):
+    """Collapse whitespace outside of quoted strings and identifiers and
+    strip the trailing semicolon, so that equivalent queries have the same
+    text."""
+    query = _quoted_or_space.sub(
+        lambda match: match.group(1) or " ", query).strip()
+    return query.rstrip(";").rstrip()
+
+
+class QueryCache:
+    """
+    Results of queries, kept for at most `ttl` seconds (forever if None).
+    At most `max_size` results are kept; the least recently used results
+    are removed first.
+
+    Results are keyed by the connection (any hashable identifying the
+    database), the normalized text of the query and its parameters.
+
+    .. attribute:: hits
+
+        The number of queries answered from the cache.
+
+    .. attribute:: misses
+
+        The number of queries that had to be run.
+    """
+    def __init__(self, max_size=256, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    def fetch(self, connection, query, params, run_query):
+        """Return the result of the query, calling run_query to compute it
+        if it is not in the cache."""
+        key = (connection, normalize_query(query), repr(params))
+        with self.lock:
+            if key in self.results:
+                result, expires = self.results[key]
+                if expires is None or expires > time.monotonic():
+                    self.hits += 1
+                    self.results.move_to_end(key)
+                    return list(result)
+                del self.results[key]
+            self.misses += 1
+
+        result = list(run_query())
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.lock:
+            self.results[key] = (result, expires)
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+        return list(result)
+
+    def invalidate(self, connection=None):
+        """Remove the results for the connection or, if connection is None,
+        all results."""
+        with self.lock:
+            if connection is None:
+                self.results.clear()
+            else:
+                for key in [key for key in self.results
+                            if key[0] == connection]:
+                    del self.results[key]
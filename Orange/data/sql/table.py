@@ -1,31 +1,46 @@
 """
-Support for example tables wrapping data stored on a PostgreSQL server.
+Support for example tables wrapping data stored on a PostgreSQL server
+or in another database supported by a backend.
 """
+import collections
 import functools
-import re
 import threading
 from contextlib import contextmanager
 
 import numpy as np
 
-import Orange.misc
-psycopg2 = Orange.misc.import_late_warning("psycopg2")
-psycopg2.pool = Orange.misc.import_late_warning("psycopg2.pool")
-
 from .. import domain, variable, value, table, instance, filter,\
     DiscreteVariable, ContinuousVariable, StringVariable
 from Orange.data.sql import filter as sql_filter
+from Orange.data.sql.backend import PostgresBackend
+from Orange.data.sql.backend.base import CONTINUOUS, INTEGER, BOOLEAN, TEXT
 
 LARGE_TABLE = 100000
 DEFAULT_SAMPLE_TIME = 1
 
 
 class SqlTable(table.Table):
+    backend = PostgresBackend()
     connection_pool = None
+    # Set to a QueryCache to share the results of aggregate queries among
+    # all tables on the same database; by default, the database is always
+    # queried. Queries run while a table is created are never cached.
+    query_cache = None
+    _creating = False
+    # Whether statistics of large tables are computed on a sample
+    auto_sample = True
+    # Connections in use, tracked only for queries that can be cancelled
+    _connections = None
     table_name = None
     domain = None
     row_filters = ()
 
+    # Rows are fetched from the server in chunks of this size when the data
+    # is downloaded; tables that would take more memory than
+    # download_memory_limit (in bytes) are not downloaded implicitly.
+    download_chunk_size = 10000
+    download_memory_limit = 100 * 2 ** 20
+
     def __new__(cls, *args, **kwargs):
         # We do not (yet) need the magic of the Table.__new__, so we call it
         # with no parameters.
@@ -33,7 +48,7 @@ class SqlTable(table.Table):
 
     def __init__(
             self, connection_params, table_or_sql,
-            type_hints=None, inspect_values=False):
+            type_hints=None, inspect_values=False, backend=None):
         """
         Create a new proxy for sql table.
 
@@ -64,12 +79,22 @@ class SqlTable(table.Table):
         type_hints parameter. Variables from the domain are used for
         the columns with the matching names; for columns without the matching
         name in the domain, types are inferred as described above.
+
+        Tables in databases other than PostgreSQL are accessed by giving
+        a backend class, for instance
+
+            table = SqlTable('data.db', 'table_name', backend=SQLiteBackend)
+
+        Such tables always use their own connection pool.
         """
         if isinstance(connection_params, str):
             connection_params = dict(database=connection_params)
         self.connection_params = connection_params
 
-        if self.connection_pool is None:
+        if backend is not None:
+            self.backend = backend()
+            self.create_connection_pool()
+        elif self.connection_pool is None:
             self.create_connection_pool()
 
         if table_or_sql is not None:
@@ -78,39 +103,39 @@ class SqlTable(table.Table):
             else:
                 table = self.quote_identifier(table_or_sql)
             self.table_name = table
-            self.domain = self.get_domain(type_hints, inspect_values)
+            self._creating = True
+            try:
+                self.domain = self.get_domain(type_hints, inspect_values)
+            finally:
+                self._creating = False
             self.name = table
 
     def create_connection_pool(self):
-        self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
-            1, 16, **self.connection_params)
+        self.connection_pool = self.backend.create_connection_pool(
+            self.connection_params)
 
     def get_domain(self, type_hints=None, guess_values=False):
         if type_hints is None:
             type_hints = domain.Domain([])
 
-        fields = []
-        query = "SELECT * FROM %s LIMIT 0" % self.table_name
-        with self._execute_sql_query(query) as cur:
-            for col in cur.description:
-                fields.append(col)
+        fields = self.backend.get_fields(self)
 
         def add_to_sql(var, field_name):
             if var.is_continuous:
-                var.to_sql = ToSql("({})::double precision".format(
+                var.to_sql = ToSql(self.backend.cast_continuous(
                     self.quote_identifier(field_name)))
             elif var.is_discrete:
-                var.to_sql = ToSql("({})::text".format(
+                var.to_sql = ToSql(self.backend.cast_text(
                     self.quote_identifier(field_name)))
             else:
                 var.to_sql = ToSql(self.quote_identifier(field_name))
 
         attrs, class_vars, metas = [], [], []
-        for field_name, type_code, *rest in fields:
+        for field_name, field_kind in fields:
             if field_name in type_hints:
                 var = type_hints[field_name]
             else:
-                var = self.get_variable(field_name, type_code, guess_values)
+                var = self.get_variable(field_name, field_kind, guess_values)
             add_to_sql(var, field_name)
 
             if var.is_string:
@@ -125,26 +150,21 @@ class SqlTable(table.Table):
 
         return domain.Domain(attrs, class_vars, metas)
 
-    def get_variable(self, field_name, type_code, inspect_values=False):
-        FLOATISH_TYPES = (700, 701, 1700)  # real, float8, numeric
-        INT_TYPES = (20, 21, 23)  # bigint, int, smallint
-        CHAR_TYPES = (25, 1042, 1043,)  # text, char, varchar
-        BOOLEAN_TYPES = (16,)  # bool
-
-        if type_code in FLOATISH_TYPES:
+    def get_variable(self, field_name, field_kind, inspect_values=False):
+        if field_kind == CONTINUOUS:
             return ContinuousVariable(field_name)
 
-        if type_code in INT_TYPES:  # bigint, int, smallint
+        if field_kind == INTEGER:
             if inspect_values:
                 values = self.get_distinct_values(field_name)
                 if values:
                     return DiscreteVariable(field_name, values)
             return ContinuousVariable(field_name)
 
-        if type_code in BOOLEAN_TYPES:
+        if field_kind == BOOLEAN:
             return DiscreteVariable(field_name, ['false', 'true'])
 
-        if type_code in CHAR_TYPES:
+        if field_kind == TEXT:
             if inspect_values:
                 values = self.get_distinct_values(field_name)
                 if values:
@@ -153,15 +173,14 @@ class SqlTable(table.Table):
         return StringVariable(field_name)
 
     def get_distinct_values(self, field_name):
-        sql = " ".join(["SELECT DISTINCT (%s)::text" %
-                            self.quote_identifier(field_name),
+        sql = " ".join(["SELECT DISTINCT %s" % self.backend.cast_text(
+                            self.quote_identifier(field_name)),
                         "FROM", self.table_name,
                         "WHERE {} IS NOT NULL".format(
                             self.quote_identifier(field_name)),
                         "ORDER BY", self.quote_identifier(field_name),
                         "LIMIT 21"])
-        with self._execute_sql_query(sql) as cur:
-            values = cur.fetchall()
+        values = self._fetch_all(sql)
         if len(values) > 20:
             return ()
         else:
@@ -173,6 +192,10 @@ class SqlTable(table.Table):
         If a single row is requested, it is fetched from the database and
         returned as a SqlRowInstance.
 
+        If a sequence, a mask or a slice of rows is requested, only the
+        selected rows are fetched from the database and returned as an
+        ordinary Table.
+
         A new SqlTable with appropriate filters is constructed and returned
         otherwise.
         """
@@ -194,26 +217,28 @@ class SqlTable(table.Table):
                 var = self.domain[col_idx]
                 return value.Value(
                     var,
-                    self._query(self.table_name, var, rows=[row_idx])
+                    next(self._query([var], rows=[row_idx]))[0]
                 )
             except TypeError:
                 pass
-
-        elif not (row_idx is Ellipsis or row_idx == slice(None)):
-            # TODO if row_idx specify multiple rows, one of the following must
-            # happen
-            #  - the new table remembers which rows are selected (implement
-            #     table.limit_rows and whatever else is necessary)
-            #  - return an ordinary (non-SQL) Table
-            #  - raise an exception
-            raise NotImplementedError("Row indices must be integers.")
-
-        # multiple rows OR single row but multiple columns:
-        # construct a new table
-        table = self.copy()
-        table.domain = self.domain.select_columns(col_idx)
-        # table.limit_rows(row_idx)
-        return table
+            row_idx = [row_idx]
+
+        selected = self.copy()
+        selected.domain = self.domain.select_columns(col_idx)
+        if row_idx is Ellipsis or \
+                isinstance(row_idx, slice) and row_idx == slice(None):
+            # multiple columns: construct a new table
+            return selected
+
+        # multiple rows: fetch them into an ordinary table
+        if isinstance(row_idx, slice):
+            row_idx = range(*row_idx.indices(len(self)))
+        else:
+            row_idx = np.asarray(row_idx)
+            if row_idx.dtype == bool:
+                row_idx = np.flatnonzero(row_idx)
+        X, Y, metas = selected._download(rows=row_idx)
+        return table.Table.from_numpy(selected.domain, X, Y, metas)
 
     #@functools.lru_cache(maxsize=128)
     def _fetch_row(self, row_index):
@@ -228,10 +253,11 @@ class SqlTable(table.Table):
         """
         attributes = self.domain.variables + self.domain.metas
 
-        for row in self._query(attributes):
+        for row in self._query(attributes, server_side=True):
             yield SqlRowInstance(self.domain, row)
 
-    def _query(self, attributes=None, filters=(), rows=None):
+    def _query(self, attributes=None, filters=(), rows=None,
+               server_side=False, chunk_size=None):
         if attributes is not None:
             fields = []
             for attr in attributes:
@@ -246,35 +272,108 @@ class SqlTable(table.Table):
 
         filters = [f.to_sql() for f in filters]
 
-        offset = limit = None
-        if rows is not None:
-            if isinstance(rows, slice):
-                offset = rows.start or 0
-                if rows.stop is not None:
-                    limit = rows.stop - offset
-            else:
-                rows = list(rows)
-                offset, stop = min(rows), max(rows)
-                limit = stop - offset + 1
+        if rows is not None and not isinstance(rows, slice):
+            yield from self._query_rows(fields, filters, rows, server_side,
+                                        chunk_size)
+            return
 
-        # TODO: this returns all rows between min(rows) and max(rows): fix!
-        query = self._sql_query(fields, filters, offset=offset, limit=limit)
-        with self._execute_sql_query(query) as cur:
+        offset = limit = order_by = None
+        if rows is not None:
+            offset = rows.start or 0
+            if rows.stop is not None:
+                limit = rows.stop - offset
+            order_by = self._row_order() or None
+
+        query = self._sql_query(fields, filters, order_by=order_by,
+                                offset=offset, limit=limit)
+        chunk_size = chunk_size or self.download_chunk_size
+        with self._execute_sql_query(query, server_side=server_side) as cur:
+            while True:
+                chunk = cur.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                yield from chunk
+
+    # Row sets larger than this are selected in the way the backend
+    # prefers for large sets.
+    row_array_limit = 1000
+
+    def _query_rows(self, fields, filters, rows, server_side=False,
+                    chunk_size=None):
+        """Yield the rows with the given indices, in the given order.
+
+        Rows are numbered with row_number(), ordered by the primary key
+        where the backend can tell it, so that only the selected rows are
+        transferred from the server."""
+        rows = [int(row) for row in rows]
+        if not rows:
+            return
+        if min(rows) < 0:
+            n_rows = len(self)
+            rows = [row + n_rows if row < 0 else row for row in rows]
+        row_numbers = sorted(set(row + 1 for row in rows))
+
+        order = self._row_order()
+        numbered = self._sql_query(
+            ["*", "row_number() OVER (%s) AS __row_number" % (
+                "ORDER BY " + ", ".join(order) if order else "")],
+            filters)
+        if fields != ["*"]:
+            fields = fields + ["__row_number"]
+        query, params = self.backend.row_set_query(
+            fields, numbered, row_numbers,
+            large=len(row_numbers) > self.row_array_limit)
+
+        fetched = {}
+        chunk_size = chunk_size or self.download_chunk_size
+        with self._execute_sql_query(query, params,
+                                     server_side=server_side) as cur:
             while True:
-                row = cur.fetchone()
-                if row is None:
+                chunk = cur.fetchmany(chunk_size)
+                if not chunk:
                     break
-                yield row
+                for row in chunk:
+                    fetched[row[-1]] = row[:-1]
+        for row in rows:
+            if row + 1 not in fetched:
+                raise IndexError("Row index %d is out of range." % row)
+            yield fetched[row + 1]
+
+    _cached_row_order = None
+
+    def _row_order(self):
+        """Return the expressions that order the rows (see
+        :obj:`Backend.row_order`), querying the backend only once."""
+        if self._cached_row_order is None:
+            self._cached_row_order = self.backend.row_order(self) or []
+        return self._cached_row_order
+
+    def _query_chunks(self, attributes, rows=None, chunk_size=None):
+        """Yield the values of attributes in lists of at most chunk_size
+        rows, fetched through a server-side cursor."""
+        chunk_size = chunk_size or self.download_chunk_size
+        chunk = []
+        for row in self._query(attributes, rows=rows, server_side=True,
+                               chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
     def copy(self):
         """Return a copy of the SqlTable"""
         table = SqlTable.__new__(SqlTable)
+        table.backend = self.backend
         table.connection_pool = self.connection_pool
         table.domain = self.domain
         table.row_filters = self.row_filters
         table.table_name = self.table_name
         table.name = self.name
         table.connection_params = self.connection_params
+        table.auto_sample = self.auto_sample
+        table._connections = self._connections
         return table
 
     def __bool__(self):
@@ -296,53 +395,137 @@ class SqlTable(table.Table):
 
     def _count_rows(self):
         query = self._sql_query(["COUNT(*)"])
-        with self._execute_sql_query(query) as cur:
-            self._cached__len__ = cur.fetchone()[0]
+        self._cached__len__ = self._fetch_all(query)[0][0]
         return self._cached__len__
 
     def approx_len(self, get_exact=False):
         if self._cached__len__ is not None:
             return self._cached__len__
-        sql = "EXPLAIN " + self._sql_query(["*"])
-        with self._execute_sql_query(sql) as cur:
-            s = ''.join(row[0] for row in cur.fetchall())
-        alen = int(re.findall('rows=(\d*)', s)[0])
+        alen = self.backend.count_approx(self, self._sql_query(["*"]))
+        if alen is None:
+            return len(self)
         if get_exact:
             threading.Thread(target=len, args=(self,)).start()
         return alen
 
     _X = None
     _Y = None
+    _metas = None
+
+    def _bytes_per_row(self):
+        """Estimate the memory needed for one downloaded row."""
+        n_values = len(self.domain.variables)
+        # Meta attributes are usually strings; count a pointer and a short
+        # string object for each of them.
+        return 8 * n_values + 64 * len(self.domain.metas)
+
+    def download_data(self, limit=None, memory_limit=None, chunk_size=None):
+        """
+        Download SQL data and store it in memory as numpy matrices.
 
-    def download_data(self, limit=None):
-        """Download SQL data and store it in memory as numpy matrices."""
-        if limit and len(self) > limit: #TODO: faster check for size limit
+        Rows are fetched through a server-side cursor in chunks of
+        `chunk_size` rows and decoded directly into preallocated arrays.
+        A ValueError is raised if the table has more than `limit` rows or
+        if the data would take more than `memory_limit` bytes.
+        """
+        n_rows = len(self)
+        if limit and n_rows > limit:
             raise ValueError("Too many rows to download the data into memory.")
-        self._X = np.vstack(row._x for row in self)
-        self._Y = np.vstack(row._y for row in self)
+        if memory_limit and n_rows * self._bytes_per_row() > memory_limit:
+            raise ValueError("Too much data to download into memory.")
+        self._X, self._Y, self._metas = self._download(
+            n_rows=n_rows, chunk_size=chunk_size)
         self._cached__len__ = self._X.shape[0]
 
+    def _download(self, rows=None, n_rows=None, chunk_size=None):
+        """Fetch the given rows (all by default) and return arrays X, Y and
+        metas."""
+        if n_rows is None:
+            n_rows = len(self) if rows is None else len(rows)
+        attributes = self.domain.variables + self.domain.metas
+        X, Y, metas = self._empty_arrays(n_rows)
+        decoders = [_column_decoder(var) for var in attributes]
+
+        start = 0
+        for chunk in self._query_chunks(attributes, rows, chunk_size):
+            stop = start + len(chunk)
+            if stop > len(X):
+                # The table grew since it was counted.
+                size = max(stop, 2 * len(X))
+                X, Y, metas = [_resized(a, size) for a in (X, Y, metas)]
+            self._decode_chunk(chunk, decoders, X, Y, metas, start)
+            start = stop
+        return X[:start], Y[:start], metas[:start]
+
+    def _empty_arrays(self, n_rows):
+        n_attrs = len(self.domain.attributes)
+        n_vars = len(self.domain.variables)
+        return (np.empty((n_rows, n_attrs)),
+                np.empty((n_rows, n_vars - n_attrs)),
+                np.empty((n_rows, len(self.domain.metas)), dtype=object))
+
+    def _decode_chunk(self, chunk, decoders, X, Y, metas, start=0):
+        """Decode the fetched rows into X, Y and metas from row start on."""
+        n_attrs = len(self.domain.attributes)
+        n_vars = len(self.domain.variables)
+        stop = start + len(chunk)
+        for i, column in enumerate(zip(*chunk)):
+            if i < n_attrs:
+                X[start:stop, i] = decoders[i](column)
+            elif i < n_vars:
+                Y[start:stop, i - n_attrs] = decoders[i](column)
+            else:
+                metas[start:stop, i - n_vars] = decoders[i](column)
+
+    def iter_chunks(self, rows_per_chunk=None):
+        """
+        Yield the rows of the table as ordinary tables of at most
+        `rows_per_chunk` rows (`download_chunk_size` by default).
+
+        All rows are fetched with a single query through a server-side
+        cursor and only one chunk is kept in memory at a time, so tables
+        that do not fit into memory can be processed chunk by chunk.
+        """
+        if self._X is not None:
+            # the data is already downloaded
+            yield from super().iter_chunks(
+                rows_per_chunk or self.download_chunk_size)
+            return
+        attributes = self.domain.variables + self.domain.metas
+        decoders = [_column_decoder(var) for var in attributes]
+        for chunk in self._query_chunks(attributes,
+                                        chunk_size=rows_per_chunk):
+            X, Y, metas = self._empty_arrays(len(chunk))
+            self._decode_chunk(chunk, decoders, X, Y, metas)
+            yield table.Table.from_numpy(self.domain, X, Y, metas)
+
     @property
     def X(self):
         """Numpy array with attribute values."""
         if self._X is None:
-            self.download_data(1000)
+            self.download_data(memory_limit=self.download_memory_limit)
         return self._X
 
     @property
     def Y(self):
         """Numpy array with class values."""
         if self._Y is None:
-            self.download_data(1000)
+            self.download_data(memory_limit=self.download_memory_limit)
         return self._Y
 
+    @property
+    def metas(self):
+        """Numpy array with meta attribute values."""
+        if self._metas is None:
+            self.download_data(memory_limit=self.download_memory_limit)
+        return self._metas
+
     def has_weights(self):
         return False
 
     def _compute_basic_stats(self, columns=None,
                              include_metas=False, compute_var=False):
-        if self.approx_len() > LARGE_TABLE:
-            self = self.sample_time(DEFAULT_SAMPLE_TIME)
+        self = self._statistics_sample()
 
         if columns is not None:
             columns = [self.domain[col] for col in columns]
@@ -356,11 +539,12 @@ class SqlTable(table.Table):
         columns = [(c.to_sql(), c.is_continuous) for c in columns]
         sql_fields = []
         for field_name, continuous in columns:
-            stats = self.CONTINUOUS_STATS if continuous else self.DISCRETE_STATS
-            sql_fields.append(stats % dict(field_name=field_name))
+            if continuous:
+                sql_fields.append(self.backend.continuous_stats(field_name))
+            else:
+                sql_fields.append(self.backend.discrete_stats(field_name))
         query = self._sql_query(sql_fields)
-        with self._execute_sql_query(query) as cur:
-            results = cur.fetchone()
+        results = self._fetch_all(query)[0]
         stats = []
         i = 0
         for ci, (field_name, continuous) in enumerate(columns):
@@ -372,9 +556,13 @@ class SqlTable(table.Table):
                 i += 2
         return stats
 
+    # If set, distributions and contingencies of continuous variables are
+    # computed as histograms with this many bins instead of counting every
+    # distinct value.
+    distribution_bins = None
+
     def _compute_distributions(self, columns=None):
-        if self.approx_len() > LARGE_TABLE:
-            self = self.sample_time(DEFAULT_SAMPLE_TIME)
+        self = self._statistics_sample()
 
         if columns is not None:
             columns = [self.domain[col] for col in columns]
@@ -383,33 +571,41 @@ class SqlTable(table.Table):
         return self._get_distributions(columns)
 
     def _get_distributions(self, columns):
+        """Compute distributions of all columns with a single query."""
+        if not columns:
+            return []
+        fields = self._group_fields(columns)
+        counts = self._count_groups([field for field, _ in fields])
+
         dists = []
-        for col in columns:
-            field_name = col.to_sql()
-            fields = field_name, "COUNT(%s)" % field_name
-            query = self._sql_query(fields,
-                                    filters=['%s IS NOT NULL' % field_name],
-                                    group_by=[field_name],
-                                    order_by=[field_name])
-            with self._execute_sql_query(query) as cur:
-                dist = np.array(cur.fetchall())
+        for col, (field, decode) in zip(columns, fields):
+            values = {}
+            unknowns = 0
+            for value, count in counts[field]:
+                value = decode(value)
+                if np.isnan(value):
+                    unknowns += count
+                else:
+                    values[value] = values.get(value, 0) + count
             if col.is_continuous:
-                dists.append((dist.T, []))
+                dist = np.array(sorted(values.items()), dtype=float)
+                dists.append((dist.reshape(-1, 2).T, unknowns))
             else:
-                dists.append((dist[:, 1].T, []))
+                dist = np.zeros(len(col.values))
+                for value, count in values.items():
+                    dist[int(value)] = count
+                dists.append((dist, unknowns))
         return dists
 
     def _compute_contingency(self, col_vars=None, row_var=None):
-        if self.approx_len() > LARGE_TABLE:
-            self = self.sample_time(DEFAULT_SAMPLE_TIME)
+        self = self._statistics_sample()
 
         if col_vars is None:
             col_vars = range(len(self.domain.variables))
-        if len(col_vars) != 1:
-            raise NotImplementedError("Contingency for multiple columns "
-                                      "has not yet been implemented.")
         if row_var is None:
-            raise NotImplementedError("Defaults have not been implemented yet")
+            row_var = self.domain.class_var
+            if row_var is None:
+                raise ValueError("No row variable")
 
         row = self.domain[row_var]
         if not row.is_discrete:
@@ -421,51 +617,144 @@ class SqlTable(table.Table):
                for var in columns):
             raise ValueError("contingency can be computed only for discrete "
                              "and continuous values")
+        if not columns:
+            return [], 0
 
         row_field = row.to_sql()
-
-        all_contingencies = [None] * len(columns)
-        for i, column in enumerate(columns):
-            column_field = column.to_sql()
-            fields = [row_field, column_field, "COUNT(%s)" % column_field]
-            group_by = [row_field, column_field]
-            order_by = [column_field]
-            filters = ['%s IS NOT NULL' % f
-                       for f in (row_field, column_field)]
-            query = self._sql_query(fields, filters=filters,
-                                    group_by=group_by, order_by=order_by)
-            with self._execute_sql_query(query) as cur:
-                data = list(cur.fetchall())
-                if column.is_continuous:
-                    all_contingencies[i] = \
-                        (self._continuous_contingencies(data, row), [])
+        fields = self._group_fields(columns)
+        counts = self._count_groups([field for field, _ in fields],
+                                    row_field)
+
+        n_rows = len(row.values)
+        unknown_rows = None
+        all_contingencies = []
+        for column, (field, decode) in zip(columns, fields):
+            values = {}
+            unknowns = np.zeros(n_rows)
+            rows_unknown = 0
+            for row_value, value, count in counts[field]:
+                row_value = row.to_val(row_value)
+                if np.isnan(row_value):
+                    rows_unknown += count
+                    continue
+                value = decode(value)
+                if np.isnan(value):
+                    unknowns[row_value] += count
                 else:
-                    all_contingencies[i] =\
-                        (self._discrete_contingencies(data, row, column), [])
-        return all_contingencies, None
-
-    def _continuous_contingencies(self, data, row):
-        values = np.zeros(len(data))
-        counts = np.zeros((len(row.values), len(data)))
-        last = None
-        i = -1
-        for row_value, column_value, count in data:
-            if column_value == last:
-                counts[row.to_val(row_value), i] += count
+                    if value not in values:
+                        values[value] = np.zeros(n_rows)
+                    values[value][row_value] += count
+            if unknown_rows is None:
+                unknown_rows = rows_unknown
+
+            values = sorted(values.items())
+            if column.is_continuous:
+                conts = (np.array([value for value, _ in values]),
+                         np.array([row_counts for _, row_counts in values]
+                                  ).reshape(-1, n_rows).T)
+            else:
+                conts = np.zeros((n_rows, len(column.values)))
+                for value, row_counts in values:
+                    conts[:, int(value)] = row_counts
+            all_contingencies.append((conts, unknowns))
+        return all_contingencies, unknown_rows
+
+    def _group_fields(self, columns):
+        """Return the SQL expression to group by and a function that decodes
+        the grouped values for each of the columns."""
+        def discrete_decoder(var):
+            def decode(value):
+                try:
+                    return var.to_val(value)
+                except ValueError:
+                    # values that are not in the domain count as unknown
+                    return np.nan
+            return decode
+
+        def continuous_decoder(value):
+            return np.nan if value is None else float(value)
+
+        def bin_decoder(low, width):
+            def decode(value):
+                return np.nan if value is None else low + (value - .5) * width
+            return decode
+
+        continuous = [col for col in columns if col.is_continuous]
+        if self.distribution_bins and continuous:
+            ranges = {col: stats[:2] for col, stats
+                      in zip(continuous, self._get_stats(continuous))}
+        else:
+            ranges = {}
+
+        fields = []
+        for col in columns:
+            field = col.to_sql()
+            if col.is_discrete:
+                fields.append((field, discrete_decoder(col)))
+                continue
+            low, high = ranges.get(col, (None, None))
+            if low is None or high is None or low >= high:
+                fields.append((field, continuous_decoder))
+                continue
+            n_bins = self.distribution_bins
+            # width_bucket puts the maximum into an extra bucket n_bins + 1
+            field = ("CASE WHEN {0} >= {2!r} THEN {3} "
+                     "ELSE width_bucket({0}, {1!r}, {2!r}, {3}) END").format(
+                field, float(low), float(high), n_bins)
+            fields.append((field, bin_decoder(low, (high - low) / n_bins)))
+        return fields
+
+    def _count_groups(self, fields, row_field=None):
+        """Count the rows for each value of each field with a single scan.
+
+        Returns a dictionary that maps every field to a list of tuples
+        (value, count) or, if row_field is given, (row value, value, count).
+        Unknown values are included as None.
+        """
+        fields = list(collections.OrderedDict.fromkeys(fields))
+        prefix = [row_field] if row_field is not None else []
+        if not self.backend.supports_grouping_sets:
+            return self._count_groups_union(fields, prefix)
+
+        # Rows are assigned to grouping sets by the fields that are grouped
+        # on; the row field is in every set, so its own set has no other
+        # field.
+        grouped = [field for field in fields if field != row_field]
+        grouping_sets = ["(%s)" % ", ".join(prefix + [field])
+                         for field in grouped]
+        if len(grouped) < len(fields):
+            grouping_sets.append("(%s)" % row_field)
+        query = self._sql_query(
+            prefix + grouped +
+            ["GROUPING(%s)" % field for field in grouped] + ["COUNT(*)"],
+            group_by=["GROUPING SETS (%s)" % ", ".join(grouping_sets)])
+
+        n_prefix, n_grouped = len(prefix), len(grouped)
+        counts = {field: [] for field in fields}
+        for row in self._fetch_all(query):
+            groupings = row[n_prefix + n_grouped:-1]
+            if 0 in groupings:
+                i = groupings.index(0)
+                field, value = grouped[i], row[n_prefix + i]
             else:
-                i += 1
-                last = column_value
-                values[i] = column_value
-                counts[row.to_val(row_value), i] += count
-        return (values, counts)
-
-    def _discrete_contingencies(self, data, row, column):
-        conts = np.zeros((len(row.values), len(column.values)))
-        for row_value, col_value, count in data:
-            row_index = row.to_val(row_value)
-            col_index = column.to_val(col_value)
-            conts[row_index, col_index] = count
-        return conts
+                field, value = row_field, row[0]
+            counts[field].append(row[:n_prefix] + (value, row[-1]))
+        return counts
+
+    def _count_groups_union(self, fields, prefix):
+        """Count the groups as _count_groups, with a UNION ALL of grouped
+        queries for databases without GROUPING SETS."""
+        queries = []
+        for i, field in enumerate(fields):
+            group_by = list(collections.OrderedDict.fromkeys(prefix + [field]))
+            queries.append(self._sql_query(
+                [str(i)] + prefix + [field, "COUNT(*)"], group_by=group_by))
+        query = " UNION ALL ".join(queries)
+
+        counts = {field: [] for field in fields}
+        for row in self._fetch_all(query):
+            counts[fields[row[0]]].append(row[1:])
+        return counts
 
     def X_density(self):
         return self.DENSE
@@ -548,7 +837,7 @@ class SqlTable(table.Table):
         return t2
 
     @classmethod
-    def from_table(cls, domain, source, row_indices=...):
+    def from_table(cls, domain, source, row_indices=..., lazy=False):
         assert row_indices is ...
 
         table = source.copy()
@@ -568,33 +857,67 @@ class SqlTable(table.Table):
             sql.extend(["GROUP BY", ", ".join(group_by)])
         if order_by is not None:
             sql.extend(["ORDER BY", ",".join(order_by)])
-        if offset is not None:
-            sql.extend(["OFFSET", str(offset)])
-        if limit is not None:
-            sql.extend(["LIMIT", str(limit)])
+        if offset is not None or limit is not None:
+            sql.append(self.backend.paging(offset, limit))
         return " ".join(sql)
 
-    DISCRETE_STATS = "SUM(CASE TRUE WHEN %(field_name)s IS NULL THEN 1 " \
-                     "ELSE 0 END), " \
-                     "SUM(CASE TRUE WHEN %(field_name)s IS NULL THEN 0 " \
-                     "ELSE 1 END)"
-    CONTINUOUS_STATS = "MIN(%(field_name)s)::double precision, " \
-                       "MAX(%(field_name)s)::double precision, " \
-                       "AVG(%(field_name)s)::double precision, " \
-                       "STDDEV(%(field_name)s)::double precision, " \
-                       + DISCRETE_STATS
-
     def quote_identifier(self, value):
-        return '"%s"' % value
+        return self.backend.quote_identifier(value)
 
     def unquote_identifier(self, value):
-        if value.startswith('"'):
-            return value[1:len(value)-1]
-        else:
-            return value
+        return self.backend.unquote_identifier(value)
 
     def quote_string(self, value):
-        return "'%s'" % value
+        return self.backend.quote_string(value)
+
+    def _statistics_sample(self):
+        """Return a time-limited sample of a large table, or the table
+        itself. The sample is a subquery, so no table is created."""
+        if not self.auto_sample or self.approx_len() <= LARGE_TABLE:
+            return self
+        sample = self._sample_subquery(
+            'system_time', int(DEFAULT_SAMPLE_TIME * 1000))
+        return sample if sample is not None else self
+
+    def _sample_subquery(self, method, parameter):
+        """Return a copy that reads from a sample of this table, or None if
+        the table is a query that cannot be sampled."""
+        if self.table_name.startswith("(") or "," in self.table_name:
+            return None
+        sample = self.copy()
+        sample.table_name = "(%s) AS __sample" % self.backend.sample_query(
+            self, method, parameter)
+        sample.auto_sample = False
+        return sample
+
+    def progressive_statistics(self, compute, callback,
+                               percentages=(1, 10), exact=True):
+        """
+        Compute statistics on growing samples in a background thread.
+
+        `compute` is called with samples of the given percentages of rows
+        and, if `exact` is set, with the whole table. Each result is passed
+        to `callback(result, percentage)`, where the percentage of the
+        exact result is 100; counts from samples are not scaled. Callbacks
+        are called from the background thread.
+
+        Samples are read through subqueries, so no tables are created in
+        the database. Return a :obj:`ProgressiveComputation` that can be
+        cancelled or waited for.
+        """
+        steps = []
+        for percentage in percentages:
+            if percentage < 100:
+                sample = self._sample_subquery('system', percentage)
+                if sample is not None:
+                    steps.append((sample, percentage))
+        if exact or not steps:
+            table = self.copy()
+            table.auto_sample = False
+            steps.append((table, 100))
+        computation = ProgressiveComputation(compute, callback, steps)
+        computation.start()
+        return computation
 
     def sample_percentage(self, percentage, no_cache=False):
         if percentage >= 100:
@@ -624,31 +947,65 @@ class SqlTable(table.Table):
                     cur.fetchall()
                 create = True
 
-        except psycopg2.ProgrammingError:
+        except self.backend.Error:
             create = True
 
         if create:
-            with self._execute_sql_query((
-                    "CREATE TABLE {target} AS "
-                    "SELECT * FROM {source} TABLESAMPLE {method}({param});"
-                    ).format(target=self.quote_identifier(sample_table),
-                         source=self.table_name,
-                         method=method,
-                         param=parameter)):
+            with self._execute_sql_query("CREATE TABLE {} AS {};".format(
+                    self.quote_identifier(sample_table),
+                    self.backend.sample_query(self, method, parameter))):
                 pass
+            # Results for a previous sample with the same name are stale
+            if self.query_cache is not None:
+                self.query_cache.invalidate(self._connection_key())
 
         sampled_table = self.copy()
         sampled_table.table_name = self.quote_identifier(sample_table)
         return sampled_table
 
+    def _connection_key(self):
+        """Identify the database for the query cache."""
+        return (type(self.backend).__name__,
+                tuple(sorted((key, str(value)) for key, value
+                             in self.connection_params.items())))
+
+    def _fetch_all(self, query, param=None):
+        """Run the query and return all rows. Results are taken from and
+        stored into the query cache, if any, except while the table is
+        created."""
+        def run_query():
+            with self._execute_sql_query(query, param) as cur:
+                return cur.fetchall()
+
+        if self.query_cache is None or self._creating:
+            return run_query()
+        return self.query_cache.fetch(
+            self._connection_key(), query, param, run_query)
+
+    def clear_cache(self):
+        """Remove cached query results for this table's database, for
+        instance after its data has changed."""
+        self._cached__len__ = None
+        if self.query_cache is not None:
+            self.query_cache.invalidate(self._connection_key())
+
     @contextmanager
-    def _execute_sql_query(self, query, param=None):
+    def _execute_sql_query(self, query, param=None, server_side=False):
         connection = self.connection_pool.getconn()
-        cur = connection.cursor()
+        if self._connections is not None:
+            self._connections.add(connection)
+        cur = self.backend.cursor(connection, server_side)
         try:
-            cur.execute(query, param)
+            if param is None:
+                cur.execute(query)
+            else:
+                cur.execute(query, param)
             yield cur
         finally:
+            if server_side:
+                cur.close()
+            if self._connections is not None:
+                self._connections.discard(connection)
             connection.commit()
             self.connection_pool.putconn(connection)
 
@@ -665,6 +1022,68 @@ class SqlTable(table.Table):
         self.create_connection_pool()
 
 
+class ProgressiveComputation:
+    """
+    Compute results on a sequence of tables, usually growing samples, in
+    a background thread and report each result through a callback.
+
+    .. attribute:: result
+
+        The last result, or None if no result has been computed yet.
+
+    .. attribute:: percentage
+
+        The percentage of rows the last result was computed from.
+    """
+    def __init__(self, compute, callback, steps):
+        self.compute = compute
+        self.callback = callback
+        self.steps = steps
+        self.result = self.percentage = self.error = None
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.connections = set()
+        self.backend = steps[0][0].backend
+        for table, _ in steps:
+            table._connections = self.connections
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        try:
+            for table, percentage in self.steps:
+                if self.cancelled.is_set():
+                    break
+                result = self.compute(table)
+                if self.cancelled.is_set():
+                    break
+                self.result, self.percentage = result, percentage
+                self.callback(result, percentage)
+        except Exception as error:
+            # Errors are expected when running queries are cancelled
+            if not self.cancelled.is_set():
+                self.error = error
+        finally:
+            self.finished.set()
+
+    def cancel(self):
+        """Stop the computation and cancel the queries that are running.
+        Results that are computed after cancellation are not reported."""
+        self.cancelled.set()
+        for connection in list(self.connections):
+            self.backend.cancel(connection)
+
+    def wait(self, timeout=None):
+        """Wait for the computation to finish and return the last result.
+        Errors raised by the computation are raised again."""
+        self.finished.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
 class SqlRowInstance(instance.Instance):
     """
     Extends :obj:`Orange.data.Instance` to correctly handle values of meta
@@ -678,6 +1097,29 @@ class SqlRowInstance(instance.Instance):
             self._metas = data[nvar:]
 
 
+def _column_decoder(var):
+    """Return a function that converts a column of values, as returned by
+    the database, to values of variable var."""
+    if var.is_continuous:
+        return lambda column: np.array(column, dtype=float)
+    elif var.is_discrete:
+        indices = {value: float(i) for i, value in enumerate(var.values)}
+
+        def decode(column):
+            return np.fromiter(
+                (indices[v] if v in indices else var.to_val(v)
+                 for v in column), dtype=float, count=len(column))
+        return decode
+    else:
+        return lambda column: [var.to_val(v) for v in column]
+
+
+def _resized(array, n_rows):
+    resized = np.empty((n_rows,) + array.shape[1:], dtype=array.dtype)
+    resized[:len(array)] = array
+    return resized
+
+
 class ToSql:
     def __init__(self, sql):
         self.sql = sql
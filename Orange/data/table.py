@@ -1,15 +1,18 @@
 import os
 import zlib
-from collections import MutableSequence, Iterable, Sequence, Sized
+from collections import MutableSequence, Iterable, Sequence, Sized, \
+    namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
 from numbers import Real, Integral
 import operator
-from functools import reduce
+from functools import reduce, partial
 from warnings import warn
 from threading import Lock
 import tempfile
 import urllib.parse
 import urllib.request
+import weakref
 
 import bottlechest as bn
 from scipy import sparse as sp
@@ -30,6 +33,10 @@ def get_sample_datasets_dir():
 
 dataset_dirs = ['', get_sample_datasets_dir()]
 
+# Whether Table.from_file keeps a binary cache next to the files it reads
+# by default. See io.NumpyDirectoryFormat.
+use_file_cache = False
+
 
 class RowInstance(Instance):
     sparse_x = None
@@ -69,6 +76,7 @@ class RowInstance(Instance):
         if not self.table.has_weights():
             self.table.set_weights()
         self.table.W[self.row_index] = weight
+        self.table.invalidate_statistics()
 
     def set_class(self, value):
         self._check_single_class()
@@ -77,6 +85,7 @@ class RowInstance(Instance):
         self._y[0] = value
         if self.sparse_y:
             self.table._Y[self.row_index, 0] = value
+        self.table.invalidate_statistics()
 
     def __setitem__(self, key, value):
         if not isinstance(key, Integral):
@@ -100,6 +109,7 @@ class RowInstance(Instance):
             self._metas[-1 - key] = value
             if self.sparse_metas:
                 self.table.metas[self.row_index, -1 - key] = value
+        self.table.invalidate_statistics()
 
     def _str(self, limit):
         def sp_values(matrix, variables):
@@ -140,6 +150,14 @@ class Columns:
             setattr(self, v.name.replace(" ", "_"), v)
 
 
+# Statistics of a column, as computed by Table.compute_column_summaries.
+# stats is a tuple (min, max, mean, variance, nans, non-nans) and
+# distribution a tuple (distribution, unknowns), in the format of
+# _compute_basic_stats and _compute_distributions; either is None if it
+# was not requested.
+ColumnSummary = namedtuple("ColumnSummary", ["stats", "distribution"])
+
+
 # noinspection PyPep8Naming
 class Table(MutableSequence, Storage):
     __file__ = None
@@ -157,6 +175,33 @@ class Table(MutableSequence, Storage):
     _next_instance_id = 0
     _next_instance_lock = Lock()
 
+    # If set to True (on a class or an instance), statistics computed by
+    # _compute_basic_stats, _compute_distributions and _compute_contingency
+    # are memoized per column until the table is modified through its
+    # methods or its arrays are replaced. Changes of the arrays' content
+    # (also through views) are not detected; call invalidate_statistics().
+    cache_statistics = False
+    _statistics_cache = None
+    _statistics_version = 0
+
+    # X, _Y, metas, W and ids may be views of the first rows of larger
+    # buffers, so rows can be appended without copying the data each time;
+    # the capacity grows by growth_factor. _buffers holds weak references
+    # to these views, to tell them from views of other tables' data.
+    growth_factor = 1.5
+    _buffers = None
+
+    @property
+    def n_rows(self):
+        """
+        The number of rows in the table; setting it resizes the table.
+        """
+        return self.X.shape[0]
+
+    @n_rows.setter
+    def n_rows(self, n_rows):
+        self._resize_all(n_rows)
+
     @property
     def Y(self):
         if self._Y.shape[1] == 1:
@@ -218,7 +263,6 @@ class Table(MutableSequence, Storage):
         #self = cls.__new__(Table)
         self = cls()
         self.domain = domain
-        self.n_rows = n_rows
         self.X = np.zeros((n_rows, len(domain.attributes)))
         self.Y = np.zeros((n_rows, len(domain.class_vars)))
         if weights:
@@ -232,14 +276,21 @@ class Table(MutableSequence, Storage):
     conversion_cache = None
 
     @classmethod
-    def from_table(cls, domain, source, row_indices=...):
+    def from_table(cls, domain, source, row_indices=..., lazy=False):
         """
         Create a new table from selected columns and/or rows of an existing
         one. The columns are chosen using a domain. The domain may also include
         variables that do not appear in the source table; they are computed
         from source variables if possible.
 
-        The resulting data may be a view or a copy of the existing data.
+        The resulting data is a copy of the existing data, unless the
+        domain is the same and the rows are given by a slice. If `lazy` is
+        set, columns that are selected from the source without conversion,
+        in an order with a constant step, and rows given by a slice or by
+        indices with a constant step give views of the source's arrays;
+        call :obj:`ensure_copy` before modifying such a table in place.
+        Arrays with computed columns are then computed on first access;
+        the source table should not be changed before that.
 
         :param domain: the domain for the new table
         :type domain: Orange.data.Domain
@@ -247,6 +298,9 @@ class Table(MutableSequence, Storage):
         :type source: Orange.data.Table
         :param row_indices: indices of the rows to include
         :type row_indices: a slice or a sequence
+        :param lazy: share the source's arrays instead of copying them and
+            postpone the computation of columns until needed
+        :type lazy: bool
         :return: a new table
         :rtype: Orange.data.Table
         """
@@ -258,17 +312,17 @@ class Table(MutableSequence, Storage):
             n_src_attrs = len(source.domain.attributes)
             if all(isinstance(x, Integral) and 0 <= x < n_src_attrs
                    for x in src_cols):
-                return _subarray(source.X, row_indices, src_cols)
+                return _subarray(source.X, row_indices, src_cols, lazy)
             if all(isinstance(x, Integral) and x < 0 for x in src_cols):
                 arr = _subarray(source.metas, row_indices,
-                                 [-1 - x for x in src_cols])
+                                [-1 - x for x in src_cols], lazy)
                 if arr.dtype != dtype:
                     return arr.astype(dtype)
                 return arr
             if all(isinstance(x, Integral) and x >= n_src_attrs
                    for x in src_cols):
                 return _subarray(source._Y, row_indices,
-                                 [x - n_src_attrs for x in src_cols])
+                                 [x - n_src_attrs for x in src_cols], lazy)
 
             a = np.empty((n_rows, len(src_cols)), dtype=dtype)
             for i, col in enumerate(src_cols):
@@ -287,12 +341,21 @@ class Table(MutableSequence, Storage):
                     a[:, i] = source._Y[row_indices, col - n_src_attrs]
             return a
 
+        def get_part(src_cols, n_cols, dtype=np.float64):
+            arr = get_columns(row_indices, src_cols, n_rows, dtype)
+            if arr.ndim == 1:
+                arr = arr.reshape(-1, n_cols)
+            return arr
+
+        if lazy:
+            row_indices = _as_slice(row_indices)
         new_cache = Table.conversion_cache is None
         try:
             if new_cache:
                 Table.conversion_cache = {}
             else:
-                cached = Table.conversion_cache.get((id(domain), id(source)))
+                cached = Table.conversion_cache.get(
+                    (id(domain), id(source), lazy))
                 if cached:
                     return cached
             if domain == source.domain:
@@ -313,18 +376,24 @@ class Table(MutableSequence, Storage):
             self = cls()
             self.domain = domain
             conversion = domain.get_conversion(source.domain)
-            self.X = get_columns(row_indices, conversion.attributes, n_rows)
-            if self.X.ndim == 1:
-                self.X = self.X.reshape(-1, len(self.domain.attributes))
-            self.Y = get_columns(row_indices, conversion.class_vars, n_rows)
-
-            dtype = np.float64
+            metas_dtype = np.float64
             if any(isinstance(var, StringVariable) for var in domain.metas):
-                dtype = np.object
-            self.metas = get_columns(row_indices, conversion.metas,
-                                     n_rows, dtype)
-            if self.metas.ndim == 1:
-                self.metas = self.metas.reshape(-1, len(self.domain.metas))
+                metas_dtype = np.object
+            pending = {}
+            for name, src_cols, n_cols, dtype in (
+                    ("X", conversion.attributes,
+                     len(domain.attributes), np.float64),
+                    ("_Y", conversion.class_vars,
+                     len(domain.class_vars), np.float64),
+                    ("metas", conversion.metas,
+                     len(domain.metas), metas_dtype)):
+                if lazy and not all(isinstance(x, Integral)
+                                    for x in src_cols):
+                    pending[name] = partial(get_part, src_cols, n_cols, dtype)
+                else:
+                    setattr(self, name, get_part(src_cols, n_cols, dtype))
+            if pending:
+                self._pending_columns = pending
             if source.has_weights():
                 self.W = np.array(source.W[row_indices])
             else:
@@ -334,12 +403,31 @@ class Table(MutableSequence, Storage):
                 self.ids = np.array(source.ids[row_indices])
             else:
                 cls._init_ids(self)
-            Table.conversion_cache[(id(domain), id(source))] = self
+            Table.conversion_cache[(id(domain), id(source), lazy)] = self
             return self
         finally:
             if new_cache:
                 Table.conversion_cache = None
 
+    def __getattr__(self, name):
+        # arrays of tables constructed by a lazy from_table are computed here
+        pending = self.__dict__.get("_pending_columns")
+        if pending and name in pending:
+            value = pending.pop(name)()
+            setattr(self, name, value)
+            return value
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def __getstate__(self):
+        for name in list(self.__dict__.get("_pending_columns", ())):
+            getattr(self, name)
+        state = self.__dict__.copy()
+        # arrays are pickled without their spare capacity
+        state.pop("_buffers", None)
+        state.pop("_statistics_cache", None)
+        return state
+
     @classmethod
     def from_table_rows(cls, source, row_indices):
         """
@@ -434,7 +522,6 @@ class Table(MutableSequence, Storage):
         self.Y = Y
         self.metas = metas
         self.W = W
-        self.n_rows = self.X.shape[0]
         cls._init_ids(self)
         return self
 
@@ -495,12 +582,19 @@ class Table(MutableSequence, Storage):
         writer().write_file(filename, self)
 
     @classmethod
-    def from_file(cls, filename):
+    def from_file(cls, filename, cache=None):
         """
         Read a data table from a file. The path can be absolute or relative.
 
+        With cache, a table read from a text or spreadsheet file is also
+        stored in a binary columnar cache next to the file, which is used
+        instead of the file as long as the file's modification time and
+        size do not change. The cached arrays are memory-mapped.
+
         :param filename: File name
         :type filename: str
+        :param cache: whether to use a cache; defaults to `use_file_cache`
+        :type cache: bool
         :return: a new data table
         :rtype: Orange.data.Table
         """
@@ -527,7 +621,18 @@ class Table(MutableSequence, Storage):
                     format(desc.lower()))
             else:
                 raise IOError("Unknown file name extension.")
-        data = reader().read_file(absolute_filename, cls)
+        if cache is None:
+            cache = use_file_cache
+        # Binary formats and directories are not cached.
+        cache = cache and reader not in (io.PickleFormat,
+                                         io.NumpyDirectoryFormat) \
+            and os.path.isfile(absolute_filename)
+        data = io.NumpyDirectoryFormat.read_cache(absolute_filename, cls) \
+            if cache else None
+        if data is None:
+            data = reader().read_file(absolute_filename, cls)
+            if cache:
+                io.NumpyDirectoryFormat.write_cache(absolute_filename, data)
         data.name = os.path.splitext(os.path.split(filename)[-1])[0]
         # no need to call _init_ids as fuctions from .io already
         # construct a table with .ids
@@ -550,6 +655,7 @@ class Table(MutableSequence, Storage):
     # Set the row of table data matrices
     # noinspection PyProtectedMember
     def _set_row(self, example, row):
+        self.invalidate_statistics()
         domain = self.domain
         if isinstance(example, Instance):
             if example.domain == domain:
@@ -587,38 +693,59 @@ class Table(MutableSequence, Storage):
                    for x in (self.X_density(), self.Y_density(),
                              self.metas_density()))
 
+    def _buffer(self, name):
+        """
+        Return the buffer that holds the array `name` and can be used to
+        resize it, or None if the array is a view of another's data.
+        Arrays memory-mapped from a file are the table's own buffers.
+        """
+        arr = getattr(self, name)
+        if sp.issparse(arr) or arr.base is None:
+            return arr
+        if isinstance(arr, np.memmap) and \
+                not isinstance(arr.base, np.ndarray):
+            return arr
+        if self._buffers and self._buffers[name]() is arr:
+            return arr.base
+        return None
+
     # A helper function for extend and insert
-    # Resize X, Y, metas and W.
+    # Resize X, Y, metas, W and ids; the capacity of their buffers grows
+    # geometrically, so that appending rows takes amortized constant time.
     def _resize_all(self, new_length):
         old_length = self.X.shape[0]
         if old_length == new_length:
             return
         if not self._check_all_dense():
             raise ValueError("Tables with sparse data cannot be resized")
-        try:
-            self.X.resize(new_length, self.X.shape[1], refcheck=False)
-            self._Y.resize(new_length, self._Y.shape[1], refcheck=False)
-            self.metas.resize(new_length, self.metas.shape[1], refcheck=False)
-            if self.W.ndim == 2:
-                self.W.resize((new_length, 0), refcheck=False)
-            else:
-                self.W.resize(new_length, refcheck=False)
-            self.ids.resize(new_length, refcheck=False)
-        except Exception:
-            if self.X.shape[0] == new_length:
-                self.X.resize(old_length, self.X.shape[1], refcheck=False)
-            if self._Y.shape[0] == new_length:
-                self._Y.resize(old_length, self._Y.shape[1], refcheck=False)
-            if self.metas.shape[0] == new_length:
-                self.metas.resize(old_length, self.metas.shape[1], refcheck=False)
-            if self.W.shape[0] == new_length:
-                if self.W.ndim == 2:
-                    self.W.resize((old_length, 0), refcheck=False)
-                else:
-                    self.W.resize(old_length, refcheck=False)
-            if self.ids.shape[0] == new_length:
-                self.ids.resize(old_length, refcheck=False)
-            raise
+        names = ("X", "_Y", "metas", "W", "ids")
+        buffers = []
+        for name in names:
+            arr, buffer = getattr(self, name), self._buffer(name)
+            if buffer is None:
+                raise ValueError(
+                    "cannot resize this array: it does not own its data")
+            fill = None if arr.dtype == object else 0
+            # memory-mapped buffers are replaced, since they cannot grow
+            # and may be read-only
+            if len(buffer) < new_length or isinstance(buffer, np.memmap):
+                capacity = max(new_length,
+                               int(len(buffer) * self.growth_factor))
+                new_buffer = np.empty((capacity, ) + arr.shape[1:],
+                                      arr.dtype)
+                n_copied = min(old_length, new_length)
+                new_buffer[:n_copied] = arr[:n_copied]
+                new_buffer[n_copied:] = fill
+                buffer = new_buffer
+            elif new_length > old_length:
+                buffer[old_length:new_length] = fill
+            buffers.append(buffer)
+        self.invalidate_statistics()
+        self._buffers = {}
+        for name, buffer in zip(names, buffers):
+            arr = buffer[:new_length]
+            setattr(self, name, arr)
+            self._buffers[name] = weakref.ref(arr)
 
     def __getitem__(self, key):
         if isinstance(key, Integral):
@@ -668,6 +795,7 @@ class Table(MutableSequence, Storage):
         if not self._check_all_dense():
             raise ValueError(
                 "Assignment to rows of sparse data is not supported")
+        self.invalidate_statistics()
         if not isinstance(key, tuple):
             if isinstance(value, Real):
                 self.X[key, :] = value
@@ -755,6 +883,7 @@ class Table(MutableSequence, Storage):
     def __delitem__(self, key):
         if not self._check_all_dense():
             raise ValueError("Rows of sparse data cannot be deleted")
+        self.invalidate_statistics()
         if key is ...:
             key = range(len(self))
         self.X = np.delete(self.X, key, axis=0)
@@ -765,6 +894,17 @@ class Table(MutableSequence, Storage):
     def __len__(self):
         return self.X.shape[0]
 
+    def iter_chunks(self, rows_per_chunk=10000):
+        """
+        Yield the rows of the table as tables of at most `rows_per_chunk`
+        rows. The chunks of a table that is stored in memory are views on
+        its arrays; tables that are not (e.g. those from a database) read
+        the rows of one chunk at a time.
+        """
+        for start in range(0, len(self), rows_per_chunk):
+            yield Table.from_table_rows(
+                self, slice(start, start + rows_per_chunk))
+
     def __str__(self):
         return "[" + ",\n ".join(str(ex) for ex in self)
 
@@ -859,6 +999,58 @@ class Table(MutableSequence, Storage):
             self._resize_all(old_length)
             raise
 
+    def extend_from_arrays(self, X, Y=None, metas=None, W=None):
+        """
+        Append rows given by arrays in the table's domain. Missing class
+        values and metas are unknown, and weights are 1 if the table is
+        weighted.
+
+        :param X: attribute values, shape (n, number of attributes)
+        :type X: np.ndarray
+        :param Y: class values, shape (n, ) or (n, number of class vars)
+        :type Y: np.ndarray
+        :param metas: meta attributes, shape (n, number of metas)
+        :type metas: np.ndarray
+        :param W: weights, shape (n, )
+        :type W: np.ndarray
+        """
+        domain = self.domain
+        X, Y, W = _check_arrays(X, Y, W, dtype='float64')
+        n_rows = X.shape[0]
+        if Y is None:
+            Y = np.full((n_rows, len(domain.class_vars)), np.nan)
+        elif Y.ndim == 1:
+            Y = Y.reshape(-1, 1)
+        if metas is None:
+            metas = np.array([[var.Unknown for var in domain.metas]] * n_rows,
+                             dtype=self.metas.dtype
+                             ).reshape(n_rows, len(domain.metas))
+        else:
+            metas = _check_arrays(X, metas)[1]
+        for name, arr, n_cols in (("X", X, len(domain.attributes)),
+                                  ("Y", Y, len(domain.class_vars)),
+                                  ("metas", metas, len(domain.metas))):
+            if arr.shape != (n_rows, n_cols):
+                raise ValueError("Invalid shape of {}: expected {}, got {}"
+                                 .format(name, (n_rows, n_cols), arr.shape))
+
+        old_length = len(self)
+        self._resize_all(old_length + n_rows)
+        try:
+            self.X[old_length:] = X
+            self._Y[old_length:] = Y
+            self.metas[old_length:] = metas
+            if self.W.shape[-1]:
+                self.W[old_length:] = 1 if W is None else W
+            with type(self)._next_instance_lock:
+                self.ids[old_length:] = np.arange(
+                    type(self)._next_instance_id,
+                    type(self)._next_instance_id + n_rows)
+                type(self)._next_instance_id += n_rows
+        except Exception:
+            self._resize_all(old_length)
+            raise
+
     @staticmethod
     def concatenate(tables, axis=1):
         """Return concatenation of `tables` by `axis`."""
@@ -874,7 +1066,7 @@ class Table(MutableSequence, Storage):
             return table
         elif axis == CONCAT_COLS:
             from operator import iand, attrgetter
-            from functools import reduce
+            from functools import reduce, partial
             if reduce(iand,
                       (set(map(attrgetter('name'),
                                chain(t.domain.variables, t.domain.metas)))
@@ -900,31 +1092,36 @@ class Table(MutableSequence, Storage):
         """
         Return `True` if all arrays represent a view referring to another table
         """
-        return ((not self.X.shape[-1] or self.X.base is not None) and
-                (not self._Y.shape[-1] or self._Y.base is not None) and
-                (not self.metas.shape[-1] or self.metas.base is not None) and
-                (not self._weights.shape[-1] or self.W.base is not None))
+        return ((not self.X.shape[-1] or self._buffer("X") is None) and
+                (not self._Y.shape[-1] or self._buffer("_Y") is None) and
+                (not self.metas.shape[-1] or
+                 self._buffer("metas") is None) and
+                (not self.W.shape[-1] or self._buffer("W") is None))
 
     def is_copy(self):
         """
         Return `True` if the table owns its data
         """
-        return ((not self.X.shape[-1] or self.X.base is None) and
-                (self._Y.base is None) and
-                (self.metas.base is None) and
-                (self.W.base is None))
+        return ((not self.X.shape[-1] or self._buffer("X") is not None) and
+                (self._buffer("_Y") is not None) and
+                (self._buffer("metas") is not None) and
+                (self._buffer("W") is not None))
 
     def ensure_copy(self):
         """
-        Ensure that the table owns its data; copy arrays when necessary
+        Ensure that the table owns its data; copy arrays when necessary.
+
+        Tables constructed from other tables may share their arrays
+        (see :obj:`from_table`); this must be called before changing the
+        data in place, unless the change should also affect the source.
         """
-        if self.X.base is not None:
+        if self._buffer("X") is None:
             self.X = self.X.copy()
-        if self._Y.base is not None:
+        if self._buffer("_Y") is None:
             self._Y = self._Y.copy()
-        if self.metas.base is not None:
+        if self._buffer("metas") is None:
             self.metas = self.metas.copy()
-        if self.W.base is not None:
+        if self._buffer("W") is None:
             self.W = self.W.copy()
 
     def copy(self):
@@ -971,6 +1168,7 @@ class Table(MutableSequence, Storage):
         if not self.W.shape[-1]:
             self.W = np.empty(len(self))
         self.W[:] = weight
+        self.invalidate_statistics()
 
     def has_weights(self):
         """Return `True` if the data instances are weighed. """
@@ -1009,6 +1207,7 @@ class Table(MutableSequence, Storage):
         """Randomly shuffle the rows of the table."""
         if not self._check_all_dense():
             raise ValueError("Rows of sparse data cannot be shuffled")
+        self.invalidate_statistics()
         ind = np.arange(self.X.shape[0])
         np.random.shuffle(ind)
         self.X = self.X[ind]
@@ -1089,6 +1288,15 @@ class Table(MutableSequence, Storage):
         return Table.from_table_rows(self, sel)
 
     def _filter_values(self, filter):
+        sel = self._filter_values_indicators(filter)
+        return Table.from_table_rows(self, sel)
+
+    def _filter_values_indicators(self, filter):
+        """
+        Return a boolean vector that indicates the rows selected by the
+        filter, which is a :obj:`~Orange.data.filter.Values` filter or
+        a single condition.
+        """
         from Orange.data import filter as data_filter
 
         if isinstance(filter, data_filter.Values):
@@ -1194,41 +1402,98 @@ class Table(MutableSequence, Storage):
 
         if filter.negate:
             sel = ~sel
-        return Table.from_table_rows(self, sel)
+        return sel
+
+    def invalidate_statistics(self):
+        """
+        Discard the memoized statistics of the table.
+
+        Modifications through the table's methods and replacing its arrays
+        do this automatically. Call it after changing the content of the
+        arrays (X, Y, metas or W) directly.
+        """
+        self._statistics_version += 1
+        self._statistics_cache = None
+
+    def _statistics_arrays(self):
+        return self.X, self._Y, self.metas, self.W
+
+    def _statistics_cache_valid(self, cache):
+        version, refs, shapes, _ = cache
+        return (version == self._statistics_version and
+                all(ref() is arr and arr.shape == shape
+                    for ref, arr, shape in zip(
+                        refs, self._statistics_arrays(), shapes)))
+
+    def _cached_statistics(self, kind, columns, compute):
+        """
+        Return a list with statistics `kind` for the given column indices.
+
+        Statistics that are not memoized yet are computed by calling
+        `compute` with a list of the missing columns. The cache is cleared
+        when the table is modified or its arrays are replaced.
+        """
+        if not self.cache_statistics:
+            return compute(columns)
+        cache = self._statistics_cache
+        if cache is None or not self._statistics_cache_valid(cache):
+            # weak references tell replaced arrays without keeping them
+            arrays = self._statistics_arrays()
+            cache = self._statistics_cache = (
+                self._statistics_version,
+                tuple(weakref.ref(arr) for arr in arrays),
+                tuple(arr.shape for arr in arrays), {})
+        stats = cache[3]
+        missing = list(OrderedDict.fromkeys(
+            col for col in columns if (kind, col) not in stats))
+        if missing:
+            for col, stat in zip(missing, compute(missing)):
+                stats[(kind, col)] = stat
+        # callers may modify the returned arrays
+        return [_copy_statistic(stats[(kind, col)]) for col in columns]
 
     def _compute_basic_stats(self, columns=None,
                              include_metas=False, compute_variance=False):
         if compute_variance:
             raise NotImplementedError("computation of variance is "
                                       "not implemented yet")
+        if columns:
+            columns = [self.domain.index(c) for c in columns]
+            return self._cached_statistics(
+                "basic_stats", columns, self._compute_basic_stats_uncached)
+        domain = self.domain
+        columns = list(range(len(domain.variables)))
+        if include_metas:
+            columns += [-1 - i for i in range(len(domain.metas))]
+        if not columns:
+            return []
+        return np.vstack(self._cached_statistics(
+            "basic_stats", columns, self._compute_basic_stats_uncached))
+
+    def _compute_basic_stats_uncached(self, columns):
         W = self.W if self.has_weights() else None
-        rr = []
         stats = []
-        if not columns:
-            if self.domain.attributes:
-                rr.append(bn.stats(self.X, W))
-            if self.domain.class_vars:
-                rr.append(bn.stats(self._Y, W))
-            if include_metas and self.domain.metas:
-                rr.append(bn.stats(self.metas, W))
-            if len(rr):
-                stats = np.vstack(tuple(rr))
-        else:
-            columns = [self.domain.index(c) for c in columns]
-            nattrs = len(self.domain.attributes)
-            Xs = any(0 <= c < nattrs for c in columns) and bn.stats(self.X, W)
-            Ys = any(c >= nattrs for c in columns) and bn.stats(self._Y, W)
-            ms = any(c < 0 for c in columns) and bn.stats(self.metas, W)
-            for column in columns:
-                if 0 <= column < nattrs:
-                    stats.append(Xs[column, :])
-                elif column >= nattrs:
-                    stats.append(Ys[column - nattrs, :])
-                else:
-                    stats.append(ms[-1 - column])
+        nattrs = len(self.domain.attributes)
+        Xs = any(0 <= c < nattrs for c in columns) and bn.stats(self.X, W)
+        Ys = any(c >= nattrs for c in columns) and bn.stats(self._Y, W)
+        ms = any(c < 0 for c in columns) and bn.stats(self.metas, W)
+        for column in columns:
+            if 0 <= column < nattrs:
+                stats.append(Xs[column, :])
+            elif column >= nattrs:
+                stats.append(Ys[column - nattrs, :])
+            else:
+                stats.append(ms[-1 - column])
         return stats
 
     def _compute_distributions(self, columns=None):
+        if columns is None:
+            columns = range(len(self.domain.variables))
+        columns = [self.domain.index(var) for var in columns]
+        return self._cached_statistics(
+            "distribution", columns, self._compute_distributions_uncached)
+
+    def _compute_distributions_uncached(self, columns):
         def _get_matrix(M, cachedM, col):
             nonlocal single_column
             if not sp.issparse(M):
@@ -1247,12 +1512,7 @@ class Table(MutableSequence, Storage):
                 weights = None
             return data, weights, cachedM
 
-        if columns is None:
-            columns = range(len(self.domain.variables))
-            single_column = False
-        else:
-            columns = [self.domain.index(var) for var in columns]
-            single_column = len(columns) == 1 and len(self.domain) > 1
+        single_column = len(columns) == 1 and len(self.domain) > 1
         distributions = []
         Xcsc = Ycsc = None
         for col in columns:
@@ -1282,24 +1542,115 @@ class Table(MutableSequence, Storage):
 
         return distributions
 
-    def _compute_contingency(self, col_vars=None, row_var=None):
-        n_atts = self.X.shape[1]
+    def compute_column_summaries(self, columns=None,
+                                 want=("stats", "distribution"),
+                                 chunk_size=64, n_jobs=1):
+        """
+        Compute statistics and distributions of columns in a single pass.
+
+        Columns are processed in chunks of `chunk_size` columns, which are
+        copied into column-major blocks; sparse matrices are converted to
+        CSC only once. Chunks are processed by `n_jobs` threads.
 
+        :param columns: columns (indices, names or variables); all
+            variables by default
+        :param want: the statistics to compute, "stats" and/or
+            "distribution"
+        :return: a list of :obj:`ColumnSummary`
+        """
+        if columns is None:
+            columns = range(len(self.domain.variables))
+        columns = [self.domain.index(col) for col in columns]
+        variables = [self.domain[col] for col in columns]
+        if any(not var.is_primitive() for var in variables):
+            raise ValueError("summaries can be computed only for discrete "
+                             "and continuous values")
+
+        n_attrs = len(self.domain.attributes)
+        W = self.W.ravel() if self.has_weights() else None
+        arrays = {}
+        chunks = []
+        for name, array, in_array, index in (
+                ("X", self.X, lambda c: 0 <= c < n_attrs, lambda c: c),
+                ("Y", self._Y, lambda c: c >= n_attrs, lambda c: c - n_attrs),
+                ("metas", self.metas, lambda c: c < 0, lambda c: -1 - c)):
+            positions = [i for i, col in enumerate(columns) if in_array(col)]
+            if not positions:
+                continue
+            if sp.issparse(array):
+                array = sp.csc_matrix(array)
+            elif array.ndim == 1:
+                array = array.reshape(-1, 1)
+            arrays[name] = array
+            for start in range(0, len(positions), chunk_size):
+                chunk = positions[start:start + chunk_size]
+                chunks.append(
+                    (name, chunk, [index(columns[i]) for i in chunk]))
+
+        def summarize(chunk):
+            name, positions, indices = chunk
+            array = arrays[name]
+            summaries = []
+            if sp.issparse(array):
+                for pos, i in zip(positions, indices):
+                    begin, end = array.indptr[i], array.indptr[i + 1]
+                    values = array.data[begin:end].astype(float)
+                    rows = array.indices[begin:end]
+                    weights = None if W is None else W[rows]
+                    if W is None:
+                        n_zeros = array.shape[0] - len(rows)
+                    else:
+                        n_zeros = np.sum(W) - np.sum(weights)
+                    summaries.append(_column_summary(
+                        values, weights, n_zeros, variables[pos], want))
+            else:
+                block = np.array(array[:, indices], dtype=float, order="F")
+                for j, pos in enumerate(positions):
+                    summaries.append(_column_summary(
+                        block[:, j], W, 0, variables[pos], want))
+            return positions, summaries
+
+        if n_jobs > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(n_jobs) as executor:
+                results = list(executor.map(summarize, chunks))
+        else:
+            results = [summarize(chunk) for chunk in chunks]
+
+        column_summaries = [None] * len(columns)
+        for positions, summaries in results:
+            for pos, summary in zip(positions, summaries):
+                column_summaries[pos] = summary
+        return column_summaries
+
+    def _compute_contingency(self, col_vars=None, row_var=None):
         if col_vars is None:
             col_vars = range(len(self.domain.variables))
-            single_column = False
-        else:
-            col_vars = [self.domain.index(var) for var in col_vars]
-            single_column = len(col_vars) == 1 and len(self.domain) > 1
+        col_vars = [self.domain.index(var) for var in col_vars]
         if row_var is None:
             row_var = self.domain.class_var
             if row_var is None:
                 raise ValueError("No row variable")
+        row_indi = self.domain.index(row_var)
+
+        if not col_vars:
+            return self._compute_contingency_uncached(col_vars, row_indi)
 
-        row_desc = self.domain[row_var]
+        def compute(columns):
+            contingencies, unknown_rows = \
+                self._compute_contingency_uncached(columns, row_indi)
+            return [(cont, unknown_rows) for cont in contingencies]
+
+        # each column keeps the unknowns of the row variable with its
+        # contingency, so the result can be composed from cached columns
+        cached = self._cached_statistics(
+            ("contingency", row_indi), col_vars, compute)
+        return [cont for cont, _ in cached], cached[0][1]
+
+    def _compute_contingency_uncached(self, col_vars, row_indi):
+        n_atts = self.X.shape[1]
+        row_desc = self.domain[row_indi]
         if not row_desc.is_discrete:
             raise TypeError("Row variable must be discrete")
-        row_indi = self.domain.index(row_var)
         n_rows = len(row_desc.values)
         if 0 <= row_indi < n_atts:
             row_data = self.X[:, row_indi]
@@ -1385,6 +1736,70 @@ class Table(MutableSequence, Storage):
         return contingencies, unknown_rows
 
 
+def _copy_statistic(stat):
+    """Copy the arrays in a (possibly nested) memoized statistic."""
+    if isinstance(stat, (tuple, list)):
+        return type(stat)(_copy_statistic(part) for part in stat)
+    if hasattr(stat, "copy"):
+        return stat.copy()
+    return stat
+
+
+def _column_summary(values, weights, n_zeros, var, want):
+    """Compute a ColumnSummary of a column with values and weights (or
+    None); n_zeros is the number of implicit zeros of a sparse column."""
+    unknown = np.isnan(values)
+    known = values[~unknown]
+    if weights is None:
+        known_weights = np.ones(len(known))
+        nans = float(np.sum(unknown))
+    else:
+        known_weights = weights[~unknown]
+        nans = float(np.sum(weights[unknown]))
+    if n_zeros:
+        known = np.hstack((known, [0.]))
+        known_weights = np.hstack((known_weights, [float(n_zeros)]))
+
+    stats = distribution = None
+    if var.is_discrete:
+        counts = np.bincount(known.astype(int), weights=known_weights,
+                             minlength=len(var.values))
+    else:
+        # sorting gives both the value counts and the extremes
+        unique, inverse = np.unique(known, return_inverse=True)
+        counts = np.bincount(inverse, weights=known_weights,
+                             minlength=len(unique))
+    total = np.sum(known_weights)
+    if "stats" in want:
+        if total:
+            if var.is_discrete:
+                unique = np.flatnonzero(counts)
+                counts_unique = counts[unique]
+            else:
+                counts_unique = counts
+            mean = np.dot(unique, counts_unique) / total
+            variance = np.dot((unique - mean) ** 2, counts_unique) / total
+            stats = (unique[0], unique[-1], mean, variance, nans, total)
+        else:
+            stats = (np.inf, -np.inf, 0., 0., nans, 0.)
+    if "distribution" in want:
+        if n_zeros:
+            # distributions of sparse data count only the stored values
+            if var.is_discrete:
+                counts[0] -= n_zeros
+            else:
+                zero = np.searchsorted(unique, 0)
+                counts[zero] -= n_zeros
+                if np.isclose(counts[zero], 0):
+                    unique = np.delete(unique, zero)
+                    counts = np.delete(counts, zero)
+        if var.is_discrete:
+            distribution = (counts, nans)
+        else:
+            distribution = (np.vstack((unique, counts)), nans)
+    return ColumnSummary(stats, distribution)
+
+
 def _check_arrays(*arrays, dtype=None):
     checked = []
     if not len(arrays):
@@ -1429,10 +1844,41 @@ def _check_inf(array):
            np.isinf(array.data).any()
 
 
-def _subarray(arr, rows, cols):
+def _subarray(arr, rows, cols, as_view=False):
+    if as_view:
+        cols = _as_slice(cols)
     return arr[_rxc_ix(rows, cols)]
 
 
+def _as_slice(indices):
+    """
+    Return a slice equivalent to a sequence of indices with a constant
+    (non-zero) step, so that indexing by it gives a view. Other indices are
+    returned unchanged.
+    """
+    if isinstance(indices, slice) or indices is ... or not len(indices):
+        return indices
+    if isinstance(indices, np.ndarray):
+        if indices.ndim != 1 or indices.dtype.kind not in "iu" \
+                or indices.min() < 0:
+            return indices
+        steps = np.diff(indices.astype(np.intp, copy=False))
+        step = int(steps[0]) if len(steps) else 1
+        if step == 0 or np.any(steps != step):
+            return indices
+    else:
+        if not all(isinstance(i, Integral) and not isinstance(i, bool) and
+                   i >= 0 for i in indices):
+            return indices
+        step = indices[1] - indices[0] if len(indices) > 1 else 1
+        if step == 0 or any(b - a != step
+                            for a, b in zip(indices, indices[1:])):
+            return indices
+    start = int(indices[0])
+    stop = int(indices[-1]) + step
+    return slice(start, stop if stop >= 0 else None, step)
+
+
 def _rxc_ix(rows, cols):
     """
     Construct an index object to index the `rows` x `cols` cross product.
@@ -1,3 +1,4 @@
 from .clustering import *
+from .curves import *
 from .scoring import *
 from .testing import *
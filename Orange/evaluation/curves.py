@@ -0,0 +1,231 @@
+"""
+Performance curves (ROC, lift, calibration) and AUC computed for many
+methods and folds at once.
+
+The scores of each method are sorted once; points of the curves, their
+areas and calibration bins are then derived with array operations.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+__all__ = ["curve_points", "roc_curves", "lift_curves", "auc_scores",
+           "calibration_bins"]
+
+
+#: Points of the curves of methods (rows) in folds (columns)
+CurvePoints = namedtuple(
+    "CurvePoints",
+    ["fps",         # nested lists of arrays of false positive counts
+     "tps",         # nested lists of arrays of true positive counts
+     "thresholds",  # nested lists of arrays of thresholds (descending)
+     "positives",   # (methods, folds) array of the number of positives
+     "negatives",   # (methods, folds) array of the number of negatives
+     "auc",         # (methods, folds) array of areas under ROC curves
+     ]
+)
+
+
+def _fold_indices(n, folds):
+    """Return the index of fold for each of n instances (-1 for instances
+    that are not in any fold) and the number of folds."""
+    if folds is None:
+        return np.zeros(n, dtype=int), 1
+    groups = np.full(n, -1, dtype=int)
+    for i, fold in enumerate(folds):
+        groups[fold] = i
+    return groups, len(folds)
+
+
+def _prepare(positive, scores, folds):
+    scores = np.atleast_2d(np.asarray(scores, dtype=float))
+    positive = np.broadcast_to(np.asarray(positive, dtype=bool),
+                               scores.shape)
+    groups, nfolds = _fold_indices(scores.shape[1], folds)
+    if (groups < 0).any():
+        tested = groups >= 0
+        scores, positive = scores[:, tested], positive[:, tested]
+        groups = groups[tested]
+    return positive, scores, groups, nfolds
+
+
+def curve_points(positive, scores, folds=None, drop_intermediate=True):
+    """
+    Compute the points of ROC-like curves of methods in folds.
+
+    Scores of each method are sorted within each fold in descending order;
+    a point is placed at each distinct score (the threshold), with the
+    numbers of positive and negative instances whose scores are at least
+    as high.
+
+    :param positive: a flag telling whether an instance is positive, for
+        all methods (shape (n,)) or for each method (shape (methods, n))
+    :type positive: np.ndarray
+    :param scores: scores of methods, shape (methods, n)
+    :type scores: np.ndarray
+    :param folds: indices of instances in folds; None for a single fold
+    :type folds: list of slices or arrays of indices
+    :param drop_intermediate: whether to omit the points that lie on a
+        straight line between their neighbours
+    :type drop_intermediate: bool
+    :rtype: CurvePoints
+    """
+    positive, scores, groups, nfolds = _prepare(positive, scores, folds)
+    nmethods, n = scores.shape
+
+    # sort by descending score and then (stably) by fold; the order of
+    # folds is the same for all methods
+    order = np.argsort(-scores, axis=1)
+    rows = np.arange(nmethods)[:, None]
+    if nfolds > 1:
+        fold_order = np.argsort(
+            groups.astype(np.min_scalar_type(nfolds))[order], axis=1,
+            kind="mergesort")
+        order = order[rows, fold_order]
+        groups = np.sort(groups)
+    scores = scores[rows, order]
+    positive = positive[rows, order]
+    sizes = np.bincount(groups, minlength=nfolds)
+    starts = np.cumsum(sizes) - sizes
+
+    tps = np.cumsum(positive, axis=1)
+    tps_before = np.hstack((np.zeros((nmethods, 1), dtype=tps.dtype), tps))
+    tps -= tps_before[:, starts][:, groups]
+    fps = np.arange(1, n + 1) - starts[groups] - tps
+    positives = np.where(
+        sizes > 0, tps[:, np.maximum(starts + sizes - 1, 0)], 0)
+    negatives = sizes - positives
+
+    # the last instance with a score in a fold gives the point
+    last = np.ones(scores.shape, dtype=bool)
+    last[:, :-1] = (scores[:, 1:] != scores[:, :-1]) | \
+        (groups[1:] != groups[:-1])
+    r, c = np.nonzero(last)
+    fold = groups[c]
+    fp, tp, threshold = fps[r, c], tps[r, c], scores[r, c]
+    key = r * nfolds + fold
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = key[1:] != key[:-1]
+
+    # trapezoids between consecutive points, starting at (0, 0)
+    prev_fp, prev_tp = np.roll(fp, 1), np.roll(tp, 1)
+    prev_fp[first] = prev_tp[first] = 0
+    area = np.bincount(key, weights=(fp - prev_fp) * (tp + prev_tp) / 2,
+                       minlength=nmethods * nfolds).reshape(nmethods, nfolds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        auc = area / (positives * negatives)
+
+    if drop_intermediate and len(key) > 2:
+        lasts = np.ones(len(key), dtype=bool)
+        lasts[:-1] = first[1:]
+        inner = ~first & ~lasts
+        bent = np.ones(len(key), dtype=bool)
+        bent[1:-1] = (np.diff(fp, 2) != 0) | (np.diff(tp, 2) != 0)
+        keep = ~inner | bent
+        fp, tp, threshold, key = fp[keep], tp[keep], threshold[keep], \
+            key[keep]
+
+    bounds = np.searchsorted(key, np.arange(nmethods * nfolds + 1))
+
+    def split(values):
+        return [[values[bounds[i * nfolds + j]:bounds[i * nfolds + j + 1]]
+                 for j in range(nfolds)]
+                for i in range(nmethods)]
+
+    return CurvePoints(split(fp), split(tp), split(threshold),
+                       positives, negatives, auc)
+
+
+def auc_scores(positive, scores, folds=None):
+    """
+    Return the areas under ROC curves of methods (rows) in folds (columns);
+    nan where a fold has no positive or no negative instances.
+
+    Arguments are the same as for :obj:`curve_points`.
+    """
+    return curve_points(positive, scores, folds, drop_intermediate=False).auc
+
+
+def _with_origin(points, method, fold):
+    fps = points.fps[method][fold]
+    tps = points.tps[method][fold]
+    thresholds = points.thresholds[method][fold]
+    return (np.r_[0, fps], np.r_[0, tps],
+            np.r_[thresholds[0] + 1 if len(thresholds) else 1, thresholds])
+
+
+def roc_curves(positive, scores, folds=None, drop_intermediate=True):
+    """
+    Return ROC curves of methods (outer list) in folds (inner lists) as
+    tuples of arrays of false positive rates, true positive rates and
+    thresholds. Curves start at (0, 0) with a threshold that is above all
+    scores, like those from `sklearn.metrics.roc_curve`; curves of folds
+    without positive or negative instances are empty.
+
+    Arguments are the same as for :obj:`curve_points`.
+    """
+    points = curve_points(positive, scores, folds, drop_intermediate)
+    curves = []
+    for i, (positives, negatives) in enumerate(
+            zip(points.positives, points.negatives)):
+        method_curves = []
+        for j, (p, n) in enumerate(zip(positives, negatives)):
+            if p == 0 or n == 0:
+                empty = np.array([])
+                method_curves.append((empty, empty, empty))
+                continue
+            fps, tps, thresholds = _with_origin(points, i, j)
+            method_curves.append((fps / n, tps / p, thresholds))
+        curves.append(method_curves)
+    return curves
+
+
+def lift_curves(positive, scores, folds=None, drop_intermediate=True):
+    """
+    Return lift curves of methods (outer list) in folds (inner lists) as
+    tuples of arrays of the rates of instances predicted as positive,
+    true positive rates and thresholds.
+
+    Arguments are the same as for :obj:`curve_points`.
+    """
+    points = curve_points(positive, scores, folds, drop_intermediate)
+    curves = []
+    for i, (positives, negatives) in enumerate(
+            zip(points.positives, points.negatives)):
+        method_curves = []
+        for j, (p, n) in enumerate(zip(positives, negatives)):
+            fps, tps, thresholds = _with_origin(points, i, j)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                method_curves.append(
+                    ((fps + tps) / (p + n), tps / p, thresholds))
+        curves.append(method_curves)
+    return curves
+
+
+def calibration_bins(positive, scores, n_bins=20):
+    """
+    Count instances of methods (rows) in equally wide bins of scores
+    between 0 and 1.
+
+    :param positive: a flag telling whether an instance is positive, for
+        all methods (shape (n,)) or for each method (shape (methods, n))
+    :type positive: np.ndarray
+    :param scores: scores (probabilities) of methods, shape (methods, n)
+    :type scores: np.ndarray
+    :param n_bins: the number of bins
+    :type n_bins: int
+    :return: the number of instances, the number of positive instances
+        and the sum of scores in each bin; arrays of shape
+        (methods, n_bins)
+    """
+    positive, scores, _, _ = _prepare(positive, scores, None)
+    nmethods = scores.shape[0]
+    bins = np.clip((scores * n_bins).astype(int), 0, n_bins - 1)
+    bins += np.arange(nmethods)[:, None] * n_bins
+    size = nmethods * n_bins
+
+    def count(weights=None):
+        return np.bincount(bins.ravel(), weights=weights, minlength=size) \
+            .reshape(nmethods, n_bins)
+
+    return count(), count(positive.ravel()), count(scores.ravel())
@@ -3,6 +3,8 @@ import sys
 
 import numpy as np
 import sklearn.metrics as skl_metrics
+from Orange.evaluation.curves import auc_scores
+from Orange.evaluation.testing import ResultsStatistics
 from Orange.misc.wrapper_meta import WrapperMeta
 
 __all__ = ["CA", "Precision", "Recall", "F1", "PrecisionRecallFSupport", "AUC",
@@ -19,6 +21,9 @@ class Score(metaclass=WrapperMeta):
     """
     separate_folds = False
     is_scalar = True
+    #: Whether the score can be computed from
+    #: :obj:`Orange.evaluation.ResultsStatistics`
+    supports_statistics = False
 
     def __new__(cls, results=None, **kwargs):
         self = super().__new__(cls)
@@ -29,6 +34,10 @@ class Score(metaclass=WrapperMeta):
             return self
 
     def __call__(self, results, **kwargs):
+        if isinstance(results, ResultsStatistics):
+            return self.score_statistics(results, **kwargs)
+        if getattr(results, "statistics", None) is not None:
+            return self.score_statistics(results.statistics, **kwargs)
         if not (self.separate_folds and results.folds):
             return self.compute_score(results, **kwargs)
 
@@ -55,6 +64,23 @@ class Score(metaclass=WrapperMeta):
     def compute_score(self, results):
         return NotImplementedError
 
+    def score_statistics(self, statistics, **kwargs):
+        """Compute the score from :obj:`Orange.evaluation.ResultsStatistics`
+        (e.g. those of :obj:`Orange.evaluation.Results` in the streaming
+        mode)."""
+        if not self.supports_statistics:
+            raise TypeError("{} cannot be computed from statistics".format(
+                type(self).__name__))
+        if not (self.separate_folds and statistics.nfolds > 1):
+            return self.compute_score_statistics(statistics, **kwargs)
+        scores = [self.compute_score_statistics(statistics.get_fold(fold),
+                                                **kwargs)
+                  for fold in range(statistics.nfolds)]
+        return self.average(scores)
+
+    def compute_score_statistics(self, statistics):
+        raise NotImplementedError
+
     @staticmethod
     def from_predicted(results, score_function, **kwargs):
         return np.fromiter(
@@ -63,28 +89,76 @@ class Score(metaclass=WrapperMeta):
             dtype=np.float64, count=len(results.predicted))
 
 
+def _per_class_scores(statistics):
+    """Return the support, precision, recall and F1 for each method (rows)
+    and class (columns), computed from the confusion matrices."""
+    confusion = statistics.confusion.sum(axis=0)
+    true_positives = np.diagonal(confusion, axis1=1, axis2=2)
+    support = confusion.sum(axis=2)
+    predicted = confusion.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.nan_to_num(true_positives / predicted)
+        recall = np.nan_to_num(true_positives / support)
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    return support, precision, recall, f1
+
+
+def _check_binary(statistics):
+    confusion = statistics.confusion.sum(axis=(0, 1))
+    present = (confusion.sum(axis=0) + confusion.sum(axis=1)).nonzero()[0]
+    if len(present) and present[-1] > 1:
+        raise ValueError("Target is multiclass but average='binary'.")
+
+
+def _histogram_auc(histograms):
+    """Return the AUC computed from histograms of probabilities of
+    negative and positive instances (the last two axes), treating the
+    probabilities in the same bin as equal."""
+    negative, positive = histograms[..., 0, :], histograms[..., 1, :]
+    below = np.cumsum(negative, axis=-1) - negative
+    pairs = negative.sum(axis=-1) * positive.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.sum(positive * (below + negative / 2), axis=-1) / pairs
+
+
 ## Classification scores
 
 class CA(Score):
     __wraps__ = skl_metrics.accuracy_score
+    supports_statistics = True
 
     def compute_score(self, results):
         return self.from_predicted(results, skl_metrics.accuracy_score)
 
+    def compute_score_statistics(self, statistics):
+        confusion = statistics.confusion.sum(axis=0)
+        return np.trace(confusion, axis1=1, axis2=2) / \
+            confusion.sum(axis=(1, 2))
+
 
 class Precision(Score):
     __wraps__ = skl_metrics.precision_score
+    supports_statistics = True
 
     def compute_score(self, results):
         return self.from_predicted(results, skl_metrics.precision_score)
 
+    def compute_score_statistics(self, statistics):
+        _check_binary(statistics)
+        return _per_class_scores(statistics)[1][:, 1]
+
 
 class Recall(Score):
     __wraps__ = skl_metrics.recall_score
+    supports_statistics = True
 
     def compute_score(self, results):
         return self.from_predicted(results, skl_metrics.recall_score)
 
+    def compute_score_statistics(self, statistics):
+        _check_binary(statistics)
+        return _per_class_scores(statistics)[2][:, 1]
+
 
 class F1(Score):
     """
@@ -107,6 +181,7 @@ class F1(Score):
     array([ 0.9599359])
     """
     __wraps__ = skl_metrics.f1_score
+    supports_statistics = True
 
     def compute_score(self, results, target=None):
         if target is None:
@@ -120,6 +195,15 @@ class F1(Score):
                  for predicted in results.predicted),
                 dtype=np.float64, count=len(results.predicted))
 
+    def compute_score_statistics(self, statistics, target=None):
+        support, _, _, f1 = _per_class_scores(statistics)
+        if target is not None:
+            return f1[:, target]
+        if len(statistics.domain.class_var.values) <= 2:
+            _check_binary(statistics)
+            return f1[:, 1]
+        return np.sum(f1 * support, axis=1) / support.sum(axis=1)
+
 
 class PrecisionRecallFSupport(Score):
     __wraps__ = skl_metrics.precision_recall_fscore_support
@@ -143,6 +227,7 @@ class AUC(Score):
     """
     __wraps__ = skl_metrics.roc_auc_score
     separate_folds = True
+    supports_statistics = True
 
     def calculate_weights(self, results):
         classes = np.unique(results.actual)
@@ -156,15 +241,24 @@ class AUC(Score):
         else:
             return weights / wsum
 
+    @staticmethod
+    def roc_auc(positive, scores):
+        """Return the AUC of each method (rows of `scores`); all methods are
+        scored at once with :obj:`Orange.evaluation.curves.auc_scores`."""
+        aucs = auc_scores(positive, scores)[:, 0]
+        if np.isnan(aucs).any():
+            raise ValueError("Only one class present in y_true. "
+                             "ROC AUC score is not defined in that case.")
+        return aucs
+
     def multi_class_auc(self, results):
-        classes = np.unique(results.actual)
+        actual = np.asarray(results.actual)
+        classes = np.unique(actual)
         weights = self.calculate_weights(results)
 
-        auc_array = np.array([np.fromiter(
-            (skl_metrics.roc_auc_score(results.actual == class_, predicted)
-             for predicted in results.predicted == class_),
-            dtype=np.float64, count=len(results.predicted))
-                              for class_ in classes])
+        auc_array = np.array([
+            self.roc_auc(actual == class_, results.predicted == class_)
+            for class_ in classes])
 
         return np.sum(auc_array.T * weights, axis=1)
 
@@ -172,19 +266,51 @@ class AUC(Score):
         domain = results.domain
         n_classes = len(domain.class_var.values)
 
+        actual = np.asarray(results.actual)
         if n_classes < 2:
             raise ValueError("Class variable has less than two values")
         elif n_classes == 2:
-            return self.from_predicted(results, skl_metrics.roc_auc_score)
+            return self.roc_auc(actual == 1, results.predicted)
         else:
             if target is None:
                 return self.multi_class_auc(results)
             else:
-                y = np.array(results.actual == target, dtype=int)
-                return np.fromiter(
-                    (skl_metrics.roc_auc_score(y, probabilities[:, target])
-                     for probabilities in results.probabilities),
-                    dtype=np.float64, count=len(results.predicted))
+                return self.roc_auc(actual == target,
+                                    results.probabilities[:, :, target])
+
+    def compute_score_statistics(self, statistics, target=None):
+        """
+        Without a target, AUC is computed from predicted values (as in
+        :obj:`compute_score`), using the confusion matrices. With a target,
+        it is computed from the histograms of its probabilities.
+        """
+        n_classes = len(statistics.domain.class_var.values)
+        if n_classes < 2:
+            raise ValueError("Class variable has less than two values")
+        if target is not None:
+            return _histogram_auc(
+                statistics.histograms.sum(axis=0)[:, target])
+
+        confusion = statistics.confusion.sum(axis=0)
+        n_actual = confusion.sum(axis=2)
+        n_predicted = confusion.sum(axis=1)
+        true_positives = np.diagonal(confusion, axis1=1, axis2=2)
+        n = n_actual.sum(axis=1)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tpr = true_positives / n_actual
+            fpr = (n_predicted - true_positives) / (n - n_actual)
+        # AUC of binary predictions; equal predictions are ties
+        aucs = (1 + tpr - fpr) / 2
+        if n_classes == 2:
+            if not np.all(n_actual[:, 1] * (n - n_actual)[:, 1]):
+                raise ValueError("Only one class present in y_true. "
+                                 "ROC AUC score is not defined in that case.")
+            return aucs[:, 1]
+        weights = n_actual * (n - n_actual)
+        if not np.all(weights.sum(axis=1)):
+            raise ValueError("Class variable has less than two values")
+        weights = weights / weights.sum(axis=1)[:, None]
+        return np.sum(np.nan_to_num(aucs) * weights, axis=1)
 
 
 class LogLoss(Score):
@@ -232,29 +358,52 @@ class LogLoss(Score):
 
 class MSE(Score):
     __wraps__ = skl_metrics.mean_squared_error
+    supports_statistics = True
 
     def compute_score(self, results):
         return self.from_predicted(results, skl_metrics.mean_squared_error)
 
+    def compute_score_statistics(self, statistics):
+        moments = statistics.pooled_moments()
+        return moments[:, 1] / moments[:, 0]
+
 
 class RMSE(Score):
+    supports_statistics = True
+
     def compute_score(self, results):
         return np.sqrt(MSE(results))
 
+    def compute_score_statistics(self, statistics):
+        return np.sqrt(MSE().compute_score_statistics(statistics))
+
 
 class MAE(Score):
     __wraps__ = skl_metrics.mean_absolute_error
+    supports_statistics = True
 
     def compute_score(self, results):
         return self.from_predicted(results, skl_metrics.mean_absolute_error)
 
+    def compute_score_statistics(self, statistics):
+        moments = statistics.pooled_moments()
+        return moments[:, 2] / moments[:, 0]
+
 
 class R2(Score):
     __wraps__ = skl_metrics.r2_score
+    supports_statistics = True
 
     def compute_score(self, results):
         return self.from_predicted(results, skl_metrics.r2_score)
 
+    def compute_score_statistics(self, statistics):
+        moments = statistics.pooled_moments()
+        sse, sst = moments[:, 1], moments[:, 4]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(sst > 0, 1 - sse / sst,
+                            np.where(sse > 0, 0., 1.))
+
 
 ## CD scores and plot
 
@@ -1,11 +1,22 @@
+import os
+import pickle
+import shutil
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, \
+    as_completed
+from functools import lru_cache
+
 import numpy as np
 
 import sklearn.cross_validation as skl_cross_validation
 
 from Orange.data import Table
+from Orange.data.io import NumpyDirectoryFormat
+from Orange.preprocess.cache import PreprocessCache
 
-__all__ = ["Results", "CrossValidation", "LeaveOneOut", "TestOnTrainingData",
-           "ShuffleSplit", "TestOnTestData", "sample"]
+__all__ = ["Results", "ResultsStatistics", "CrossValidation", "LeaveOneOut",
+           "TestOnTrainingData", "ShuffleSplit", "TestOnTestData", "sample"]
 
 
 class Results:
@@ -26,7 +37,8 @@ class Results:
 
     .. attribute:: nrows
 
-        The number of test instances (including duplicates).
+        The number of test instances (including duplicates), also in the
+        streaming mode; `None` if not known.
 
     .. attribute:: models
 
@@ -54,7 +66,18 @@ class Results:
 
         A list of indices (or slice objects) corresponding to rows of each
         fold; `None` if not applicable.
+
+    .. attribute:: statistics
+
+        Sufficient statistics of predictions (:obj:`ResultsStatistics`) in
+        the streaming mode, in which :obj:`actual`, :obj:`predicted`,
+        :obj:`probabilities` and :obj:`row_indices` are not stored;
+        `None` otherwise.
     """
+    statistics = None
+    #: The number of test instances that are predicted at once when the
+    #: same data is used for testing all models in the streaming mode
+    chunk_size = 100000
 
     # noinspection PyBroadException
     # noinspection PyNoneFunctionAssignment
@@ -62,7 +85,8 @@ class Results:
                  store_data=False, store_models=False, domain=None,
                  actual=None, row_indices=None,
                  predicted=None, probabilities=None,
-                 preprocessor=None, callback=None):
+                 preprocessor=None, callback=None, n_jobs=1, executor=None,
+                 streaming=False):
         """
         Construct an instance with default values: `None` for :obj:`data` and
         :obj:`models`.
@@ -97,6 +121,16 @@ class Results:
         :param callback: Function for reporting back the progress as a value
             between 0 and 1
         :type callback: callable
+        :param n_jobs: The number of processes in which learners are trained
+            and tested on different folds
+        :type n_jobs: int
+        :param executor: An executor (e.g. `concurrent.futures`) that trains
+            and tests learners on folds, instead of a pool with `n_jobs`
+            processes
+        :type executor: concurrent.futures.Executor
+        :param streaming: A flag that tells whether to keep only the
+            :obj:`statistics` of predictions instead of the predictions
+        :type streaming: bool
         """
         self.store_data = store_data
         self.store_models = store_models
@@ -106,6 +140,8 @@ class Results:
         dtype = np.float32
         self.preprocessor = preprocessor
         self.callback = callback
+        self.n_jobs = n_jobs
+        self.executor = executor
 
         def set_or_raise(value, exp_values, msg):
             for exp_value in exp_values:
@@ -127,6 +163,7 @@ class Results:
                     predicted is not None and predicted.shape[1],
                     probabilities is not None and probabilities.shape[1]],
             "mismatching number of rows")
+        self.nrows = nrows
         nclasses = set_or_raise(
             nclasses, [domain and (len(domain.class_var.values)
                                    if domain.has_discrete_class
@@ -147,6 +184,11 @@ class Results:
         if nmethods is not None:
             self.failed = [False] * nmethods
 
+        if streaming:
+            self.statistics = ResultsStatistics(domain, nmethods)
+            self.failed = self.statistics.failed
+            return
+
         if actual is not None:
             self.actual = actual
         elif nrows is not None:
@@ -178,10 +220,117 @@ class Results:
             self.failed[learner_index] = ex
             return False
 
+    def _update_statistics(self, method, model, data):
+        """Predict the data in chunks of :obj:`chunk_size` instances and add
+        the predictions to :obj:`statistics`."""
+        for start in range(0, len(data), self.chunk_size):
+            chunk = data[start:start + self.chunk_size]
+            values, probs = _predict(model, chunk, self.domain)
+            if values is not None:
+                self.statistics.update(method, chunk.Y, values, probs)
+
     def call_callback(self, progress):
         if self.callback:
             self.callback(progress)
 
+    def _fit_folds(self, data, learners, folds):
+        """
+        Train the learners on the training rows of each fold and predict the
+        test rows. Yield a tuple (fold index, learner index, model, values,
+        probabilities) for each model in the order of folds and learners;
+        probabilities are None for continuous classes and both are None if
+        the data has no (single) class. Learners that fail are marked in
+        :obj:`failed` and skipped in the subsequent folds.
+
+        If :obj:`executor` is given or :obj:`n_jobs` is greater than 1, the
+        folds and learners are processed in parallel. The data is written
+        to a temporary directory from which processes memory-map it.
+
+        When the folds are processed sequentially, the learners that are
+        trained on the same fold share the preprocessed data through a
+        :obj:`~Orange.preprocess.cache.PreprocessCache`.
+
+        Models that are trained in other processes are pickled by the
+        task; learners whose models or predictions cannot be computed are
+        marked as failed. Models that cannot be pickled are replaced by
+        `None`, with a warning, and their predictions are kept.
+
+        :param folds: indices of training and test rows of each fold;
+            training rows `None` stand for all rows except the test rows
+        :type folds: a list of tuples of arrays
+        """
+        domain = data.domain
+        nmethods = len(learners)
+        n_callbacks = nmethods * len(folds)
+        if self.executor is None and self.n_jobs <= 1:
+            cache = PreprocessCache()
+            for fold_idx, (train, test) in enumerate(folds):
+                cache.clear()
+                train_data, test_data = _fold_data(data, train, test)
+                if self.preprocessor is not None:
+                    train_data = self.preprocessor(train_data)
+                for i, learner in enumerate(learners):
+                    with cache:
+                        model = self.train_if_succ(i, learner, train_data)
+                        prediction = model and \
+                            _predict(model, test_data, domain)
+                    self.call_callback(
+                        (fold_idx * nmethods + i) / n_callbacks)
+                    if model:
+                        yield (fold_idx, i, model) + prediction
+            return
+
+        executor = self.executor
+        directory = None
+        try:
+            pickled = not isinstance(executor, ThreadPoolExecutor)
+            if not pickled:
+                source = data
+            else:
+                try:
+                    directory = tempfile.mkdtemp()
+                    source = os.path.join(directory, "data.npytable")
+                    NumpyDirectoryFormat.write_file(source, data)
+                except ValueError:  # sparse data is pickled for each task
+                    source = data
+                if executor is None:
+                    executor = ProcessPoolExecutor(self.n_jobs)
+            futures = {
+                executor.submit(_fit_fold, source, train, test, learner,
+                                self.preprocessor, self.store_models,
+                                pickled):
+                    (fold_idx, i)
+                for fold_idx, (train, test) in enumerate(folds)
+                for i, learner in enumerate(learners)}
+            results = {}
+            for n_done, future in enumerate(as_completed(futures)):
+                try:
+                    result = future.result()
+                    if pickled and not isinstance(result, Exception):
+                        result = pickle.loads(result)
+                        if isinstance(result[0], _UnpicklableModel):
+                            warnings.warn(result[0].message, UserWarning)
+                            result = (None, ) + result[1:]
+                except Exception as ex:
+                    result = ex
+                results[futures[future]] = result
+                self.call_callback(n_done / n_callbacks)
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        for fold_idx in range(len(folds)):
+            for i in range(nmethods):
+                if self.failed[i]:
+                    continue
+                result = results[fold_idx, i]
+                if isinstance(result, Exception):
+                    self.failed[i] = result
+                    continue
+                yield (fold_idx, i) + result
+
     def get_fold(self, fold):
         results = Results()
         results.data = self.data
@@ -192,6 +341,15 @@ class Results:
         if self.models is not None:
             results.models = self.models[fold]
 
+        if self.statistics is not None:
+            results.statistics = self.statistics.get_fold(fold)
+            results.failed = results.statistics.failed
+            results.domain = self.domain
+            fold_rows = self.folds[fold]
+            results.nrows = len(range(*fold_rows.indices(self.nrows))) \
+                if isinstance(fold_rows, slice) else len(fold_rows)
+            return results
+
         results.row_indices = self.row_indices[self.folds[fold]]
         results.actual = self.actual[self.folds[fold]]
         results.predicted = self.predicted[:, self.folds[fold]]
@@ -203,6 +361,183 @@ class Results:
         return results
 
 
+class ResultsStatistics:
+    """
+    Sufficient statistics of predictions, from which scores are computed
+    without storing the predictions. Statistics are updated with chunks
+    of predictions and can be merged, so they can be collected in
+    parallel or for a test set that does not fit into memory.
+
+    Statistics are kept separately for each fold; all arrays are indexed
+    by the fold and by the method (learner).
+
+    .. attribute:: confusion
+
+        Counts of instances by actual (rows) and predicted (columns) class;
+        an array of shape (nfolds, nmethods, nclasses, nclasses).
+
+    .. attribute:: histograms
+
+        Counts of instances by the bin of the predicted probability of each
+        class, for instances that do not belong (index 0) and that belong
+        (index 1) to the class; an array of shape (nfolds, nmethods,
+        nclasses, 2, n_bins).
+
+    .. attribute:: moments
+
+        The number of instances, the sums of squared and absolute errors,
+        and the mean and the sum of squared deviations of the actual
+        values, for continuous classes; an array of shape (nfolds,
+        nmethods, 5).
+    """
+    def __init__(self, domain, nmethods, n_bins=1000):
+        """
+        :param domain: Domain of the data
+        :type domain: Orange.data.Domain
+        :param nmethods: The number of methods that are tested
+        :type nmethods: int
+        :param n_bins: The number of bins for probabilities; AUC treats the
+            probabilities within the same bin as equal
+        :type n_bins: int
+        """
+        self.domain = domain
+        self.nmethods = nmethods
+        self.n_bins = n_bins
+        self.failed = [False] * nmethods
+        self.nfolds = 0
+        if domain.has_discrete_class:
+            nclasses = len(domain.class_var.values)
+            self.confusion = np.zeros((0, nmethods, nclasses, nclasses),
+                                      dtype=np.int64)
+            self.histograms = np.zeros((0, nmethods, nclasses, 2, n_bins),
+                                       dtype=np.int64)
+        elif domain.has_continuous_class:
+            self.moments = np.zeros((0, nmethods, 5))
+        else:
+            raise ValueError("statistics require a single class variable")
+
+    def _arrays(self):
+        if self.domain.has_discrete_class:
+            return ["confusion", "histograms"]
+        return ["moments"]
+
+    def _ensure_folds(self, nfolds):
+        if nfolds <= self.nfolds:
+            return
+        for name in self._arrays():
+            arr = getattr(self, name)
+            padding = np.zeros((nfolds - self.nfolds, ) + arr.shape[1:],
+                               dtype=arr.dtype)
+            setattr(self, name, np.concatenate((arr, padding)))
+        self.nfolds = nfolds
+
+    def update(self, method, actual, predicted, probabilities=None,
+               fold=0):
+        """
+        Add predictions of a method for a chunk of test instances.
+        Instances with unknown actual values are skipped.
+
+        :param method: Index of the method
+        :type method: int
+        :param actual: Actual values of the class
+        :type actual: np.ndarray
+        :param predicted: Predicted values
+        :type predicted: np.ndarray
+        :param probabilities: Predicted probabilities of classes
+        :type probabilities: np.ndarray
+        :param fold: Index of the fold
+        :type fold: int
+        """
+        self._ensure_folds(fold + 1)
+        actual = np.asarray(actual, dtype=float).ravel()
+        predicted = np.asarray(predicted, dtype=float).ravel()
+        known = ~np.isnan(actual)
+        if not known.all():
+            actual, predicted = actual[known], predicted[known]
+            if probabilities is not None:
+                probabilities = probabilities[known]
+
+        if self.domain.has_continuous_class:
+            errors = predicted - actual
+            n = len(actual)
+            mean = actual.mean() if n else 0
+            chunk = np.array([n, np.sum(errors ** 2), np.sum(np.abs(errors)),
+                              mean, np.sum((actual - mean) ** 2)])
+            moments = self.moments[fold, method]
+            moments[:] = _merge_moments(moments, chunk)
+            return
+
+        nclasses = self.confusion.shape[-1]
+        actual = actual.astype(int)
+        self.confusion[fold, method] += np.bincount(
+            actual * nclasses + predicted.astype(int),
+            minlength=nclasses * nclasses).reshape(nclasses, nclasses)
+        if probabilities is None:
+            return
+        n_bins = self.n_bins
+        bins = np.clip((np.asarray(probabilities) * n_bins).astype(int),
+                       0, n_bins - 1)
+        bins += np.arange(nclasses) * n_bins
+        size = nclasses * n_bins
+        all_ = np.bincount(bins.ravel(), minlength=size)
+        positive = np.bincount(bins[np.arange(len(actual)), actual],
+                               minlength=size)
+        histograms = self.histograms[fold, method]
+        histograms[:, 0] += (all_ - positive).reshape(nclasses, n_bins)
+        histograms[:, 1] += positive.reshape(nclasses, n_bins)
+
+    def merge(self, other):
+        """
+        Add the statistics collected in another instance (e.g. in another
+        process or for another chunk of test data) and return self.
+        """
+        if other.nmethods != self.nmethods or other.n_bins != self.n_bins \
+                or other.domain.class_var != self.domain.class_var:
+            raise ValueError("mismatching statistics")
+        self._ensure_folds(other.nfolds)
+        nfolds = other.nfolds
+        if self.domain.has_continuous_class:
+            self.moments[:nfolds] = _merge_moments(
+                self.moments[:nfolds], other.moments)
+        else:
+            self.confusion[:nfolds] += other.confusion
+            self.histograms[:nfolds] += other.histograms
+        self.failed[:] = [failed or other_failed for failed, other_failed
+                          in zip(self.failed, other.failed)]
+        return self
+
+    def get_fold(self, fold):
+        """Return the statistics of the given fold."""
+        statistics = ResultsStatistics(self.domain, self.nmethods,
+                                       self.n_bins)
+        for name in self._arrays():
+            setattr(statistics, name, getattr(self, name)[fold:fold + 1])
+        statistics.nfolds = 1
+        statistics.failed = self.failed
+        return statistics
+
+    def pooled_moments(self):
+        """Return the moments of each method, merged across folds."""
+        moments = np.zeros(self.moments.shape[1:])
+        for fold_moments in self.moments:
+            moments = _merge_moments(moments, fold_moments)
+        return moments
+
+
+def _merge_moments(a, b):
+    """Merge the moments (see :obj:`ResultsStatistics.moments`) of two
+    sets of instances."""
+    n_a, n_b = a[..., 0], b[..., 0]
+    n = n_a + n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = b[..., 3] - a[..., 3]
+        mean = np.where(n > 0, a[..., 3] + delta * n_b / n, 0)
+        m2 = a[..., 4] + b[..., 4] + \
+            np.where(n > 0, delta ** 2 * n_a * n_b / n, 0)
+    return np.stack((n, a[..., 1] + b[..., 1], a[..., 2] + b[..., 2],
+                     mean, m2), axis=-1)
+
+
 class CrossValidation(Results):
     """
     K-fold cross validation.
@@ -219,10 +554,12 @@ class CrossValidation(Results):
 
     """
     def __init__(self, data, learners, k=10, random_state=0, store_data=False,
-                 store_models=False, preprocessor=None, callback=None):
+                 store_models=False, preprocessor=None, callback=None,
+                 n_jobs=1, executor=None, streaming=False):
         super().__init__(data, len(learners), store_data=store_data,
                          store_models=store_models, preprocessor=preprocessor,
-                         callback=callback)
+                         callback=callback, n_jobs=n_jobs, executor=executor,
+                         streaming=streaming)
         self.k = k
         self.random_state = random_state
         Y = data.Y.copy().flatten()
@@ -235,40 +572,34 @@ class CrossValidation(Results):
                 len(Y), self.k, shuffle=True, random_state=self.random_state
             )
 
+        folds = list(indices)
+        if any(len(test) == 0 for _, test in folds):
+            raise RuntimeError("One of the test folds is empty.")
         self.folds = []
         if self.store_models:
-            self.models = []
+            self.models = [[None] * len(learners) for _ in folds]
         ptr = 0
-        nmethods = len(learners)
-        n_callbacks = nmethods * self.k
-        for fold_idx, (train, test) in enumerate(indices):
-            train_data, test_data = data[train], data[test]
-            if self.preprocessor is not None:
-                train_data = self.preprocessor(train_data)
-            if len(test_data) == 0:
-                raise RuntimeError("One of the test folds is empty.")
+        for train, test in folds:
             fold_slice = slice(ptr, ptr + len(test))
             self.folds.append(fold_slice)
-            self.row_indices[fold_slice] = test
-            self.actual[fold_slice] = test_data.Y.flatten()
-            if self.store_models:
-                fold_models = [None] * nmethods
-                self.models.append(fold_models)
-            for i, learner in enumerate(learners):
-                model = self.train_if_succ(i, learner, train_data)
-                self.call_callback((fold_idx * nmethods + i) / n_callbacks)
-                if not model:
-                    continue
-                if self.store_models:
-                    fold_models[i] = model
-                if data.domain.has_discrete_class:
-                    values, probs = model(test_data, model.ValueProbs)
-                    self.predicted[i][fold_slice] = values
-                    self.probabilities[i][fold_slice, :] = probs
-                elif data.domain.has_continuous_class:
-                    values = model(test_data, model.Value)
-                    self.predicted[i][fold_slice] = values
+            if not streaming:
+                self.row_indices[fold_slice] = test
+                self.actual[fold_slice] = Y[test]
             ptr += len(test)
+        for fold_idx, i, model, values, probs in \
+                self._fit_folds(data, learners, folds):
+            if self.store_models:
+                self.models[fold_idx][i] = model
+            if streaming:
+                if values is not None:
+                    self.statistics.update(i, Y[folds[fold_idx][1]], values,
+                                           probs, fold_idx)
+                continue
+            fold_slice = self.folds[fold_idx]
+            if values is not None:
+                self.predicted[i][fold_slice] = values
+            if probs is not None:
+                self.probabilities[i][fold_slice, :] = probs
         self.call_callback(1)
 
 
@@ -276,10 +607,15 @@ class LeaveOneOut(Results):
     """Leave-one-out testing"""
 
     def __init__(self, data, learners, store_data=False, store_models=False,
-                 preprocessor=None, callback=None):
+                 preprocessor=None, callback=None, n_jobs=1, executor=None,
+                 streaming=False):
         super().__init__(data, len(learners), store_data=store_data,
                          store_models=store_models, preprocessor=preprocessor,
-                         callback=callback)
+                         callback=callback, n_jobs=n_jobs, executor=executor,
+                         streaming=streaming)
+        if executor is not None or n_jobs > 1:
+            self._leave_one_out_parallel(data, learners)
+            return
         domain = data.domain
         X = data.X.copy()
         Y = data._Y.copy()
@@ -294,13 +630,16 @@ class LeaveOneOut(Results):
         else:
             W = teW = trW = None
 
-        self.row_indices = np.arange(len(data))
         if self.store_models:
             self.models = []
-        self.actual = Y.flatten()
+        if not streaming:
+            self.row_indices = np.arange(len(data))
+            self.actual = Y.flatten()
         nmethods = len(learners)
         n_callbacks = nmethods * len(data)
-        for test_idx in self.row_indices:
+        cache = PreprocessCache()
+        for test_idx in range(len(data)):
+            cache.clear()
             X[[0, test_idx]] = X[[test_idx, 0]]
             Y[[0, test_idx]] = Y[[test_idx, 0]]
             metas[[0, test_idx]] = metas[[test_idx, 0]]
@@ -314,19 +653,48 @@ class LeaveOneOut(Results):
                 fold_models = [None] * nmethods
                 self.models.append(fold_models)
             for i, learner in enumerate(learners):
-                model = self.train_if_succ(i, learner, train_data)
+                with cache:
+                    model = self.train_if_succ(i, learner, train_data)
+                    prediction = model and \
+                        _predict(model, test_data, domain)
                 self.call_callback((test_idx * nmethods + i) / n_callbacks)
                 if not model:
                     continue
                 if self.store_models:
                     fold_models[i] = model
-                if data.domain.has_discrete_class:
-                    values, probs = model(test_data, model.ValueProbs)
+                values, probs = prediction
+                if streaming:
+                    if values is not None:
+                        self.statistics.update(i, teY, values, probs)
+                    continue
+                if values is not None:
                     self.predicted[i][test_idx] = values
+                if probs is not None:
                     self.probabilities[i][test_idx, :] = probs
-                elif data.domain.has_continuous_class:
-                    values = model(test_data, model.Value)
-                    self.predicted[i][test_idx] = values
+        self.call_callback(1)
+
+    def _leave_one_out_parallel(self, data, learners):
+        row_indices = np.arange(len(data))
+        actual = data._Y.flatten()
+        if self.statistics is None:
+            self.row_indices = row_indices
+            self.actual = actual
+        folds = [(None, [test_idx]) for test_idx in row_indices]
+        if self.store_models:
+            self.models = [[None] * len(learners) for _ in folds]
+        for test_idx, i, model, values, probs in \
+                self._fit_folds(data, learners, folds):
+            if self.store_models:
+                self.models[test_idx][i] = model
+            if self.statistics is not None:
+                if values is not None:
+                    self.statistics.update(i, actual[[test_idx]], values,
+                                           probs)
+                continue
+            if values is not None:
+                self.predicted[i][test_idx] = values
+            if probs is not None:
+                self.probabilities[i][test_idx, :] = probs
         self.call_callback(1)
 
 
@@ -334,44 +702,52 @@ class TestOnTrainingData(Results):
     """Trains and test on the same data"""
 
     def __init__(self, data, learners, store_data=False, store_models=False,
-                 preprocessor=None, callback=None):
+                 preprocessor=None, callback=None, streaming=False):
         super().__init__(data, len(learners), store_data=store_data,
                          store_models=store_models, preprocessor=preprocessor,
-                         callback=callback)
-        self.row_indices = np.arange(len(data))
+                         callback=callback, streaming=streaming)
         nmethods = len(learners)
         if self.store_models:
             models = [None] * nmethods
             self.models = [models]
-        self.actual = data.Y.flatten()
+        if not streaming:
+            self.row_indices = np.arange(len(data))
+            self.actual = data.Y.flatten()
         if self.preprocessor is not None:
             train_data = self.preprocessor(data)
         else:
             train_data = data
+        cache = PreprocessCache()
         for i, learner in enumerate(learners):
-            model = self.train_if_succ(i, learner, train_data)
+            with cache:
+                model = self.train_if_succ(i, learner, train_data)
+                prediction = model and not streaming and \
+                    _predict(model, data, data.domain)
             self.call_callback(i / nmethods)
             if not model:
                 continue
             if self.store_models:
                 models[i] = model
-            if data.domain.has_discrete_class:
-                values, probs = model(data, model.ValueProbs)
+            if streaming:
+                self._update_statistics(i, model, data)
+                continue
+            values, probs = prediction
+            if values is not None:
                 self.predicted[i] = values
+            if probs is not None:
                 self.probabilities[i] = probs
-            elif data.domain.has_continuous_class:
-                values = model(data, model.Value)
-                self.predicted[i] = values
         self.call_callback(1)
 
 
 class ShuffleSplit(Results):
     def __init__(self, data, learners, n_resamples=10, train_size=None,
                  test_size=0.1, random_state=0, store_data=False,
-                 store_models=False, preprocessor=None, callback=None):
+                 store_models=False, preprocessor=None, callback=None,
+                 n_jobs=1, executor=None, streaming=False):
         super().__init__(data, len(learners), store_data=store_data,
                          store_models=store_models, preprocessor=preprocessor,
-                         callback=callback)
+                         callback=callback, n_jobs=n_jobs, executor=executor,
+                         streaming=streaming)
         self.store_models = store_models
         self.n_resamples = n_resamples
         self.train_size = train_size
@@ -383,49 +759,49 @@ class ShuffleSplit(Results):
             test_size=test_size, random_state=self.random_state
         )
 
+        folds = list(indices)
         self.folds = []
         if self.store_models:
-            self.models = []
+            self.models = [[None] * len(learners) for _ in folds]
 
         row_indices = []
         actual = []
-        predicted = [[] for _ in learners]
-        probabilities = [[] for _ in learners]
         fold_start = 0
-        nmethods = len(learners)
-        n_callbacks = self.n_resamples * nmethods
-        for samp_idx, (train, test) in enumerate(indices):
-            train_data, test_data = data[train], data[test]
-            if preprocessor is not None:
-                train_data = self.preprocessor(train_data)
+        Y = data.Y.flatten()
+        for train, test in folds:
             self.folds.append(slice(fold_start, fold_start + len(test)))
             row_indices.append(test)
-            actual.append(test_data.Y.flatten())
-            if self.store_models:
-                fold_models = [None] * nmethods
-                self.models.append(fold_models)
+            actual.append(Y[test])
+            fold_start += len(test)
 
-            for i, learner in enumerate(learners):
-                model = self.train_if_succ(i, learner, train_data)
-                self.call_callback((samp_idx * nmethods + i ) / n_callbacks)
-                if model:
-                    if self.store_models:
-                        fold_models[i] = model
-                    if data.domain.has_discrete_class:
-                        values, probs = model(test_data, model.ValueProbs)
-                        predicted[i].append(values)
-                        probabilities[i].append(probs)
-                    elif data.domain.has_continuous_class:
-                        values = model(test_data, model.Value)
-                        predicted[i].append(values)
-                else:
-                    predicted[i].append(np.zeros((len(test_data),)))
-                    if data.domain.has_discrete_class:
-                        probabilities[i].append(
-                            np.zeros((len(test_data),
-                                      len(data.domain.class_var.values))))
+        if streaming:
+            for samp_idx, i, model, values, probs in \
+                    self._fit_folds(data, learners, folds):
+                if self.store_models:
+                    self.models[samp_idx][i] = model
+                if values is not None:
+                    self.statistics.update(i, actual[samp_idx], values, probs,
+                                           samp_idx)
+            self.nrows = fold_start
+            self.call_callback(1)
+            return
+
+        # predictions of failed models are zeros
+        predicted = [[np.zeros((len(test),)) for _, test in folds]
+                     for _ in learners]
+        if data.domain.has_discrete_class:
+            n_values = len(data.domain.class_var.values)
+            probabilities = [[np.zeros((len(test), n_values))
+                              for _, test in folds] for _ in learners]
 
-            fold_start += len(test)
+        for samp_idx, i, model, values, probs in \
+                self._fit_folds(data, learners, folds):
+            if self.store_models:
+                self.models[samp_idx][i] = model
+            if values is not None:
+                predicted[i][samp_idx] = values
+            if probs is not None:
+                probabilities[i][samp_idx] = probs
 
         row_indices = np.hstack(row_indices)
         actual = np.hstack(actual)
@@ -449,33 +825,40 @@ class TestOnTestData(Results):
     Test on a separate test data set.
     """
     def __init__(self, train_data, test_data, learners, store_data=False,
-                 store_models=False, preprocessor=None, callback=None):
+                 store_models=False, preprocessor=None, callback=None,
+                 streaming=False):
         super().__init__(test_data, len(learners), store_data=store_data,
                          store_models=store_models, preprocessor=preprocessor,
-                         callback=callback)
+                         callback=callback, streaming=streaming)
         nmethods = len(learners)
         if self.store_models:
             self.models = [None] * nmethods
 
-        self.row_indices = np.arange(len(test_data))
-        self.actual = test_data.Y.flatten()
+        if not streaming:
+            self.row_indices = np.arange(len(test_data))
+            self.actual = test_data.Y.flatten()
 
         if self.preprocessor is not None:
             train_data = self.preprocessor(train_data)
+        cache = PreprocessCache()
         for i, learner in enumerate(learners):
-            model = self.train_if_succ(i, learner, train_data)
+            with cache:
+                model = self.train_if_succ(i, learner, train_data)
+                prediction = model and not streaming and \
+                    _predict(model, test_data, train_data.domain)
             self.call_callback(i / nmethods)
             if not model:
                 continue
-            if train_data.domain.has_discrete_class:
-                values, probs = model(test_data, model.ValueProbs)
-                self.predicted[i] = values
-                self.probabilities[i][:, :] = probs
-            elif train_data.domain.has_continuous_class:
-                values = model(test_data, model.Value)
-                self.predicted[i] = values
             if self.store_models:
                 self.models[i] = model
+            if streaming:
+                self._update_statistics(i, model, test_data)
+                continue
+            values, probs = prediction
+            if values is not None:
+                self.predicted[i] = values
+            if probs is not None:
+                self.probabilities[i][:, :] = probs
 
         self.nrows = len(test_data)
         self.folds = [slice(0, len(test_data))]
@@ -537,3 +920,71 @@ def sample(table, n=0.7, stratified=False, replace=False,
             test_size=n, random_state=random_state)
     ind = next(iter(ind))
     return table[ind[0]], table[ind[1]]
+
+
+def _predict(model, test_data, domain):
+    """Return the values and probabilities predicted by the model, or None
+    for those that are not defined for the domain."""
+    if domain.has_discrete_class:
+        return model(test_data, model.ValueProbs)
+    elif domain.has_continuous_class:
+        return model(test_data, model.Value), None
+    return None, None
+
+
+@lru_cache(maxsize=1)
+def _read_shared_table(filename):
+    return NumpyDirectoryFormat.read_file(filename)
+
+
+def _fold_data(data, train, test):
+    """Return the training and test data of a fold; training rows `None`
+    stand for all rows except the test rows."""
+    if train is None:
+        train = np.delete(np.arange(len(data)), test)
+    return data[train], data[test]
+
+
+def _fit_fold(source, train, test, learner, preprocessor, return_model,
+              pickled=False):
+    """
+    Train the learner on the train rows of the source and predict the test
+    rows; a task of Results._fit_folds that runs in another process.
+
+    The source is a table or the name of a table stored in the
+    NumpyDirectoryFormat, which is read once per process. Return the
+    model (if return_model is set), values and probabilities, or the
+    exception raised while training, predicting or pickling. If `pickled`
+    is set, the tuple is returned pickled; a model that cannot be pickled
+    is replaced by an :obj:`_UnpicklableModel`, so that the predictions are
+    kept.
+    """
+    data = _read_shared_table(source) if isinstance(source, str) else source
+    train_data, test_data = _fold_data(data, train, test)
+    if preprocessor is not None:
+        train_data = preprocessor(train_data)
+    try:
+        model = learner(train_data)
+        values, probs = _predict(model, test_data, data.domain)
+        result = (model if return_model else None), values, probs
+        if pickled:
+            try:
+                result = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+            except Exception as ex:
+                if result[0] is None:
+                    raise
+                result = (_UnpicklableModel(result[0], ex), ) + result[1:]
+                result = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception as ex:
+        return ex
+    return result
+
+
+class _UnpicklableModel:
+    """
+    Stands, in the result of :obj:`_fit_fold`, for a model that could not
+    be pickled.
+    """
+    def __init__(self, model, exception):
+        self.message = "{} cannot be pickled and is not stored: {}".format(
+            type(model).__name__, exception)
@@ -0,0 +1,148 @@
+"""
+A cache of preprocessed data shared by the learners in an evaluation.
+"""
+import inspect
+import threading
+from collections import OrderedDict
+
+import scipy.sparse as sp
+
+from Orange.data import Table
+from .preprocess import Preprocess
+
+__all__ = ["PreprocessCache", "active_cache"]
+
+_local = threading.local()
+
+
+def active_cache():
+    """Return the cache activated in the current thread or None."""
+    caches = getattr(_local, "caches", None)
+    return caches[-1] if caches else None
+
+
+def preprocessor_key(preprocessor):
+    """
+    Return a hashable description of the preprocessor's configuration: its
+    type and the values of the arguments of its constructor. Return None if
+    the preprocessor cannot be memoized: if it is not a deterministic
+    :obj:`Preprocess` or its arguments are not stored in the attributes
+    of the same names or are not hashable.
+    """
+    if not isinstance(preprocessor, Preprocess) or \
+            not preprocessor.deterministic:
+        return None
+    cls = type(preprocessor)
+    params = list(inspect.signature(cls.__init__).parameters.values())[1:]
+    try:
+        config = tuple(
+            (param.name, getattr(preprocessor, param.name))
+            for param in params
+            if param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD))
+        hash(config)
+    except (AttributeError, TypeError):
+        return None
+    return cls, config
+
+
+def data_fingerprint(data):
+    """Return the checksum of the table or None if the table cannot be
+    memoized (it is not a Table or has sparse arrays)."""
+    if not isinstance(data, Table) or \
+            any(sp.issparse(arr) for arr in (data.X, data._Y, data.metas)):
+        return None
+    return data.checksum()
+
+
+class PreprocessCache:
+    """
+    Tables returned by preprocessors and tables converted to the domains of
+    models, memoized for the learners that are trained and tested on the
+    same data. At most `max_size` tables are kept; the least recently used
+    tables are removed first.
+
+    Results are keyed by the configuration of the preprocessor (or the
+    target domain), the identity and the checksum of the input table and
+    its domain, so tables that are changed in place are preprocessed
+    again; so are the tables whose results were changed in place. The cache
+    keeps references to the input tables, therefore it should live only as
+    long as the evaluation it serves.
+
+    The cache is consulted by :obj:`Orange.base.Learner.preprocess` and
+    :obj:`Orange.base.Model.__call__` while it is active in the current
+    thread::
+
+        with cache:
+            model = learner(train_data)
+            values = model(test_data)
+
+    Only preprocessors that set :obj:`Preprocess.deterministic` are
+    memoized; others, e.g. :obj:`Orange.preprocess.Randomize` and
+    :obj:`Orange.preprocess.Remove`, which stores statistics of the removed
+    values, are called every time.
+
+    .. attribute:: hits
+
+        The number of tables taken from the cache.
+
+    .. attribute:: misses
+
+        The number of tables that had to be computed.
+    """
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    def __enter__(self):
+        if getattr(_local, "caches", None) is None:
+            _local.caches = []
+        _local.caches.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.caches.pop()
+
+    def _fetch(self, config, data, compute, target=None):
+        fingerprint = data_fingerprint(data)
+        if config is None or fingerprint is None:
+            return compute(data)
+        key = (config, id(data), id(data.domain), fingerprint)
+        with self.lock:
+            if key in self.results:
+                result, result_fingerprint = self.results[key][-2:]
+                # a learner may have changed the shared result in place
+                if data_fingerprint(result) == result_fingerprint:
+                    self.hits += 1
+                    self.results.move_to_end(key)
+                    return result
+                del self.results[key]
+            self.misses += 1
+
+        result = compute(data)
+        with self.lock:
+            # keep the inputs alive so that their ids are not reused
+            self.results[key] = (data, data.domain, target,
+                                 result, data_fingerprint(result))
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+        return result
+
+    def preprocess(self, preprocessor, data):
+        """Return the data preprocessed by the preprocessor."""
+        return self._fetch(preprocessor_key(preprocessor), data, preprocessor)
+
+    def convert(self, domain, data):
+        """Return the data converted to the domain."""
+        return self._fetch(("convert", id(domain)), data,
+                           lambda data: data.from_table(domain, data),
+                           target=domain)
+
+    def clear(self):
+        """Remove all tables."""
+        with self.lock:
+            self.results.clear()
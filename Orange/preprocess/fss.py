@@ -134,6 +134,8 @@ class RemoveNaNColumns(Preprocess):
     data : data table
         an input data table
     """
+    deterministic = True
+
     def __call__(self, data):
         nan_col = np.all(np.isnan(data.X), axis=0)
         att = [a for a, nan in zip(data.domain.attributes, nan_col) if not nan]
@@ -28,6 +28,11 @@ class Preprocess:
     data : a data table (default=None)
         An optional data set to be preprocessed.
     """
+    #: Whether the result depends only on the data and the arguments of the
+    #: constructor and the preprocessor has no side effects, so that it can
+    #: be memoized by :obj:`Orange.preprocess.cache.PreprocessCache`.
+    #: Subclasses opt in by setting it to True.
+    deterministic = False
 
     def __new__(cls, data=None, *args, **kwargs):
         self = super().__new__(cls)
@@ -50,6 +55,7 @@ class Continuize(Preprocess):
 
     (Indicators, FirstAsBase, FrequentAsBase, Remove, RemoveMultinomial,
      ReportError, AsOrdinal, AsNormalizedOrdinal, Leave) = MultinomialTreatment
+    deterministic = True
 
     def __init__(self, zero_based=True, multinomial_treatment=Indicators):
         self.zero_based = zero_based
@@ -78,6 +84,7 @@ class Discretize(Preprocess):
         Determines whether the features with constant values are removed
         during discretization.
     """
+    deterministic = True
 
     def __init__(self, method=None, remove_const=True):
         self.method = method
@@ -122,6 +129,7 @@ class Impute(Preprocess):
     ----------
     method : imputation method (default: Orange.preprocess.impute.Average())
     """
+    deterministic = True
 
     def __init__(self, method=Orange.preprocess.impute.Average()):
         self.method = method
@@ -146,6 +154,7 @@ class Impute(Preprocess):
 
 class SklImpute(Preprocess):
     __wraps__ = skl_preprocessing.Imputer
+    deterministic = True
 
     def __init__(self, strategy='mean', force=True):
         self.strategy = strategy
@@ -168,6 +177,7 @@ class RemoveConstant(Preprocess):
     Construct a preprocessor that removes features with constant values
     from the data set.
     """
+    deterministic = True
 
     def __call__(self, data):
         """
@@ -224,6 +234,7 @@ class Normalize(Preprocess):
 
     NormTypes = Enum("NormalizeBySpan", "NormalizeBySD")
     (NormalizeBySpan, NormalizeBySD) = NormTypes
+    deterministic = True
 
     def __init__(self,
                  zero_based=True,
@@ -285,6 +296,7 @@ class Randomize(Preprocess):
     RandTypes = Enum("RandomizeClasses", "RandomizeAttributes",
                      "RandomizeMetas")
     (RandomizeClasses, RandomizeAttributes, RandomizeMetas) = RandTypes
+    deterministic = False
 
     def __init__(self, rand_type=RandomizeClasses):
         self.rand_type = rand_type
@@ -47,6 +47,8 @@ class Remove(Preprocess):
     """
 
     SortValues, RemoveConstant, RemoveUnusedValues = 1, 2, 4
+    # attr_results and class_results would not be set for cached results
+    deterministic = False
 
     def __init__(self, attr_flags=0, class_flags=0):
         self.attr_flags = attr_flags
@@ -0,0 +1,109 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from Orange.data.sql.backend import SQLiteBackend
+from Orange.data.sql.cache import QueryCache, normalize_query
+from Orange.data.sql.table import SqlTable
+from Orange.statistics import distribution
+
+
+class QueryCacheTests(unittest.TestCase):
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query(' SELECT  a,\n  b FROM "t  1" ; '),
+                         'SELECT a, b FROM "t  1"')
+        self.assertEqual(normalize_query("SELECT 'a  b'"), "SELECT 'a  b'")
+        self.assertNotEqual(normalize_query("SELECT 'a  b'"),
+                            normalize_query("SELECT 'a b'"))
+
+    def test_hits_and_misses(self):
+        cache = QueryCache()
+        run = lambda: [(42,)]
+        self.assertEqual(cache.fetch("db", "SELECT 1", None, run), [(42,)])
+        self.assertEqual(cache.fetch("db", "SELECT  1;", None, run), [(42,)])
+        cache.fetch("db", "SELECT 1", (1,), run)
+        cache.fetch("other db", "SELECT 1", None, run)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_size_and_ttl(self):
+        cache = QueryCache(max_size=2)
+        for i in range(3):
+            cache.fetch("db", "SELECT %d" % i, None, lambda: [(i,)])
+        self.assertEqual(len(cache), 2)
+        cache.fetch("db", "SELECT 0", None, lambda: [(0,)])
+        self.assertEqual(cache.misses, 4)
+
+        cache = QueryCache(ttl=10)
+        with patch("time.monotonic", return_value=100):
+            cache.fetch("db", "SELECT 1", None, lambda: [(1,)])
+        with patch("time.monotonic", return_value=105):
+            cache.fetch("db", "SELECT 1", None, lambda: [(1,)])
+        with patch("time.monotonic", return_value=111):
+            cache.fetch("db", "SELECT 1", None, lambda: [(1,)])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_invalidate(self):
+        cache = QueryCache()
+        cache.fetch("db", "SELECT 1", None, lambda: [(1,)])
+        cache.fetch("other db", "SELECT 1", None, lambda: [(1,)])
+        cache.invalidate("db")
+        self.assertEqual(len(cache), 1)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+
+class SqlTableCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.database = os.path.join(self.tempdir, "data.db")
+        with sqlite3.connect(self.database) as connection:
+            connection.execute("CREATE TABLE data (a REAL, b TEXT)")
+            connection.executemany("INSERT INTO data VALUES (?, ?)",
+                                   [(i, "xy"[i % 2]) for i in range(20)])
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_shared_results(self):
+        cache = QueryCache()
+        with patch.object(SqlTable, "query_cache", cache):
+            table = SqlTable(self.database, "data", inspect_values=True,
+                             backend=SQLiteBackend)
+            copy = table.copy()
+            distribution.get_distribution(table, 0)
+            misses, hits = cache.misses, cache.hits
+            distribution.get_distribution(copy, 0)
+            self.assertEqual(cache.misses, misses)
+            self.assertGreater(cache.hits, hits)
+
+            with sqlite3.connect(self.database) as connection:
+                connection.execute("INSERT INTO data VALUES (100, 'x')")
+            table.clear_cache()
+            dist = distribution.get_distribution(copy, 0)
+            self.assertEqual(dist[0, -1], 100)
+
+    def test_no_cache(self):
+        self.assertIsNone(SqlTable.query_cache)
+        table = SqlTable(self.database, "data", backend=SQLiteBackend)
+        self.assertEqual(len(table), 20)
+
+    def test_creation_not_cached(self):
+        cache = QueryCache()
+        with patch.object(SqlTable, "query_cache", cache):
+            SqlTable(self.database, "data", inspect_values=True,
+                     backend=SQLiteBackend)
+            self.assertEqual((cache.hits, cache.misses), (0, 0))
+            self.assertEqual(len(cache), 0)
+
+            with sqlite3.connect(self.database) as connection:
+                connection.execute("INSERT INTO data VALUES (100, 'z')")
+            table = SqlTable(self.database, "data", inspect_values=True,
+                             backend=SQLiteBackend)
+            self.assertEqual(table.domain["b"].values, ["x", "y", "z"])
+
+
+if __name__ == '__main__':
+    unittest.main()
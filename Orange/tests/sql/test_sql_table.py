@@ -69,6 +69,7 @@ class SqlTableTests(PostgresTest):
         sql_table = SqlTable(conn, table_name,
                              type_hints=Domain([], DiscreteVariable(
                                  name='col2', values=['0', '1', '2'])))
+        sql_table.download_memory_limit = 1000 * sql_table._bytes_per_row()
         with self.assertRaises(ValueError):
             sql_table.X
         with self.assertRaises(ValueError):
@@ -79,6 +80,20 @@ class SqlTableTests(PostgresTest):
         assert_almost_equal(sql_table.X, mat[:, :2])
         assert_almost_equal(sql_table.Y.flatten(), mat[:, 2])
 
+    def test_download_data_in_chunks(self):
+        data = list(zip(self.float_variable(25),
+                        self.discrete_variable(25),
+                        self.string_variable(25)))
+        with self.sql_table_from_data(data) as table:
+            table.download_data(chunk_size=4)
+            assert_almost_equal(table.X[:, 0], self.float_variable(25))
+            self.assertEqual(
+                [table.domain[1].values[int(v)] for v in table.X[:, 1]],
+                self.discrete_variable(25))
+            self.assertEqual(list(table.metas[:, 0]),
+                             list(self.string_variable(25)))
+            self.assertEqual(len(table), 25)
+
 
     def test_query_all(self):
         table = sql_table.SqlTable(self.conn, self.iris, inspect_values=True)
@@ -126,6 +141,66 @@ class SqlTableTests(PostgresTest):
         self.assertEqual(len(results), 140)
         self.assertSequenceEqual(results, all_results[10:])
 
+    def test_query_row_set(self):
+        table = sql_table.SqlTable(self.conn, self.iris)
+        all_results = list(table._query())
+
+        results = list(table._query(rows=[120, 3, 3, 42]))
+        self.assertSequenceEqual(
+            results, [all_results[i] for i in (120, 3, 3, 42)])
+
+        table.row_array_limit = 2
+        results = list(table._query(rows=[120, 3, 42, -1]))
+        self.assertSequenceEqual(
+            results, [all_results[i] for i in (120, 3, 42, 149)])
+
+        with self.assertRaises(IndexError):
+            list(table._query(rows=[150]))
+
+    def test_getitem_row_set(self):
+        table = sql_table.SqlTable(self.conn, self.iris, inspect_values=True)
+        iris = Table("iris")
+        rows = [100, 0, 50, 7]
+        selected = table[rows]
+        self.assertIsInstance(selected, Table)
+        assert_almost_equal(selected.X[:, :4], iris.X[rows])
+        self.assertEqual(
+            [table.domain[4].values[int(y)] for y in selected.X[:, 4]],
+            [iris.domain.class_var.values[int(y)] for y in iris.Y[rows]])
+
+        mask = np.zeros(len(iris), dtype=bool)
+        mask[[3, 4]] = True
+        assert_almost_equal(table[mask].X[:, :4], iris.X[[3, 4]])
+        assert_almost_equal(table[10:15, :2].X, iris.X[10:15, :2])
+
+    def test_distributions_and_contingencies(self):
+        table = sql_table.SqlTable(
+            self.conn, self.iris, inspect_values=True,
+            type_hints=Domain([], DiscreteVariable(
+                "iris", values=['Iris-setosa', 'Iris-versicolor',
+                                'Iris-virginica'])))
+        iris = Table("iris")
+        for (dist, unknowns), (expected, expected_unknowns) in zip(
+                table._compute_distributions(),
+                iris._compute_distributions()):
+            assert_almost_equal(dist, expected)
+            self.assertEqual(unknowns, expected_unknowns)
+
+        conts, unknown_rows = table._compute_contingency([0, 1, 4], 4)
+        expected_conts, _ = iris._compute_contingency([0, 1, 4], 4)
+        self.assertEqual(unknown_rows, 0)
+        for (cont, _), (expected, _) in zip(conts, expected_conts):
+            if isinstance(cont, tuple):
+                assert_almost_equal(cont[0], expected[0])
+                assert_almost_equal(cont[1], expected[1])
+            else:
+                assert_almost_equal(cont, expected)
+
+        table.distribution_bins = 5
+        (dist, unknowns), = table._compute_distributions([0])
+        self.assertEqual(dist.shape, (2, 5))
+        self.assertEqual(dist[1].sum(), 150)
+
     def test_type_hints(self):
         table = sql_table.SqlTable(self.conn, self.iris, inspect_values=True)
         self.assertEqual(len(table.domain), 5)
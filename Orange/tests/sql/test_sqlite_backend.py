@@ -0,0 +1,205 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+from numpy.testing import assert_almost_equal
+
+from Orange.data import Table, filter, ContinuousVariable, DiscreteVariable
+from Orange.data.sql.table import SqlTable
+from Orange.data.sql.backend import SQLiteBackend
+
+
+class SQLiteBackendTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.iris = Table("iris")
+        cls.tempdir = tempfile.mkdtemp()
+        cls.database = os.path.join(cls.tempdir, "iris.db")
+        class_values = cls.iris.domain.class_var.values
+        with sqlite3.connect(cls.database) as connection:
+            connection.execute("""
+                CREATE TABLE iris (
+                    "sepal length" REAL,
+                    "sepal width" REAL,
+                    "petal length" REAL,
+                    "petal width" REAL,
+                    "iris" TEXT
+                )""")
+            connection.executemany(
+                "INSERT INTO iris VALUES (?, ?, ?, ?, ?)",
+                [tuple(float(x) for x in row.x) +
+                 (class_values[int(row.y)],) for row in cls.iris])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tempdir)
+
+    def create_table(self):
+        return SqlTable(self.database, "iris", inspect_values=True,
+                        backend=SQLiteBackend)
+
+    def test_domain(self):
+        table = self.create_table()
+        self.assertEqual(len(table.domain.attributes), 5)
+        self.assertIsInstance(table.domain[0], ContinuousVariable)
+        self.assertIsInstance(table.domain[4], DiscreteVariable)
+        self.assertEqual(table.domain[4].values,
+                         list(self.iris.domain.class_var.values))
+
+    def test_download_data(self):
+        table = self.create_table()
+        self.assertEqual(len(table), 150)
+        assert_almost_equal(table.X[:, :4], self.iris.X)
+        assert_almost_equal(table.X[:, 4], self.iris.Y)
+        assert_almost_equal(table[[149, 3, 3]].X[:, :4],
+                            self.iris.X[[149, 3, 3]])
+
+    def test_iter_chunks(self):
+        table = self.create_table()
+        chunks = list(table.iter_chunks(40))
+        self.assertEqual([len(chunk) for chunk in chunks], [40, 40, 40, 30])
+        self.assertIsNone(table._X)
+        X = np.vstack([chunk.X for chunk in chunks])
+        assert_almost_equal(X[:, :4], self.iris.X)
+        assert_almost_equal(X[:, 4], self.iris.Y)
+
+    def test_fetch_chunk_size(self):
+        table = self.create_table()
+        sizes = []
+        cursor = table.backend.cursor
+
+        def recording_cursor(connection, server_side=False):
+            cur = cursor(connection, server_side)
+            fetchmany = cur.fetchmany
+            return Mock(wraps=cur, fetchmany=lambda size: (
+                sizes.append(size), fetchmany(size))[1])
+
+        table.backend.cursor = recording_cursor
+        chunks = list(table._query_chunks(table.domain.attributes,
+                                          chunk_size=40))
+        self.assertEqual([len(chunk) for chunk in chunks], [40, 40, 40, 30])
+        self.assertEqual(set(sizes), {40})
+        sizes.clear()
+        list(table._query_chunks(table.domain.attributes, rows=[3, 1, 2],
+                                 chunk_size=2))
+        self.assertEqual(set(sizes), {2})
+
+    def test_slices(self):
+        table = self.create_table()
+        for rows in (slice(10, 20), slice(140, None), slice(None, 5)):
+            assert_almost_equal(table[rows].X[:, :4], self.iris.X[rows])
+
+    def test_row_sets(self):
+        table = self.create_table()
+        rows = [149, 3, 0, 77]
+        with patch("Orange.data.sql.backend.sqlite.has_json",
+                   return_value=False):
+            assert_almost_equal(table[rows].X[:, :4], self.iris.X[rows])
+            table.backend.max_parameters = 2
+            try:
+                assert_almost_equal(table[rows].X[:, :4], self.iris.X[rows])
+            finally:
+                del table.backend.max_parameters
+        table.row_array_limit = 2
+        assert_almost_equal(table[rows].X[:, :4], self.iris.X[rows])
+
+    def test_rows_ordered_by_primary_key(self):
+        with sqlite3.connect(self.database) as connection:
+            connection.execute(
+                "CREATE TABLE keyed (key INTEGER, x REAL, PRIMARY KEY (key))"
+                " WITHOUT ROWID")
+            connection.executemany("INSERT INTO keyed VALUES (?, ?)",
+                                   [(3, 30), (1, 10), (2, 20)])
+        table = SqlTable(self.database, "keyed", backend=SQLiteBackend)
+        self.assertEqual(table._row_order(), ['"key"'])
+        assert_almost_equal(table[[2, 0]].X, [[3, 30], [1, 10]])
+        self.assertEqual(self.create_table()._row_order(), ["rowid"])
+
+    def test_filters(self):
+        table = self.create_table()
+        filtered = filter.Values([filter.FilterContinuous(
+            0, filter.FilterContinuous.Greater, ref=7)])(table)
+        self.assertEqual(len(filtered),
+                         int(np.sum(self.iris.X[:, 0] > 7)))
+        filtered = filter.Values([filter.FilterString(
+            4, filter.FilterString.Contains, ref="setosa")])(table)
+        self.assertEqual(len(filtered), 50)
+
+    def test_statistics(self):
+        table = self.create_table()
+        iris = Table.from_numpy(table.domain, table.X)
+        for stats, expected in zip(table._compute_basic_stats([0, 1]),
+                                   iris._compute_basic_stats([0, 1])):
+            assert_almost_equal(stats[:3], expected[:3])
+
+        for (dist, unknowns), (expected, expected_unknowns) in zip(
+                table._compute_distributions(),
+                iris._compute_distributions()):
+            assert_almost_equal(dist, expected)
+            self.assertEqual(unknowns, expected_unknowns)
+
+        conts, unknown_rows = table._compute_contingency([0, 4], 4)
+        expected, _ = iris._compute_contingency([0, 4], 4)
+        assert_almost_equal(conts[0][0][0], expected[0][0][0])
+        assert_almost_equal(conts[0][0][1], expected[0][0][1])
+        assert_almost_equal(conts[1][0], expected[1][0])
+        self.assertEqual(unknown_rows, 0)
+
+    def test_sample(self):
+        table = self.create_table()
+        sample = table.sample_percentage(50, no_cache=True)
+        self.assertLess(len(sample), 150)
+        self.assertEqual(len(table.sample_time(1, no_cache=True)), 150)
+
+    def test_progressive_statistics(self):
+        table = self.create_table()
+        results = []
+        computation = table.progressive_statistics(
+            lambda data: data._compute_distributions([4])[0][0],
+            lambda result, percentage: results.append((result, percentage)),
+            percentages=(10, 50))
+        dist = computation.wait(10)
+        self.assertEqual([percentage for _, percentage in results],
+                         [10, 50, 100])
+        self.assertTrue(all(np.sum(result) <= 150 for result, _ in results))
+        assert_almost_equal(dist, [50, 50, 50])
+        self.assertEqual(computation.percentage, 100)
+
+    def test_progressive_statistics_cancel(self):
+        table = self.create_table()
+        results = []
+        created = threading.Event()
+
+        def callback(result, percentage):
+            results.append(percentage)
+            # the computation may report before it is returned
+            created.wait(10)
+            computation.cancel()
+
+        computation = table.progressive_statistics(
+            lambda data: len(data), callback, percentages=(10, 50))
+        created.set()
+        computation.wait(10)
+        self.assertEqual(results, [10])
+
+    def test_statistics_do_not_create_tables(self):
+        def list_tables():
+            with sqlite3.connect(self.database) as connection:
+                return connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                ).fetchall()
+
+        tables = list_tables()
+        table = self.create_table()
+        table.approx_len = lambda: 10 ** 6
+        table._compute_distributions([0])
+        self.assertEqual(list_tables(), tables)
+
+
+if __name__ == '__main__':
+    unittest.main()
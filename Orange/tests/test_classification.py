@@ -59,6 +59,25 @@ class ModelTest(unittest.TestCase):
         for row in table:
             pred.append(clf(row))
 
+    def test_predict_batches(self):
+        table = Table("iris")
+        model = NaiveBayesLearner()(table)
+        values, probs = model(table, Model.ValueProbs)
+
+        batch_values, batch_probs = model.predict_batches(
+            table, 40, Model.ValueProbs)
+        np.testing.assert_almost_equal(batch_values, values)
+        np.testing.assert_almost_equal(batch_probs, probs)
+        np.testing.assert_almost_equal(
+            model.predict_batches(table.iter_chunks(70), 40), values)
+        self.assertEqual(
+            model.predict_batches(iter([]), 40, Model.Probs).shape, (0, 3))
+
+        model.batch_size = 25
+        np.testing.assert_almost_equal(model(table, Model.Probs), probs)
+        rows = [list(row.x) for row in table]
+        np.testing.assert_almost_equal(model(rows), values)
+
     def test_learner_adequacy(self):
         table = Table("housing")
         learner = NaiveBayesLearner()
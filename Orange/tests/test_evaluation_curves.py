@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import sklearn.metrics as skl_metrics
+
+from Orange.evaluation import (curve_points, roc_curves, lift_curves,
+                               auc_scores, calibration_bins)
+
+
+class CurvesTest(unittest.TestCase):
+    def setUp(self):
+        random = np.random.RandomState(42)
+        self.positive = random.randint(2, size=300).astype(bool)
+        self.scores = random.rand(3, 300) + 0.4 * self.positive
+        # ties
+        self.scores[1] = np.round(self.scores[1], 1)
+        self.folds = [slice(0, 100), slice(100, 200), np.arange(200, 300)]
+
+    def test_roc_curves(self):
+        for drop in (False, True):
+            curves = roc_curves(self.positive, self.scores, self.folds,
+                                drop_intermediate=drop)
+            self.assertEqual(len(curves), 3)
+            for method_curves, scores in zip(curves, self.scores):
+                self.assertEqual(len(method_curves), 3)
+                for (fpr, tpr, thresholds), fold in zip(method_curves,
+                                                        self.folds):
+                    sk_fpr, sk_tpr, sk_thresholds = skl_metrics.roc_curve(
+                        self.positive[fold], scores[fold],
+                        drop_intermediate=drop)
+                    np.testing.assert_almost_equal(fpr, sk_fpr)
+                    np.testing.assert_almost_equal(tpr, sk_tpr)
+                    np.testing.assert_almost_equal(thresholds[1:],
+                                                   sk_thresholds[1:])
+
+    def test_auc_scores(self):
+        aucs = auc_scores(self.positive, self.scores, self.folds)
+        self.assertEqual(aucs.shape, (3, 3))
+        for method_aucs, scores in zip(aucs, self.scores):
+            for auc, fold in zip(method_aucs, self.folds):
+                self.assertAlmostEqual(
+                    auc, skl_metrics.roc_auc_score(self.positive[fold],
+                                                   scores[fold]))
+        np.testing.assert_almost_equal(
+            auc_scores(self.positive, self.scores)[:, 0],
+            [skl_metrics.roc_auc_score(self.positive, scores)
+             for scores in self.scores])
+
+    def test_positives_for_each_method(self):
+        positive = np.vstack((self.positive, ~self.positive, self.positive))
+        aucs = auc_scores(positive, self.scores)[:, 0]
+        self.assertAlmostEqual(
+            aucs[1], skl_metrics.roc_auc_score(~self.positive, self.scores[1]))
+
+    def test_undefined(self):
+        positive = np.zeros(300, dtype=bool)
+        positive[:50] = True
+        self.assertTrue(np.isnan(auc_scores(positive, self.scores,
+                                            self.folds)[:, 1:]).all())
+        curves = roc_curves(positive, self.scores, self.folds)
+        self.assertEqual(curves[0][1][0].size, 0)
+        self.assertGreater(curves[0][0][0].size, 0)
+
+    def test_curve_points(self):
+        points = curve_points(self.positive, self.scores, self.folds)
+        np.testing.assert_equal(
+            points.positives,
+            [[np.sum(self.positive[fold]) for fold in self.folds]] * 3)
+        np.testing.assert_equal(points.positives + points.negatives, 100)
+        for fps, tps, positives, negatives in zip(
+                points.fps, points.tps, points.positives, points.negatives):
+            self.assertEqual([fp[-1] for fp in fps], list(negatives))
+            self.assertEqual([tp[-1] for tp in tps], list(positives))
+
+    def test_lift_curves(self):
+        (rpp, tpr, _), = lift_curves(self.positive, self.scores[0])[0]
+        fpr, sk_tpr, _ = skl_metrics.roc_curve(self.positive, self.scores[0])
+        p = np.mean(self.positive)
+        np.testing.assert_almost_equal(tpr, sk_tpr)
+        np.testing.assert_almost_equal(rpp, fpr * (1 - p) + sk_tpr * p)
+
+    def test_calibration_bins(self):
+        scores = np.array([[0.05, 0.1, 0.15, 0.7, 1], [0, 0, 0, 0, 0.99]])
+        positive = np.array([0, 1, 1, 0, 1], dtype=bool)
+        counts, positives, sums = calibration_bins(positive, scores, 10)
+        np.testing.assert_equal(counts[0], [1, 2, 0, 0, 0, 0, 0, 1, 0, 1])
+        np.testing.assert_equal(positives[0], [0, 2, 0, 0, 0, 0, 0, 0, 0, 1])
+        np.testing.assert_almost_equal(sums[0, 1], 0.25)
+        np.testing.assert_equal(counts[1], [4, 0, 0, 0, 0, 0, 0, 0, 0, 1])
@@ -4,7 +4,7 @@ from Orange.data import DiscreteVariable, Domain
 import numpy as np
 
 import Orange
-from Orange.evaluation import AUC, CA, Results, F1
+from Orange.evaluation import AUC, CA, Results, ResultsStatistics, F1
 from Orange.preprocess import discretize
 
 
@@ -183,3 +183,90 @@ class Scoring_F1_Test(unittest.TestCase):
         res_target = Orange.evaluation.F1(results, target=0)
         self.assertEqual(res_target[0], 1.)
         self.assertAlmostEqual(res_target[1], 3 / 4)
+
+
+class Scoring_Statistics_Test(unittest.TestCase):
+    def test_classification(self):
+        data = Orange.data.Table('iris')
+        learners = [Orange.classification.LogisticRegressionLearner(),
+                    Orange.classification.MajorityLearner()]
+        for method, kwargs in ((Orange.evaluation.CrossValidation, dict(k=5)),
+                               (Orange.evaluation.LeaveOneOut, {}),
+                               (Orange.evaluation.TestOnTrainingData, {})):
+            results = method(data, learners, **kwargs)
+            streaming = method(data, learners, streaming=True, **kwargs)
+            self.assertFalse(hasattr(streaming, "probabilities"))
+            for score in (CA, F1, AUC):
+                np.testing.assert_almost_equal(score(streaming),
+                                               score(results))
+            np.testing.assert_almost_equal(
+                AUC(streaming, target=2), AUC(results, target=2), 2)
+
+    def test_get_fold(self):
+        data = Orange.data.Table('iris')
+        learners = [Orange.classification.LogisticRegressionLearner()]
+        results = Orange.evaluation.CrossValidation(data, learners, k=3)
+        streaming = Orange.evaluation.CrossValidation(data, learners, k=3,
+                                                      streaming=True)
+        self.assertEqual(streaming.nrows, results.nrows)
+        for fold in range(3):
+            fold_results = results.get_fold(fold)
+            fold_streaming = streaming.get_fold(fold)
+            self.assertEqual(fold_streaming.nrows, len(fold_results.actual))
+            for score in (CA, AUC):
+                np.testing.assert_almost_equal(score(fold_streaming),
+                                               score(fold_results))
+
+    def test_binary(self):
+        results = Orange.evaluation.Results(
+            domain=Domain([], DiscreteVariable(name="y", values="01")),
+            actual=[0, 1, 1, 1, 0, 0, 1, 0, 0, 1])
+        results.predicted = np.array([[0, 1, 1, 1, 0, 0, 1, 0, 0, 1],
+                                      [0, 1, 1, 1, 0, 0, 1, 1, 1, 1]])
+        statistics = ResultsStatistics(results.domain, 2)
+        for i, predicted in enumerate(results.predicted):
+            statistics.update(i, results.actual, predicted)
+        for score in (CA, F1, AUC, Orange.evaluation.Precision,
+                      Orange.evaluation.Recall):
+            np.testing.assert_almost_equal(score(statistics), score(results))
+
+    def test_regression(self):
+        data = Orange.data.Table('housing')
+        learners = [Orange.regression.LinearRegressionLearner(),
+                    Orange.regression.MeanLearner()]
+        results = Orange.evaluation.CrossValidation(data, learners, k=3)
+        streaming = Orange.evaluation.CrossValidation(data, learners, k=3,
+                                                      streaming=True)
+        for score in (Orange.evaluation.MSE, Orange.evaluation.RMSE,
+                      Orange.evaluation.MAE, Orange.evaluation.R2):
+            np.testing.assert_almost_equal(score(streaming), score(results))
+
+    def test_merge(self):
+        data = Orange.data.Table('iris')
+        model = Orange.classification.LogisticRegressionLearner()(data)
+        values, probs = model(data, model.ValueProbs)
+        whole = ResultsStatistics(data.domain, 1)
+        whole.update(0, data.Y, values, probs)
+        parts = [ResultsStatistics(data.domain, 1) for _ in range(3)]
+        for part, rows in zip(parts, (slice(0, 60), slice(60, 61),
+                                      slice(61, None))):
+            part.update(0, data.Y[rows], values[rows], probs[rows])
+        merged = parts[0].merge(parts[1]).merge(parts[2])
+        np.testing.assert_equal(merged.confusion, whole.confusion)
+        np.testing.assert_equal(merged.histograms, whole.histograms)
+
+        data = Orange.data.Table('housing')
+        whole = ResultsStatistics(data.domain, 1)
+        whole.update(0, data.Y, data.Y + 1)
+        parts = [ResultsStatistics(data.domain, 1) for _ in range(2)]
+        parts[0].update(0, data.Y[:100], data.Y[:100] + 1)
+        parts[1].update(0, data.Y[100:], data.Y[100:] + 1)
+        merged = parts[0].merge(parts[1])
+        np.testing.assert_almost_equal(merged.moments, whole.moments)
+        np.testing.assert_almost_equal(Orange.evaluation.R2(merged),
+                                       Orange.evaluation.R2(whole))
+
+    def test_unsupported(self):
+        data = Orange.data.Table('iris')
+        statistics = ResultsStatistics(data.domain, 1)
+        self.assertRaises(TypeError, Orange.evaluation.LogLoss, statistics)
@@ -1,10 +1,14 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+
 import Orange
 import numpy as np
 
-from Orange.classification import NaiveBayesLearner, MajorityLearner
+from Orange.classification import NaiveBayesLearner, MajorityLearner, \
+    SimpleTreeLearner
 from Orange.classification.majority import ConstantModel
 from Orange.classification.naive_bayes import NaiveBayesModel
+from Orange.classification.simple_tree import SimpleTreeModel
 from Orange.data import Table
 from Orange.evaluation import *
 from Orange.preprocess import discretize, preprocess
@@ -20,6 +24,13 @@ def random_data(nrows, ncols):
     return table
 
 
+class UnpicklableLearner(MajorityLearner):
+    def fit_storage(self, data):
+        model = super().fit_storage(data)
+        model.unpicklable = lambda: None
+        return model
+
+
 class TestingTestCase(unittest.TestCase):
     def test_no_data(self):
         self.assertRaises(TypeError, CrossValidation,
@@ -67,6 +78,43 @@ class CommonSamplingTests:
                preprocessor=preprocessor)
         self.assertEqual(data_sizes, expected_sizes)
 
+    def run_test_parallel(self, method, data, **kwargs):
+        def fails(_):
+            raise SystemError("failing learner")
+
+        learners = [SimpleTreeLearner(), MajorityLearner()]
+        expected = method(data, learners, store_models=True, **kwargs)
+        for parallel in (dict(n_jobs=2),
+                         dict(executor=ThreadPoolExecutor(2))):
+            progress = []
+            res = method(data, learners, store_models=True,
+                         callback=progress.append, **dict(kwargs, **parallel))
+            np.testing.assert_equal(res.predicted, expected.predicted)
+            np.testing.assert_almost_equal(res.probabilities,
+                                           expected.probabilities)
+            np.testing.assert_equal(res.actual, expected.actual)
+            np.testing.assert_equal(res.row_indices, expected.row_indices)
+            self.assertEqual(res.failed, [False, False])
+            self.assertEqual(len(res.models), len(expected.models))
+            self.assertIsInstance(res.models[0][0], SimpleTreeModel)
+            self.assertEqual(len(progress), 2 * len(res.models) + 1)
+            self.assertEqual(progress[-1], 1)
+
+        res = method(data, [MajorityLearner(), fails],
+                     executor=ThreadPoolExecutor(2), **kwargs)
+        self.assertFalse(res.failed[0])
+        self.assertIsInstance(res.failed[1], SystemError)
+        np.testing.assert_equal(res.predicted[0], expected.predicted[1])
+
+        with self.assertWarns(UserWarning):
+            res = method(data, [MajorityLearner(), UnpicklableLearner()],
+                         store_models=True, n_jobs=2, **kwargs)
+        self.assertEqual(res.failed, [False, False])
+        np.testing.assert_equal(res.predicted[0], expected.predicted[1])
+        np.testing.assert_equal(res.predicted[1], expected.predicted[1])
+        self.assertIsNotNone(res.models[0][0])
+        self.assertIsNone(res.models[0][1])
+
 
 class CrossValidationTestCase(unittest.TestCase, CommonSamplingTests):
     def test_results(self):
@@ -183,6 +231,30 @@ class CrossValidationTestCase(unittest.TestCase, CommonSamplingTests):
     def test_preprocessor(self):
         self.run_test_preprocessor(CrossValidation, [135] * 10)
 
+    def test_parallel(self):
+        self.run_test_parallel(CrossValidation, random_data(50, 4), k=5)
+
+    def test_shared_preprocessing(self):
+        class CountingContinuize(preprocess.Continuize):
+            def __call__(self, data):
+                nonlocal calls
+                calls += 1
+                return super().__call__(data)
+
+        calls = 0
+        data = Table("titanic")
+        learners = [MajorityLearner(preprocessors=[CountingContinuize()]),
+                    MajorityLearner(preprocessors=[CountingContinuize()])]
+        res = CrossValidation(data, learners, k=3)
+        self.assertEqual(calls, 3)
+        np.testing.assert_equal(res.predicted[0], res.predicted[1])
+
+        calls = 0
+        learners.append(
+            MajorityLearner(preprocessors=[CountingContinuize(False)]))
+        CrossValidation(data, learners, k=3)
+        self.assertEqual(calls, 6)
+
 
 class LeaveOneOutTestCase(unittest.TestCase, CommonSamplingTests):
     def test_results(self):
@@ -290,6 +362,9 @@ class LeaveOneOutTestCase(unittest.TestCase, CommonSamplingTests):
     def test_preprocessor(self):
         self.run_test_preprocessor(LeaveOneOut, [149] * 150)
 
+    def test_parallel(self):
+        self.run_test_parallel(LeaveOneOut, random_data(20, 4))
+
 
 class TestOnTrainingTestCase(unittest.TestCase, CommonSamplingTests):
     def test_results(self):
@@ -462,7 +537,7 @@ class TestTrainTestSplit(unittest.TestCase):
         self.assertGreater(len(train) + len(test), len(data))
 
 
-class TestShuffleSplit(unittest.TestCase):
+class TestShuffleSplit(unittest.TestCase, CommonSamplingTests):
     def test_results(self):
         nrows, ncols = 100, 10
         data = random_data(nrows, ncols)
@@ -471,3 +546,7 @@ class TestShuffleSplit(unittest.TestCase):
                            test_size=1 - train_size, n_resamples=n_resamples)
         self.assertEqual(len(res.predicted[0]),
                          n_resamples * nrows * (1 - train_size))
+
+    def test_parallel(self):
+        self.run_test_parallel(ShuffleSplit, random_data(50, 4),
+                               n_resamples=4)
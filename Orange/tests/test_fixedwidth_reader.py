@@ -1,5 +1,7 @@
 import io
 import unittest
+from collections import OrderedDict
+from unittest.mock import patch
 
 import numpy
 import os
@@ -10,6 +12,7 @@ from Orange import data
 from Orange.data import ContinuousVariable, DiscreteVariable
 from Orange.data.io import TabDelimFormat
 from Orange.data.io import FixedWidthFormat
+from Orange.data.io import FixedWidthMemmapReader
 
 from Orange.data.fixed_from_tab import  fixed_from_tab
 
@@ -102,6 +105,74 @@ class TestFixedFormat(unittest.TestCase):
                 )
             )
 
+    def test_read_rows(self):
+        names = ["CRIM", "ZN", "INDUS", "CHAS"]
+        row_indices = [4, 10, 23, 24]
+        rows = FixedWidthFormat().read_rows(
+            self.dir_data + 'housing.fixed',
+            row_indices,
+            names,
+        )
+        self.assertEqual(rows.shape, (len(row_indices), len(names)))
+        for i, index_row in enumerate(row_indices):
+            for j, name in enumerate(names):
+                value_cell = FixedWidthFormat().read_cell(
+                    self.dir_data + 'housing.fixed',
+                    index_row=index_row,
+                    name_attribute=name,
+                )
+                self.assertEqual(rows[i, j], value_cell)
+
+    def test_memmap_reader(self):
+        table_tab = TabDelimFormat().read_file(self.dir_data + 'housing.tab')
+        reader = FixedWidthMemmapReader(self.dir_data + 'housing.fixed')
+        self.assertEqual(len(reader), len(table_tab))
+        names = [var.name for var in table_tab.domain.variables]
+
+        rows = reader.read_rows(slice(10, 20), names)
+        self.assertEqual(rows.shape, (10, len(names)))
+        numpy.testing.assert_almost_equal(
+            rows, numpy.hstack((table_tab.X, table_tab._Y))[10:20])
+
+        row_indices = [400, 3, 3, 57]
+        column = reader.read_column("CRIM", row_indices)
+        for value, index_row in zip(column, row_indices):
+            self.assertEqual(value, table_tab[index_row]["CRIM"])
+
+    def test_describe(self):
+        name_table_fixed = self.dir_data + 'housing.fixed'
+        descriptor = FixedWidthFormat().describe(name_table_fixed)
+        self.assertIs(FixedWidthFormat().describe(name_table_fixed), descriptor)
+        self.assertIs(FixedWidthMemmapReader(name_table_fixed).descriptor,
+                      descriptor)
+        self.assertEqual(descriptor.n_rows,
+                         FixedWidthFormat().count_lines(name_table_fixed))
+
+        # Changing the file invalidates the descriptor.
+        reader = FixedWidthMemmapReader(name_table_fixed)
+        self.assertTrue(reader.is_current())
+        with open(name_table_fixed, 'rb') as f:
+            lines = f.readlines()
+        with open(name_table_fixed, 'wb') as f:
+            f.writelines(lines[:-1])
+        self.assertFalse(reader.is_current())
+        descriptor_new = FixedWidthFormat().describe(name_table_fixed)
+        self.assertIsNot(descriptor_new, descriptor)
+        self.assertEqual(descriptor_new.n_rows, descriptor.n_rows - 1)
+
+    def test_describe_bounded(self):
+        names = [os.path.abspath(self.dir_data + name + '.fixed')
+                 for name in ('housing', 'glass', 'test4')]
+        with patch.object(FixedWidthFormat, 'descriptors', OrderedDict()), \
+                patch.object(FixedWidthFormat, 'max_descriptors', 2):
+            for name in names:
+                FixedWidthFormat().describe(name)
+            self.assertEqual(list(FixedWidthFormat.descriptors), names[1:])
+            FixedWidthFormat().describe(names[1])
+            FixedWidthFormat().describe(names[0])
+            self.assertEqual(list(FixedWidthFormat.descriptors),
+                             [names[1], names[0]])
+
     def tearDown(self):
         for name_table in self.names_tables:
             name_table_fixed = self.dir_data + name_table + ".fixed"
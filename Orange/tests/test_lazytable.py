@@ -1,4 +1,7 @@
+import gc
 import os
+import pickle
+import time
 import unittest
 from itertools import chain, islice
 from math import isnan
@@ -7,6 +10,7 @@ import random
 from Orange import data
 from Orange.data import filter, Variable
 from Orange.data import Unknown
+from Orange.data.lazytable import LazyDataSource, LazyTable, RowMapping
 
 import numpy as np
 from unittest.mock import Mock, MagicMock, patch
@@ -2020,6 +2024,171 @@ class TableTestCase(unittest.TestCase):
 #        np.testing.assert_array_equal(table.X[:, 0], np.arange(len(table)))
 
 
+class ArangeDataSource(LazyDataSource):
+
+    def pull_length(self):
+        return 3000
+
+    def pull_rows(self, row_indices, variables):
+        row_indices = np.asarray(row_indices, dtype=float)
+        return np.column_stack([row_indices, 2 * row_indices])
+
+
+class PrefetchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.domain = data.Domain([data.ContinuousVariable("a"),
+                                   data.ContinuousVariable("b")])
+
+    def store_all(self, table):
+        prefetcher = table.prefetcher
+        n_stored = 0
+        for _ in range(500):
+            n_stored += table.store_prefetched()
+            if not prefetcher.thread.is_alive() and prefetcher.queue.empty():
+                break
+            time.sleep(0.01)
+        return n_stored
+
+    def test_prefetch(self):
+        table = LazyTable.from_domain(self.domain)
+        table.widget_origin = ArangeDataSource()
+        self.assertEqual(self.store_all(table), 3000)
+        np.testing.assert_array_equal(table.X[:, 1], 2 * table.X[:, 0])
+        self.assertEqual(set(table.row_mapping), set(range(3000)))
+        table.prefetcher.thread.join(1)
+        self.assertFalse(table.prefetcher.thread.is_alive())
+
+    def test_prefetch_region_of_interest(self):
+        table = LazyTable.from_domain(self.domain)
+        table.region_of_interest = filter.Values(
+            [filter.FilterContinuous(0, filter.FilterContinuous.Less, ref=100)])
+        table.widget_origin = ArangeDataSource()
+        self.store_all(table)
+        self.assertEqual(sorted(table.row_mapping), list(range(100)))
+
+    def test_cancel(self):
+        table = LazyTable.from_domain(self.domain)
+        table.widget_origin = ArangeDataSource()
+        prefetcher = table.prefetcher
+        table.stop_pulling = True
+        self.assertTrue(prefetcher.cancelled.is_set())
+        self.assertEqual(table.store_prefetched(), 0)
+
+        table = LazyTable.from_domain(self.domain)
+        table.widget_origin = ArangeDataSource()
+        prefetcher = table.prefetcher
+        del table
+        gc.collect()
+        self.assertTrue(prefetcher.cancelled.is_set())
+
+    def test_materialize(self):
+        table = LazyTable.from_domain(self.domain)
+        table.stop_pulling = True
+        table.widget_origin = ArangeDataSource()
+        rows = table.materialize([5, 2, 5])
+        np.testing.assert_array_equal(table.X[rows], [[5, 10], [2, 4], [5, 10]])
+        self.assertEqual(table.len_instantiated_data(), 2)
+
+    def test_materialize_filtered(self):
+        table = LazyTable.from_domain(self.domain)
+        table.stop_pulling = True
+        table.widget_origin = ArangeDataSource()
+        filtered = table._filter_values(filter.Values(
+            [filter.FilterContinuous(0, filter.FilterContinuous.GreaterEqual, ref=100)]))
+        rows = filtered.materialize([0, 3])
+        np.testing.assert_array_equal(filtered.X[rows], [[100, 200], [103, 206]])
+
+        table.row_filters = filtered.row_filters
+        with self.assertRaises(ValueError):
+            table.materialize([0])
+
+    def test_pull_cell(self):
+        source = ArangeDataSource()
+        self.assertEqual(source.pull_cell(3, self.domain[0]), 3)
+        with self.assertRaises(NotImplementedError):
+            LazyDataSource().pull_cell(3, self.domain[1])
+
+
+class RowMappingTestCase(unittest.TestCase):
+
+    def test_two_way_mapping(self):
+        mapping = RowMapping()
+        mapping.add([10, 5, 7], [0, 1, 2])
+        mapping[3] = 3
+        self.assertEqual(len(mapping), 4)
+        self.assertIn(5, mapping)
+        self.assertNotIn(6, mapping)
+        self.assertNotIn(100, mapping)
+        self.assertEqual(mapping[7], 2)
+        self.assertIsNone(mapping.get(6))
+        np.testing.assert_array_equal(mapping.lookup([3, 6, 10, 100]),
+                                      [3, -1, 0, -1])
+        np.testing.assert_array_equal(mapping.contains([5, 6]), [True, False])
+        np.testing.assert_array_equal(mapping.full_from_materialized(),
+                                      [10, 5, 7, 3])
+        self.assertEqual(list(mapping), [10, 5, 7, 3])
+        self.assertEqual(dict(mapping.items()), {10: 0, 5: 1, 7: 2, 3: 3})
+
+        # Remapping a materialized row replaces the old mapping.
+        mapping[11] = 1
+        self.assertNotIn(5, mapping)
+        self.assertEqual(len(mapping), 4)
+
+    def test_keep(self):
+        mapping = RowMapping.identity(5)
+        mapping.keep([4, 1])
+        self.assertEqual(dict(mapping.items()), {4: 0, 1: 1})
+        self.assertEqual(len(mapping), 2)
+
+    def test_pickle(self):
+        mapping = RowMapping.identity(5)
+        mapping2 = pickle.loads(pickle.dumps(mapping))
+        self.assertEqual(dict(mapping2.items()), dict(mapping.items()))
+        self.assertIsNot(mapping2.lock, mapping.lock)
+        mapping2.add([7], [5])
+        self.assertIn(7, mapping2)
+
+    def test_sparse(self):
+        mapping = RowMapping()
+        mapping.add([0, 1], [0, 1])
+        self.assertFalse(mapping.is_sparse())
+        far = 10 ** 12
+        mapping.add([far, 5], [2, 3])
+        self.assertTrue(mapping.is_sparse())
+        self.assertEqual(len(mapping), 4)
+        self.assertIn(far, mapping)
+        self.assertNotIn(far + 1, mapping)
+        self.assertEqual(mapping[5], 3)
+        self.assertIsNone(mapping.get(6))
+        np.testing.assert_array_equal(mapping.lookup([far, 1, 6, -1]),
+                                      [2, 1, -1, -1])
+
+        # Remapping works in both directions.
+        mapping[7] = 3
+        mapping[far] = 4
+        self.assertNotIn(5, mapping)
+        self.assertEqual(dict(mapping.items()), {0: 0, 1: 1, 7: 3, far: 4})
+        np.testing.assert_array_equal(mapping.sorted_full, [0, 1, 7, far])
+        np.testing.assert_array_equal(mapping.sorted_materialized,
+                                      [0, 1, 3, 4])
+
+        mapping.keep([0, 4])
+        self.assertEqual(dict(mapping.items()), {0: 0, far: 1})
+        self.assertTrue(mapping.is_sparse())
+        mapping.keep([0])
+        self.assertFalse(mapping.is_sparse())
+        np.testing.assert_array_equal(mapping.missing(0, 4, 3), [1, 2, 3])
+
+    def test_missing(self):
+        mapping = RowMapping()
+        mapping.add([0, 1, 3, 6], [0, 1, 2, 3])
+        np.testing.assert_array_equal(mapping.missing(0, 10, 3), [2, 4, 5])
+        np.testing.assert_array_equal(mapping.missing(5, 7, 3), [5])
+        self.assertEqual(list(mapping.iter_missing(0, 8, chunk_size=3)),
+                         [2, 4, 5, 7])
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from Orange.data import Table
+from Orange.data.io import NumpyDirectoryFormat
+
+
+class TestNumpyDirectoryFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_write_read(self):
+        for name in ("iris", "zoo", "housing"):
+            table = Table(name)
+            filename = os.path.join(self.dir, name + ".npytable")
+            table.save(filename)
+            table2 = Table(filename)
+            self.assertIsInstance(table2.X, np.memmap)
+            self.assertEqual(table2.domain, table.domain)
+            np.testing.assert_equal(table2.X, table.X)
+            np.testing.assert_equal(table2._Y, table._Y)
+            np.testing.assert_equal(table2.W, table.W)
+            np.testing.assert_equal(table2.metas, table.metas)
+            self.assertEqual(len(set(table2.ids)), len(table2))
+
+    def test_copy_on_write(self):
+        filename = os.path.join(self.dir, "iris.npytable")
+        Table("iris").save(filename)
+        table = Table(filename)
+        table.X[0, 0] = 42
+        self.assertNotEqual(Table(filename).X[0, 0], 42)
+
+    def test_cache(self):
+        filename = os.path.join(self.dir, "iris.tab")
+        shutil.copy(Table("iris").__file__, filename)
+        cache = NumpyDirectoryFormat.cache_filename(filename)
+
+        table = Table.from_file(filename, cache=True)
+        self.assertTrue(os.path.isdir(cache))
+        self.assertNotIsInstance(table.X, np.memmap)
+
+        table_cached = Table.from_file(filename, cache=True)
+        self.assertIsInstance(table_cached.X, np.memmap)
+        self.assertEqual(table_cached.name, "iris")
+        np.testing.assert_equal(table_cached.X, table.X)
+        np.testing.assert_equal(table_cached._Y, table._Y)
+
+        # Changing the file invalidates the cache.
+        with open(filename) as f:
+            lines = f.readlines()
+        with open(filename, "w") as f:
+            f.writelines(lines[:-1])
+        table_changed = Table.from_file(filename, cache=True)
+        self.assertEqual(len(table_changed), len(table) - 1)
+        self.assertNotIsInstance(table_changed.X, np.memmap)
+        self.assertEqual(len(Table.from_file(filename, cache=True)),
+                         len(table) - 1)
+
+    def test_resize(self):
+        filename = os.path.join(self.dir, "iris.tab")
+        shutil.copy(Table("iris").__file__, filename)
+        Table.from_file(filename, cache=True)
+        table = Table.from_file(filename, cache=True)
+        self.assertIsInstance(table.X, np.memmap)
+        self.assertTrue(table.is_copy())
+
+        n = len(table)
+        table.append(table[0])
+        table.extend(table[:2])
+        table.insert(0, table[1])
+        self.assertEqual(len(table), n + 4)
+        np.testing.assert_equal(table.X[-3], table.X[1])
+        self.assertEqual(len(Table.from_file(filename, cache=True)), n)
+
+
+if __name__ == "__main__":
+    unittest.main()
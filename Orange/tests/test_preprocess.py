@@ -3,6 +3,7 @@ from unittest.mock import Mock, MagicMock, patch
 import numpy as np
 
 import Orange
+from Orange.preprocess.cache import PreprocessCache, active_cache
 
 
 class TestPreprocess(unittest.TestCase):
@@ -52,3 +53,83 @@ class RemoveConstant(unittest.TestCase):
         data = Orange.data.Table("iris")
         d = Orange.preprocess.preprocess.RemoveConstant(data)
         self.assertEqual(len(d.domain.attributes), 4)
+
+
+class PreprocessCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.data = Orange.data.Table("titanic")
+        self.cache = PreprocessCache()
+
+    def test_memoized(self):
+        cont = Orange.preprocess.Continuize()
+        cont2 = Orange.preprocess.Continuize()
+        result = self.cache.preprocess(cont, self.data)
+        self.assertIs(self.cache.preprocess(cont, self.data), result)
+        self.assertIs(self.cache.preprocess(cont2, self.data), result)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+        other = Orange.preprocess.Continuize(zero_based=False)
+        self.assertIsNot(self.cache.preprocess(other, self.data), result)
+        self.assertIsNot(
+            self.cache.preprocess(cont, Orange.data.Table(self.data)), result)
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_changed_data(self):
+        cont = Orange.preprocess.Continuize()
+        result = self.cache.preprocess(cont, self.data)
+        self.data.X[0, 0] = 1 - self.data.X[0, 0]
+        changed = self.cache.preprocess(cont, self.data)
+        self.assertIsNot(changed, result)
+        changed.X[0, 0] += 1
+        self.assertIsNot(self.cache.preprocess(cont, self.data), changed)
+
+    def test_not_memoized(self):
+        randomize = Orange.preprocess.Randomize()
+        self.assertIsNot(self.cache.preprocess(randomize, self.data),
+                         self.cache.preprocess(randomize, self.data))
+        self.assertEqual(len(self.cache), 0)
+
+        class Custom(Orange.preprocess.preprocess.Preprocess):
+            def __call__(self, data):
+                return Orange.data.Table(data)
+
+        custom = Custom()
+        self.assertIsNot(self.cache.preprocess(custom, self.data),
+                         self.cache.preprocess(custom, self.data))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_remove_results(self):
+        flags = Orange.preprocess.Remove.RemoveConstant
+        self.cache.preprocess(
+            Orange.preprocess.Remove(attr_flags=flags), self.data)
+        remove = Orange.preprocess.Remove(attr_flags=flags)
+        self.cache.preprocess(remove, self.data)
+        self.assertIsNotNone(remove.attr_results)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_max_size(self):
+        self.cache.max_size = 2
+        cont = Orange.preprocess.Continuize()
+        tables = [Orange.data.Table(self.data) for _ in range(3)]
+        for table in tables:
+            self.cache.preprocess(cont, table)
+        self.assertEqual(len(self.cache), 2)
+        self.cache.preprocess(cont, tables[0])
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_convert(self):
+        domain = Orange.preprocess.Continuize()(self.data).domain
+        converted = self.cache.convert(domain, self.data)
+        self.assertEqual(converted.domain, domain)
+        self.assertIs(self.cache.convert(domain, self.data), converted)
+
+    def test_active(self):
+        self.assertIsNone(active_cache())
+        learner = Orange.classification.MajorityLearner(
+            preprocessors=[Orange.preprocess.Continuize()])
+        with self.cache:
+            self.assertIs(active_cache(), self.cache)
+            learner(self.data)
+            learner(self.data)
+        self.assertIsNone(active_cache())
+        self.assertEqual(self.cache.hits, 1)
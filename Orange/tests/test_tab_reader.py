@@ -38,6 +38,37 @@ class TestTabReader(unittest.TestCase):
         np.testing.assert_almost_equal(table.X, np.array([[1, 0], [np.nan, 1], [2, 0]]))
         np.testing.assert_almost_equal(table.Y, np.array([[5, 1], [7, 0], [4, np.nan]]))
 
+    def test_iter_chunks(self):
+        simplefile = """\
+        Feature 1\tFeature 2\tClass 1\tClass 42
+        c        \tM F      \tc      \td
+                 \t         \tclass  \tclass
+        1.0      \tM        \t5      \trich
+                 \tF        \t7      \tpoor
+        2.0      \tM        \t4      \t
+        3.0      \tF        \t1      \tpoor
+        """
+        table = TabDelimFormat()._read_file(io.StringIO(simplefile))
+        chunks = list(TabDelimFormat()._iter_chunks(io.StringIO(simplefile),
+                                                    rows_per_chunk=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 1])
+        self.assertIs(chunks[0].domain, chunks[1].domain)
+        self.assertEqual(chunks[0].domain, table.domain)
+        np.testing.assert_almost_equal(
+            np.vstack([chunk.X for chunk in chunks]), table.X)
+        np.testing.assert_almost_equal(
+            np.vstack([chunk.Y for chunk in chunks]), table.Y)
+
+        # Without prescan, the values are added as they are encountered.
+        chunks = list(TabDelimFormat()._iter_chunks(
+            io.StringIO(simplefile), rows_per_chunk=3, prescan=False))
+        self.assertEqual([str(row["Class 42"]) for chunk in chunks
+                          for row in chunk],
+                         ["rich", "poor", "?", "poor"])
+        self.assertEqual(chunks[-1].domain["Class 42"].values,
+                         ["rich", "poor"])
+        self.assertEqual(table.domain["Class 42"].values, ["poor", "rich"])
+
     def test_read_and_save_attributes(self):
         samplefile = """\
         Feature 1\tFeature 2\tClass 1\tClass 42
@@ -3,12 +3,15 @@ import unittest
 from itertools import chain
 from math import isnan
 import random
+import weakref
 
 from Orange import data
 from Orange.data import filter, Variable
 from Orange.data import Unknown
 
+import bottlechest as bn
 import numpy as np
+import scipy.sparse as sp
 from unittest.mock import Mock, MagicMock, patch
 
 
@@ -439,6 +442,18 @@ class TableTestCase(unittest.TestCase):
         del x[4:9]
         self.assertEqual(crc, d.checksum(True))
 
+    def test_iter_chunks(self):
+        d = data.Table("iris")
+        chunks = list(d.iter_chunks(40))
+        self.assertEqual([len(chunk) for chunk in chunks], [40, 40, 40, 30])
+        for chunk in chunks:
+            self.assertIs(chunk.domain, d.domain)
+        np.testing.assert_equal(np.vstack([chunk.X for chunk in chunks]),
+                                d.X)
+        np.testing.assert_equal(chunks[-1].Y, d.Y[120:])
+        # chunks are views
+        self.assertTrue(np.shares_memory(chunks[1].X, d.X))
+
     def test_bool(self):
         d = data.Table("iris")
         self.assertTrue(d)
@@ -605,6 +620,53 @@ class TableTestCase(unittest.TestCase):
         np.testing.assert_almost_equal(x[-2:, 1].X, y.X)
         self.assertEqual(np.isnan(x).sum(), 8)
 
+    def test_append_grows_geometrically(self):
+        d = data.Table("iris")
+        x = d[:0]
+        x.ensure_copy()
+        buffers = set()
+        for i in range(100):
+            x.append(d[i])
+            buffers.add(x.X.base.ctypes.data)
+            self.assertEqual(x.n_rows, i + 1)
+            self.assertTrue(x.is_copy())
+        self.assertLess(len(buffers), 15)
+        np.testing.assert_equal(x.X, d.X[:100])
+        np.testing.assert_equal(x.Y, d.Y[:100])
+
+        view = x[:10]
+        with self.assertRaises(ValueError):
+            view.append(d[0])
+        x.n_rows = 50
+        self.assertEqual(len(x), 50)
+        np.testing.assert_equal(x.X, d.X[:50])
+        x.n_rows = 60
+        np.testing.assert_equal(x.X[50:], 0)
+        np.testing.assert_equal(view.X, d.X[:10])
+
+    def test_extend_from_arrays(self):
+        d = data.Table("zoo")
+        d.extend_from_arrays(d.X[:3], d.Y[:3])
+        self.assertEqual(len(d), 104)
+        np.testing.assert_equal(d.X[-3:], d.X[:3])
+        np.testing.assert_equal(d.Y[-3:], d.Y[:3])
+        self.assertEqual(list(d.metas[-3:, 0]), [d.domain.metas[0].Unknown] * 3)
+        self.assertEqual(len(set(d.ids)), 104)
+
+        d.set_weights(2)
+        d.extend_from_arrays(d.X[:2], d.Y[:2], d.metas[:2], [3, 4])
+        np.testing.assert_equal(d.W[-3:], [2, 3, 4])
+        np.testing.assert_equal(d.metas[-2:], d.metas[:2])
+        d.extend_from_arrays(d.X[:1])
+        self.assertEqual(d.W[-1], 1)
+        self.assertTrue(np.isnan(d.Y[-1]))
+
+        with self.assertRaises(ValueError):
+            d.extend_from_arrays(d.X[:2, :3])
+        with self.assertRaises(ValueError):
+            d.extend_from_arrays(d.X[:2], d.Y[:3])
+        self.assertEqual(len(d), 107)
+
     def test_copy(self):
         t = data.Table(np.zeros((5, 3)), np.arange(5), np.zeros((5, 3)))
 
@@ -1672,6 +1734,89 @@ class CreateTableWithDomainAndTable(TableTests):
         self.assert_table_with_filter_matches(
             new_table, self.table[:0], xcols=order, ycols=order, mcols=order)
 
+    def test_projection_is_copy(self):
+        attrs = self.domain.attributes
+        new_domain = self.create_domain(
+            [attrs[i] for i in (1, 2, 3)], self.domain.class_vars)
+        new_table = data.Table.from_table(new_domain, self.table, slice(2, 8))
+        self.assertFalse(np.shares_memory(new_table.X, self.table.X))
+        new_table.X[:] = 42
+        self.assertFalse(np.any(self.table.X == 42))
+
+    def test_lazy_projection_is_view(self):
+        attrs = self.domain.attributes
+        for selected, rows in (([1, 2, 3], ...), ([8, 6, 4, 2], slice(2, 8)),
+                               ([5], slice(None, None, 2))):
+            new_domain = self.create_domain(
+                [attrs[i] for i in selected], self.domain.class_vars)
+            new_table = data.Table.from_table(
+                new_domain, self.table, rows, lazy=True)
+            self.assertTrue(new_table.is_view())
+            self.assertTrue(np.shares_memory(new_table.X, self.table.X))
+            self.assert_table_with_filter_matches(
+                new_table, self.table, rows=rows, xcols=selected,
+                mcols=slice(0, 0))
+
+            new_table.ensure_copy()
+            self.assertTrue(new_table.is_copy())
+            new_table.X[:] = 42
+            self.assertFalse(np.any(self.table.X == 42))
+
+        new_domain = self.create_domain(
+            [attrs[i] for i in (1, 2, 4)], self.domain.class_vars)
+        new_table = data.Table.from_table(new_domain, self.table, lazy=True)
+        self.assertFalse(np.shares_memory(new_table.X, self.table.X))
+
+    def test_lazy_computed_columns(self):
+        attrs = self.domain.attributes
+        compute = Mock(return_value=np.arange(len(self.table)))
+        computed = data.ContinuousVariable("computed", compute_value=compute)
+        new_domain = self.create_domain(
+            [computed, attrs[0]], self.domain.class_vars)
+
+        new_table = data.Table.from_table(new_domain, self.table, lazy=True)
+        compute.assert_not_called()
+        np.testing.assert_almost_equal(new_table.Y, self.table.Y)
+        self.assertTrue(np.shares_memory(new_table.Y, self.table.Y))
+        compute.assert_not_called()
+        np.testing.assert_almost_equal(new_table.X[:, 0],
+                                       np.arange(len(self.table)))
+        np.testing.assert_almost_equal(new_table.X[:, 1], self.table.X[:, 0])
+        self.assertFalse(np.shares_memory(new_table.X, self.table.X))
+        self.assertEqual(compute.call_count, 1)
+        new_table.X
+        self.assertEqual(compute.call_count, 1)
+        with self.assertRaises(AttributeError):
+            new_table.no_such_attribute
+
+        new_table = data.Table.from_table(new_domain, self.table, lazy=True)
+        compute.reset_mock()
+        new_table.__getstate__()
+        self.assertEqual(compute.call_count, 1)
+        self.assertNotIn("X", new_table._pending_columns)
+
+    def test_lazy_rows_with_step_are_view(self):
+        rows = np.arange(2, 8, 2)
+        new_table = data.Table.from_table(
+            self.domain, self.table, rows, lazy=True)
+        self.assertTrue(np.shares_memory(new_table.X, self.table.X))
+        self.assert_table_with_filter_matches(new_table, self.table[rows])
+
+        new_table = data.Table.from_table(self.domain, self.table, rows)
+        self.assertFalse(np.shares_memory(new_table.X, self.table.X))
+
+    def test_conversion_cache_respects_lazy(self):
+        attrs = self.domain.attributes
+        new_domain = self.create_domain(attrs[1:4], self.domain.class_vars)
+        data.Table.conversion_cache = {}
+        try:
+            copied = data.Table.from_table(new_domain, self.table)
+            viewed = data.Table.from_table(new_domain, self.table, lazy=True)
+        finally:
+            data.Table.conversion_cache = None
+        self.assertFalse(np.shares_memory(copied.X, self.table.X))
+        self.assertTrue(np.shares_memory(viewed.X, self.table.X))
+
     def assert_table_with_filter_matches(
             self, new_table, old_table,
             rows=..., xcols=..., ycols=..., mcols=...):
@@ -1983,6 +2128,184 @@ class TestRowInstance(unittest.TestCase):
         np.testing.assert_array_equal(table.X[:, 0], np.arange(len(table)))
 
 
+class ColumnSummariesTest(unittest.TestCase):
+    def assert_summaries_match(self, table, **kwargs):
+        summaries = table.compute_column_summaries(**kwargs)
+        distributions = table._compute_distributions()
+        for var, summary, (dist, unknowns) in zip(
+                table.domain.variables, summaries, distributions):
+            np.testing.assert_almost_equal(summary.distribution[0], dist)
+            self.assertEqual(summary.distribution[1], unknowns)
+            if var.is_continuous and dist.shape[1]:
+                min_, max_, mean, variance, nans, non_nans = summary.stats
+                self.assertEqual((min_, max_), (dist[0, 0], dist[0, -1]))
+                self.assertAlmostEqual(
+                    mean, np.average(dist[0], weights=dist[1]))
+                self.assertAlmostEqual(variance, np.average(
+                    (dist[0] - mean) ** 2, weights=dist[1]))
+                self.assertEqual(nans, unknowns)
+                self.assertEqual(non_nans, np.sum(dist[1]))
+
+    def test_dense(self):
+        for name in ("iris", "zoo", "housing"):
+            self.assert_summaries_match(data.Table(name))
+
+    def test_chunks_and_threads(self):
+        table = data.Table("housing")
+        table.X[::7, 3] = np.nan
+        self.assert_summaries_match(table, chunk_size=3, n_jobs=4)
+
+    def test_weights(self):
+        table = data.Table("iris")
+        table.set_weights(np.arange(len(table)) % 3)
+        self.assert_summaries_match(table)
+
+    def test_columns_and_want(self):
+        table = data.Table("zoo")
+        summaries = table.compute_column_summaries(
+            ["legs", table.domain.class_var], want=("stats",))
+        self.assertEqual(len(summaries), 2)
+        self.assertIsNone(summaries[0].distribution)
+        self.assertEqual(summaries[1].stats[0], 0)
+        self.assertEqual(summaries[1].stats[-1], len(table))
+        with self.assertRaises(ValueError):
+            table.compute_column_summaries([-1])
+
+    def test_sparse(self):
+        domain = data.Domain(
+            [data.DiscreteVariable("d", values=list("abc")),
+             data.ContinuousVariable("c")])
+        X = sp.csr_matrix(np.array([[0, 0], [2, 1.5], [0, 0], [1, 0]]))
+        table = data.Table.from_numpy(domain, X)
+        (stats_d, dist_d), (stats_c, dist_c) = \
+            table.compute_column_summaries()
+        np.testing.assert_almost_equal(dist_d[0], [0, 1, 1])
+        np.testing.assert_almost_equal(dist_c[0], [[1.5], [1]])
+        # statistics include the implicit zeros
+        self.assertEqual(stats_d[5], 4)
+        self.assertAlmostEqual(stats_c[2], 1.5 / 4)
+        self.assertEqual(stats_c[:2], (0, 1.5))
+
+
+
+class StatisticsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.table = data.Table("iris")
+        self.table.cache_statistics = True
+
+    def test_opt_in(self):
+        table = data.Table("iris")
+        view = table[:100]
+        self.assertEqual(view._compute_basic_stats([0])[0][1], 7)
+        table[0, 0] = 100
+        self.assertEqual(view._compute_basic_stats([0])[0][1], 100)
+        self.assertIsNone(view._statistics_cache)
+
+    def test_not_pickled(self):
+        table = self.table
+        table._compute_distributions([0])
+        self.assertNotIn("_statistics_cache", table.__getstate__())
+        self.assertIsNotNone(table._statistics_cache)
+
+    def test_does_not_keep_arrays(self):
+        table = self.table
+        table._compute_distributions([0])
+        ref = weakref.ref(table.X)
+        table.X = table.X.copy()
+        self.assertIsNone(ref())
+
+    def test_memoized(self):
+        table = self.table
+        with patch.object(table, "_compute_distributions_uncached",
+                          wraps=table._compute_distributions_uncached) as c:
+            dist = table._compute_distributions([0, 1])
+            self.assertEqual(c.call_args[0][0], [0, 1])
+            table._compute_distributions([1, 2])
+            self.assertEqual(c.call_args[0][0], [2])
+            self.assertEqual(c.call_count, 2)
+            np.testing.assert_equal(table._compute_distributions([0, 1]),
+                                    dist)
+            self.assertEqual(c.call_count, 2)
+            # the results can be modified by the caller
+            table._compute_distributions([0])[0][0][:] = 0
+            np.testing.assert_equal(table._compute_distributions([0, 1]),
+                                    dist)
+
+    def test_results_unchanged(self):
+        table = self.table
+        for _ in range(2):
+            np.testing.assert_equal(
+                table._compute_basic_stats(),
+                np.vstack((bn.stats(table.X, None), bn.stats(table._Y, None))))
+            stats = table._compute_basic_stats([3, "sepal length"])
+            np.testing.assert_equal(stats[1], bn.stats(table.X, None)[0])
+            conts, unknowns = table._compute_contingency([0, 4])
+            self.assertEqual(len(conts), 2)
+            self.assertEqual(unknowns, 0)
+            np.testing.assert_equal(conts[1][0], np.diag([50] * 3))
+
+    def test_invalidated_by_mutation(self):
+        def assert_invalidated(mutate):
+            before = table._compute_distributions([0, 4])
+            mutate()
+            after = table._compute_distributions_uncached([0, 4])
+            np.testing.assert_equal(
+                table._compute_distributions([0, 4]), after)
+            return before
+
+        table = self.table
+        assert_invalidated(lambda: table.__setitem__((0, 0), 42))
+        assert_invalidated(lambda: table.__setitem__(1, table[100]))
+        assert_invalidated(lambda: table.append(table[2]))
+        assert_invalidated(lambda: table.extend(table[:5]))
+        assert_invalidated(lambda: table.insert(0, table[120]))
+        assert_invalidated(lambda: table.__delitem__(slice(0, 10)))
+        assert_invalidated(lambda: table[5].set_class("Iris-virginica"))
+        assert_invalidated(lambda: table[6].__setitem__(0, 11))
+        assert_invalidated(lambda: table.set_weights(2))
+        assert_invalidated(table.shuffle)
+
+        def replace_x():
+            table.X = table.X + 1
+        assert_invalidated(replace_x)
+
+    def test_invalidated_by_changed_arrays(self):
+        table = self.table
+        table._compute_distributions([0])
+        table.X[:, 0] = 1
+        table.invalidate_statistics()
+        np.testing.assert_equal(
+            table._compute_distributions([0])[0][0], [[1], [150]])
+        table.Y[0] = np.nan
+        table.invalidate_statistics()
+        self.assertEqual(table._compute_contingency([0])[1], 1)
+
+        table = data.Table.from_numpy(
+            None, sp.csr_matrix(np.eye(3)), np.arange(3))
+        dists = table._compute_distributions([0, 1])
+        table.X = sp.csr_matrix(np.eye(3) * 5)
+        self.assertNotEqual(table._compute_distributions([0, 1])[0][0][0, -1],
+                            dists[0][0][0, -1])
+
+    def test_invalidate_statistics(self):
+        table = self.table
+        table._compute_distributions([0])
+        self.assertIsNotNone(table._statistics_cache)
+        table.invalidate_statistics()
+        self.assertIsNone(table._statistics_cache)
+
+    def test_disabled(self):
+        table = self.table
+        table.cache_statistics = False
+        table._compute_distributions([0])
+        self.assertIsNone(table._statistics_cache)
+        with patch.object(table, "_compute_distributions_uncached",
+                          wraps=table._compute_distributions_uncached) as c:
+            table._compute_distributions([0])
+            table._compute_distributions([0])
+            self.assertEqual(c.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -151,11 +151,18 @@ class OWDataSampler(widget.OWWidget):
                     'Outputting fold %d, %d instance%s.' %
                     (self.selectedFold, len(sample), "s" * (len(sample) != 1))
                 )
-            sample = self.data[sample]
-            other = self.data[remaining]
+            sample = self.subset(sample)
+            other = self.subset(remaining)
         self.send("Data Sample", sample)
         self.send("Remaining Data", other)
 
+    def subset(self, indices):
+        # rows with a constant step are shared with the input table
+        if type(self.data) == Table:
+            return Table.from_table(self.data.domain, self.data, indices,
+                                    lazy=True)
+        return self.data[indices]
+
     def updateindices(self):
         rnd = self.RandomSeed if self.use_seed else None
         stratified = (self.stratify and
@@ -542,6 +542,7 @@ class ColumnImputerFromModel(ColumnImputerModel):
 
         domain = Orange.data.Domain([trans.variable])
         X = Orange.data.Table.from_table(domain, data)
+        X.ensure_copy()
         mask = numpy.isnan(X.X[:, 0])
         X.X[mask, 0] = values
         return X
@@ -636,6 +637,7 @@ class ColumnImputerAsValue(ColumnImputerModel):
             assert isinstance(tr, ReplaceUnknowns)
             c = tr(data[:, variable])
             cindex = data.domain.index(variable)
+            data.ensure_copy()
             data.X[:, cindex] = c
         return data
 
@@ -814,6 +816,8 @@ class ImputerModel:
 
         if Xp is X:
             Xp = X.copy()
+        else:
+            Xp.ensure_copy()
 
         nattrs = len(Xp.domain.attributes)
         for var in X.domain:
@@ -4,11 +4,12 @@ The InfiniTable is a widget that creates a LazyTable of infinite size!
 __author__ = 'buddel'
 
 
-from Orange.data.lazytable import LazyTable
+from Orange.data.lazytable import LazyTable, LazyDataSource
 
 import os, sys
 
 from PyQt4 import QtGui
+from PyQt4.QtCore import QTimer
 
 from Orange.data import (io, DiscreteVariable, ContinuousVariable)
 from Orange.data.domain import Domain
@@ -20,8 +21,24 @@ import Orange.widgets.widget
 import numpy.random
 import hashlib
 from collections import OrderedDict
+from functools import partial
 
-class OWInfiniTable(Orange.widgets.widget.OWWidget):
+try:
+    from numpy.random import Philox
+except ImportError:
+    # Philox is only available since numpy 1.17.
+    Philox = None
+
+def normal_from_uniform(uniform, loc=0.0, scale=1.0):
+    """
+    Returns normally distributed values from the two uniform random numbers
+    in every row of uniform with the Box-Muller transform.
+    """
+    radius = numpy.sqrt(-2.0 * numpy.log1p(-uniform[:, 0]))
+    return loc + scale * radius * numpy.cos(2.0 * numpy.pi * uniform[:, 1])
+
+
+class OWInfiniTable(Orange.widgets.widget.OWWidget, LazyDataSource):
     """
     The InfiniTable is a widget that creates a LazyTable of infinite size!
     """
@@ -50,13 +67,30 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
     # of LazyRowInstance for information about its structure.
     region_of_interest = None
 
+    # Whether to generate rows with the counter based Philox generator
+    # and generate_columns() instead of reseeding the global random
+    # generator for every cell. Both are reproducible for every row, but
+    # they generate different values.
+    counter_based = Philox is not None
+
     def __init__(self):
         self.seed = 12345
 
+        # The class is uniformly distributed over its values and the
+        # attributes are normally distributed, with a location and scale
+        # for every value of the class. Both the functions that generate
+        # single cells and generate_columns() are derived from these.
+        self.class_values = OrderedDict()
+        self.class_values['class'] = ['alpha', 'beta']
+        self.normal_parameters = OrderedDict()
+        self.normal_parameters['a'] = [(1.0, 2.0), (5.0, 2.0)]
+        self.normal_parameters['b'] = [(-1.0, 1.0), (1.0, 0.5)]
+
         # TODO: Where should this row generating function be?
         #  Here, in the LazyTable or in the LazyRowInstance
         self.class_vars = OrderedDict()
-        self.class_vars['class'] = lambda row_index: numpy.random.randint(2)
+        for name, values in self.class_values.items():
+            self.class_vars[name] = partial(self.generate_class_cell, values)
 
         self.attributes_continuous = OrderedDict()
 
@@ -89,14 +123,9 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
         #self.attributes_continuous['s'] = lambda row_index: numpy.random.random() * 8.0 + 10.0
         #self.attributes_continuous['t'] = lambda row_index: numpy.random.random() * 8.0 + 10.0
         #self.attributes_continuous['u'] = lambda row_index: numpy.random.random() * 8.0 + 10.0
-        self.attributes_continuous['a'] = lambda row_index: \
-            numpy.random.normal(loc=1.0, scale=2.0) \
-            if self.pull_cell(row_index, 'class') == 0 else \
-            numpy.random.normal(loc=5.0, scale=2.0)
-        self.attributes_continuous['b'] = lambda row_index: \
-            numpy.random.normal(loc=-1.0, scale=1.0) \
-            if self.pull_cell(row_index, 'class') == 0 else \
-            numpy.random.normal(loc=1.0, scale=0.5)
+        for name, parameters in self.normal_parameters.items():
+            self.attributes_continuous[name] = \
+                partial(self.generate_normal_cell, parameters)
 
         self.data = LazyTable.from_domain(domain = self.pull_domain())
         self.data.widget_origin = self
@@ -107,6 +136,13 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
 
         self.send("Data", self.data)
 
+        # Rows are prefetched in the background, store them regularly and
+        # send them in growing batches. n_rows_sent counts the prefetched
+        # rows that were sent, n_rows_unsent those stored since.
+        self.n_rows_sent = self.n_rows_unsent = 0
+        self.timer_prefetched = QTimer(self, interval=1000, timeout=self.store_prefetched)
+        self.timer_prefetched.start()
+
 
 
     def pull_header(self):
@@ -126,10 +162,9 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
             ContinuousVariable(name=column)
             for column in self.attributes_continuous
         ]
-        # TODO: get values from self.something.
         class_vars = [
-            DiscreteVariable(name=column, values=['alpha', 'beta'])
-            for column in self.class_vars
+            DiscreteVariable(name=column, values=values)
+            for column, values in self.class_values.items()
         ]
         domain = Domain(
             attributes=attributes,
@@ -173,6 +208,8 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
         """
         if not isinstance(name_attribute, str):
             name_attribute = name_attribute.name
+        if self.counter_based:
+            return self.pull_rows([index_row], [name_attribute])[0, 0]
         # TODO: Use a proper seed that does not repeat itself.
         # TODO: Handle attributes/class_vars/metas properly.
         index_attribute = \
@@ -206,6 +243,93 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
 
         return cell
 
+    def pull_rows(self, row_indices, variables):
+        """
+        Returns the values of the given variables for the given rows,
+        as an array with one row per row index.
+        """
+        if self.counter_based:
+            columns = self.generate_columns(row_indices)
+            names = [
+                variable if isinstance(variable, str) else variable.name
+                for variable in variables
+            ]
+            rows = numpy.column_stack([columns[name] for name in names])
+            return rows.reshape(len(row_indices), len(variables))
+        rows = numpy.array([
+            [self.pull_cell(index_row, variable) for variable in variables]
+            for index_row in row_indices
+        ], dtype=float)
+        return rows.reshape(len(row_indices), len(variables))
+
+    def uniforms(self, row_indices, number_per_row):
+        """
+        Returns an array with number_per_row uniform random numbers in
+        [0, 1) for every row index. The numbers of a row only depend on
+        self.seed and the row index, so any row can be generated again
+        on its own or as part of any block of rows.
+
+        Every row gets its own range of counters of a Philox generator
+        keyed on self.seed. Consecutive row indices are therefore
+        generated with a single call.
+        """
+        row_indices = numpy.asarray(row_indices, dtype=numpy.int64).ravel()
+        # Philox gives four 64 bit integers for every counter value.
+        counters_per_row = -(-number_per_row // 4)
+        raw_per_row = 4 * counters_per_row
+        uniforms = numpy.empty((len(row_indices), raw_per_row))
+        order = numpy.argsort(row_indices, kind='mergesort')
+        rows_sorted = row_indices[order]
+        starts_runs = numpy.flatnonzero(numpy.diff(rows_sorted) != 1) + 1
+        for run in numpy.split(numpy.arange(len(order)), starts_runs):
+            if not len(run):
+                continue
+            bit_generator = Philox(
+                key=self.seed,
+                counter=int(rows_sorted[run[0]]) * counters_per_row)
+            raw = bit_generator.random_raw(len(run) * raw_per_row)
+            # The 53 most significant bits make a double in [0, 1).
+            uniforms[order[run]] = \
+                ((raw >> numpy.uint64(11)) * 2.0 ** -53).reshape(len(run), raw_per_row)
+        return uniforms[:, :number_per_row]
+
+    def generate_class_cell(self, values, index_row):
+        """
+        Returns the index of a random value of a class variable with the
+        given values.
+        """
+        return numpy.random.randint(len(values))
+
+    def generate_normal_cell(self, parameters, index_row):
+        """
+        Returns a normally distributed value with the location and scale
+        in parameters for the class of the given row.
+        """
+        loc, scale = parameters[int(self.pull_cell(index_row, 'class'))]
+        return numpy.random.normal(loc=loc, scale=scale)
+
+    def generate_columns(self, row_indices):
+        """
+        Returns a dictionary with the values of every column for the given
+        rows; the vectorized counterpart of the functions in class_vars
+        and attributes_continuous. Every column uses two of the uniform
+        random numbers of a row.
+        """
+        names = list(self.class_values) + list(self.normal_parameters)
+        uniforms = self.uniforms(row_indices, 2 * len(names))
+        columns = {}
+        for (index_column, name) in enumerate(names):
+            uniform = uniforms[:, 2 * index_column:2 * index_column + 2]
+            if name in self.class_values:
+                columns[name] = numpy.floor(
+                    uniform[:, 0] * len(self.class_values[name]))
+            else:
+                loc, scale = numpy.array(self.normal_parameters[name]).T
+                classes = columns['class'].astype(int)
+                columns[name] = normal_from_uniform(
+                    uniform, loc=loc[classes], scale=scale[classes])
+        return columns
+
     def pull_region_of_interest(self, number_of_rows=5):
         """
         Pull more rows.
@@ -214,23 +338,28 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
            LazyWidget class with such functions?
         """
 
+        if self.data.region_of_interest is None:
+            # Every row is interesting, so the next rows that are not yet
+            # materialized can be materialized as one block.
+            row_indices = self.data.row_mapping.missing(
+                0, self.data.len_full_data(), number_of_rows)
+            self.data.materialize(row_indices)
+            self.send("Data", self.data)
+            return
+
         number_of_added_rows = 0
-        # Cannot use range(len()) because len will be numpy.inf, therefore
-        # use a while loop.
-        #for row_index in range(self.data.len_full_data()):
-        row_index = -1
-        while row_index < self.data.len_full_data()-1:
-            row_index += 1
-            if not row_index in self.data.row_mapping:
-                # self.data[row_index] cannot be used because we want to pass
-                # region_of_interest_only=True.
-                row = self.data.__getitem__(
-                    row_index, region_of_interest_only=True)
-                # Only count rows that are in the ROI.
-                if row.in_region_of_interest():
-                    number_of_added_rows += 1
-                    if number_of_added_rows >= number_of_rows:
-                        break
+        # The rows that are already materialized are skipped in chunks.
+        for row_index in self.data.row_mapping.iter_missing(
+                0, self.data.len_full_data()):
+            # self.data[row_index] cannot be used because we want to pass
+            # region_of_interest_only=True.
+            row = self.data.__getitem__(
+                row_index, region_of_interest_only=True)
+            # Only count rows that are in the ROI.
+            if row.in_region_of_interest():
+                number_of_added_rows += 1
+                if number_of_added_rows >= number_of_rows:
+                    break
 
         self.send("Data", self.data)
 
@@ -241,6 +370,24 @@ class OWInfiniTable(Orange.widgets.widget.OWWidget):
         """
         self.region_of_interest = region_of_interest
 
+    def store_prefetched(self):
+        """
+        Store the rows that are prefetched by the data and send the data
+        if there are new rows. While rows keep coming, the data is only
+        sent again when the new rows are at least as many as the rows that
+        were stored before, so widgets further in the scheme do not redo
+        their work every second.
+        """
+        if self.data is None:
+            return
+        n_stored = self.data.store_prefetched()
+        self.n_rows_unsent += n_stored
+        if self.n_rows_unsent and \
+                (not n_stored or self.n_rows_unsent >= self.n_rows_sent):
+            self.n_rows_sent += self.n_rows_unsent
+            self.n_rows_unsent = 0
+            self.send("Data", self.data)
+
     # TODO: Figure out how to properly stop the data pulling.
     #   closeEvent is also triggered when the info window is closed.
     def closeEvent(self, ev):
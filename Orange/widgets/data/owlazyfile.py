@@ -2,11 +2,13 @@
 The LazyFile widget is a lazy version of the original File widget.
 """
 
-from Orange.data.lazytable import LazyTable
+from Orange.data.lazytable import LazyTable, LazyDataSource
 
 import os, sys
+import time
 
 from PyQt4 import QtGui
+from PyQt4.QtCore import QTimer
 from Orange.widgets import widget, gui
 from Orange.widgets.settings import Setting
 
@@ -20,7 +22,7 @@ from Orange.widgets.widget import OutputSignal
 import Orange.widgets.data.owfile
 
 #class OWFile(widget.OWWidget):
-class OWLazyFile(Orange.widgets.data.owfile.OWFile):
+class OWLazyFile(Orange.widgets.data.owfile.OWFile, LazyDataSource):
 #class OWLazyFile(widget.OWWidget):
     """
     The OWLazyFile widget sends a LazyTable as output. This lazy table
@@ -61,6 +63,19 @@ class OWLazyFile(Orange.widgets.data.owfile.OWFile):
     
     loaded_file = None
 
+    # The LazyTable that is sent.
+    data = None
+
+    # The FixedWidthMemmapReader of the loaded_file, which gives random
+    # access to the rows without reading the file into memory. Use
+    # current_reader(), which replaces it when the file changes.
+    reader = None
+
+    # current_reader() checks whether the file has changed at most once
+    # every reader_check_interval seconds, since the check stats the file.
+    reader_check_interval = 1.0
+    reader_checked = 0.0
+
     # region_of_interest specifies what part of the dataset is interesting
     # according to widgets further in the scheme. See in_region_of_interest()
     # of LazyRowInstance for information about its structure.
@@ -72,19 +87,40 @@ class OWLazyFile(Orange.widgets.data.owfile.OWFile):
 
         super().__init__()
 
+        # Rows are prefetched in the background, store them regularly and
+        # send them in growing batches. n_rows_sent counts the prefetched
+        # rows that were sent, n_rows_unsent those stored since.
+        self.n_rows_sent = self.n_rows_unsent = 0
+        self.timer_prefetched = QTimer(self, interval=1000, timeout=self.store_prefetched)
+        self.timer_prefetched.start()
+
+
+    def current_reader(self):
+        """
+        Returns the reader of the loaded file, after creating a new one if
+        the file has been changed since the reader was created. Changes
+        are noticed within reader_check_interval seconds.
+        """
+        reader = self.reader
+        now = time.monotonic()
+        if now - self.reader_checked >= self.reader_check_interval:
+            self.reader_checked = now
+            if not reader.is_current():
+                reader = self.reader = io.FixedWidthMemmapReader(self.loaded_file)
+        return reader
 
     def pull_header(self):
         """
         Returns the domain of the output data.
         """
-        domain = io.FixedWidthFormat().read_header(self.loaded_file)
+        domain = self.current_reader().domain
         return domain
     
     def pull_length(self):
         """
         Returns the length of the output data.
         """
-        length = io.FixedWidthFormat().count_lines(self.loaded_file)
+        length = len(self.current_reader())
         return length
     
     #def pull_row(self, index_row):
@@ -97,31 +133,50 @@ class OWLazyFile(Orange.widgets.data.owfile.OWFile):
         """
         if not isinstance(name_attribute, str):
             name_attribute = name_attribute.name
-        cell = io.FixedWidthFormat().read_cell(
-            self.loaded_file,
-            index_row,
-            name_attribute
-        )
+        reader = self.current_reader()
+        cell = reader.read_column(name_attribute, [index_row])[0]
         return cell
 
+    def pull_rows(self, row_indices, variables):
+        """
+        Returns the values of the given variables for the given rows,
+        as an array with one row per row index.
+        """
+        names_attributes = [
+            variable if isinstance(variable, str) else variable.name
+            for variable in variables
+        ]
+        rows = self.current_reader().read_rows(row_indices, names_attributes)
+        return rows
+
     def pull_region_of_interest(self, number_of_rows=5):
         """
         Pull more rows.
         """
 
+        if self.data.region_of_interest is None:
+            # Every row is interesting, so the next rows that are not yet
+            # materialized can be materialized as one block.
+            row_indices = self.data.row_mapping.missing(
+                0, self.data.len_full_data(), number_of_rows)
+            self.data.materialize(row_indices)
+            self.send("Data", self.data)
+            return
+
         number_of_added_rows = 0
-        for row_index in range(self.data.len_full_data()):
-            if not row_index in self.data.row_mapping:
-                # self.data[row_index] cannot be used because we want to pass
-                # region_of_interest_only=True.
-                row = self.data.__getitem__(
-                    row_index, region_of_interest_only=True)
-                # Only count rows that are in the ROI.
-                #if row.row_index_materialized is not None:
-                if row.in_region_of_interest():
-                    number_of_added_rows += 1
-                    if number_of_added_rows >= number_of_rows:
-                        break
+        # The rows that are already materialized are skipped in chunks.
+        for row_index in self.data.row_mapping.iter_missing(
+                0, self.data.len_full_data()):
+            # self.data[row_index] cannot be used because we want to pass
+            # region_of_interest_only=True.
+            row = self.data.__getitem__(
+                row_index, region_of_interest_only=True)
+            # Only count rows that are in the ROI.
+            #if row.row_index_materialized is not None:
+            if row.in_region_of_interest():
+                number_of_added_rows += 1
+                if number_of_added_rows >= number_of_rows:
+                    break
 
         self.send("Data", self.data)
 
@@ -153,6 +208,8 @@ class OWLazyFile(Orange.widgets.data.owfile.OWFile):
             return
 
         self.loaded_file = fn
+        self.reader = io.FixedWidthMemmapReader(fn)
+        self.reader_checked = time.monotonic()
 
         domain = self.pull_header()
         
@@ -194,13 +251,35 @@ class OWLazyFile(Orange.widgets.data.owfile.OWFile):
         # What does this do?
         #self.dataReport = self.prepareDataReport(data)
 
+        # Stop the pulling of the previous data, if any.
+        if self.data is not None:
+            self.data.stop_pulling = True
         self.data = data
+        self.n_rows_sent = self.n_rows_unsent = 0
         # Ensure that some data is always available.
         if preload_data:
             self.pull_region_of_interest()
         else:
             self.send("Data", self.data)
 
+    def store_prefetched(self):
+        """
+        Store the rows that are prefetched by the data and send the data
+        if there are new rows. While rows keep coming, the data is only
+        sent again when the new rows are at least as many as the rows that
+        were stored before, so widgets further in the scheme do not redo
+        their work every second.
+        """
+        if self.data is None:
+            return
+        n_stored = self.data.store_prefetched()
+        self.n_rows_unsent += n_stored
+        if self.n_rows_unsent and \
+                (not n_stored or self.n_rows_unsent >= self.n_rows_sent):
+            self.n_rows_sent += self.n_rows_unsent
+            self.n_rows_unsent = 0
+            self.send("Data", self.data)
+
     # TODO: Figure out how to properly stop the data pulling.
     #   closeEvent is also triggered when the info window is closed.
     def closeEvent(self, ev):
@@ -299,6 +299,8 @@ class _ImputeRandom:
 
 
 class _RemoveNaNRows(preprocess.preprocess.Preprocess):
+    deterministic = True
+
     def __call__(self, data):
         mask = numpy.isnan(data.X)
         mask = numpy.any(mask, axis=1)
@@ -561,6 +563,8 @@ class _Scaling(preprocess.preprocess.Preprocess):
     """
     Scale data preprocessor.
     """
+    deterministic = True
+
     @staticmethod
     def mean(dist):
         values, counts = numpy.array(dist)
@@ -690,6 +694,7 @@ class _Randomize(preprocess.preprocess.Preprocess):
     """
     Randomize data preprocessor.
     """
+    deterministic = False
 
     def __init__(self, rand_type=Random.RandomizeClasses):
         self.rand_type = rand_type
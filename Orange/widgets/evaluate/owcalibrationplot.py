@@ -10,6 +10,7 @@ from PyQt4 import QtGui
 import pyqtgraph as pg
 
 import Orange
+from Orange.evaluation.curves import calibration_bins
 from Orange.widgets import widget, gui, settings
 from Orange.widgets.utils import colorpalette, colorbrewer
 from Orange.widgets.io import FileFormats
@@ -41,6 +42,9 @@ class OWCalibrationPlot(widget.OWWidget):
 
     want_graph = True
 
+    #: The number of bins of probabilities that are smoothed into curves
+    n_bins = 1000
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -48,6 +52,7 @@ class OWCalibrationPlot(widget.OWWidget):
         self.classifier_names = []
         self.colors = []
         self._curve_data = {}
+        self._bins = {}
 
         box = gui.widgetBox(self.controlArea, "Plot")
         tbox = gui.widgetBox(box, "Target Class")
@@ -98,6 +103,7 @@ class OWCalibrationPlot(widget.OWWidget):
         self.target_index = 0
         self.colors = []
         self._curve_data = {}
+        self._bins = {}
 
     def _initialize(self, results):
         N = len(results.predicted)
@@ -120,15 +126,23 @@ class OWCalibrationPlot(widget.OWWidget):
         if (clf_idx, target) in self._curve_data:
             return self._curve_data[clf_idx, target]
 
+        if target not in self._bins:
+            # probabilities of all classifiers are binned at once
+            self._bins[target] = calibration_bins(
+                self.results.actual == target,
+                self.results.probabilities[:, :, target], self.n_bins)
+        counts, positives, sums = (bins[clf_idx]
+                                   for bins in self._bins[target])
+        nonempty = counts > 0
+        counts, positives, sums = \
+            counts[nonempty], positives[nonempty], sums[nonempty]
+
         ytrue = self.results.actual == target
         probs = self.results.probabilities[clf_idx, :, target]
-        sortind = numpy.argsort(probs)
-        probs = probs[sortind]
-        ytrue = ytrue[sortind]
-#         x = numpy.unique(probs)
         xmin, xmax = probs.min(), probs.max()
         x = numpy.linspace(xmin, xmax, 100)
-        f = gaussian_smoother(probs, ytrue, sigma=0.15 * (xmax - xmin))
+        f = gaussian_smoother(sums / counts, positives / counts,
+                              sigma=0.15 * (xmax - xmin), weights=counts)
         observed = f(x)
         curve = Curve(x, observed)
         curve_item = pg.PlotDataItem(
@@ -191,7 +205,7 @@ class OWCalibrationPlot(widget.OWWidget):
 import numpy
 
 
-def gaussian_smoother(x, y, sigma=1.0):
+def gaussian_smoother(x, y, sigma=1.0, weights=None):
     x = numpy.asarray(x)
     y = numpy.asarray(y)
 
@@ -202,10 +216,12 @@ def gaussian_smoother(x, y, sigma=1.0):
         raise ValueError
 
     def smoother(xs):
-        W = a * numpy.exp(-gamma * ((xs - x) ** 2))
-        return numpy.average(y, weights=W)
+        W = a * numpy.exp(-gamma * (numpy.subtract.outer(xs, x) ** 2))
+        if weights is not None:
+            W *= weights
+        return W.dot(y) / W.sum(axis=-1)
 
-    return numpy.frompyfunc(smoother, 1, 1)
+    return smoother
 
 
 def main():
@@ -5,9 +5,6 @@ Lift Curve Widget
 """
 from collections import namedtuple
 
-import numpy
-import sklearn.metrics as skl_metrics
-
 from PyQt4 import QtGui
 from PyQt4.QtGui import QColor, QPen
 from PyQt4.QtCore import Qt
@@ -15,6 +12,7 @@ from PyQt4.QtCore import Qt
 import pyqtgraph as pg
 
 import Orange
+from Orange.evaluation.curves import lift_curves
 from Orange.widgets import widget, gui, settings
 from Orange.widgets.utils import colorpalette, colorbrewer
 from Orange.widgets.evaluate.owrocanalysis import convex_hull
@@ -42,6 +40,20 @@ def LiftCurve_from_results(results, clf_index, target):
     return LiftCurve(points, hull)
 
 
+def LiftCurves_for_target(results, target):
+    """
+    Return a list of `LiftCurve`s of all learners in `results`, computed
+    together (the scores of each learner are sorted only once).
+    """
+    scores = results.probabilities[:, :, target]
+    curves = []
+    for (x, y, thresholds), in lift_curves(results.actual == target, scores):
+        points = CurvePoints(x, y, thresholds)
+        hull = CurvePoints(*convex_hull([(x, y, thresholds)]))
+        curves.append(LiftCurve(points, hull))
+    return curves
+
+
 PlotCurve = namedtuple(
     "PlotCurve",
     ["curve",
@@ -77,6 +89,7 @@ class OWLiftCurve(widget.OWWidget):
         self.classifier_names = []
         self.colors = []
         self._curve_data = {}
+        self._lift_curves = {}
 
         box = gui.widgetBox(self.controlArea, "Plot")
         tbox = gui.widgetBox(box, "Target Class")
@@ -152,6 +165,7 @@ class OWLiftCurve(widget.OWWidget):
         self.classifier_names = []
         self.colors = []
         self._curve_data = {}
+        self._lift_curves = {}
 
     def _initialize(self, results):
         N = len(results.predicted)
@@ -173,7 +187,11 @@ class OWLiftCurve(widget.OWWidget):
 
     def plot_curves(self, target, clf_idx):
         if (target, clf_idx) not in self._curve_data:
-            curve = LiftCurve_from_results(self.results, clf_idx, target)
+            if target not in self._lift_curves:
+                # curves of all classifiers are computed at once
+                self._lift_curves[target] = \
+                    LiftCurves_for_target(self.results, target)
+            curve = self._lift_curves[target][clf_idx]
             color = self.colors[clf_idx]
             pen = QPen(color, 1)
             pen.setCosmetic(True)
@@ -229,7 +247,7 @@ class OWLiftCurve(widget.OWWidget):
         save_img.exec_()
 
 
-def lift_curve_from_results(results, target, clf_idx, subset=slice(0, -1)):
+def lift_curve_from_results(results, target, clf_idx, subset=slice(None)):
     actual = results.actual[subset]
     scores = results.probabilities[clf_idx][subset][:, target]
     yrate, tpr, thresholds = lift_curve(actual, scores, target)
@@ -237,11 +255,8 @@ def lift_curve_from_results(results, target, clf_idx, subset=slice(0, -1)):
 
 
 def lift_curve(ytrue, ypred, target=1):
-    P = numpy.sum(ytrue == target)
-    N = ytrue.size - P
-    fpr, tpr, thresholds = skl_metrics.roc_curve(ytrue, ypred, target)
-    rpp = fpr * (N / (P + N)) + tpr * (P / (P + N))
-    return rpp, tpr, thresholds
+    (curve, ), = lift_curves(ytrue == target, ypred)
+    return curve
 
 
 def main():
@@ -3,18 +3,17 @@ ROC Analysis Widget
 -------------------
 
 """
-import operator
-from functools import reduce, wraps
+from functools import wraps
 from collections import namedtuple, deque
 
 import numpy
-import sklearn.metrics as skl_metrics
 from PyQt4 import QtGui
 from PyQt4.QtGui import QColor, QPen, QBrush
 from PyQt4.QtCore import Qt
 import pyqtgraph as pg
 
 import Orange
+from Orange.evaluation.curves import roc_curves
 from Orange.widgets import widget, gui, settings
 from Orange.widgets.utils import colorpalette, colorbrewer
 from Orange.widgets.io import FileFormats
@@ -84,15 +83,48 @@ def ROCData_from_results(results, clf_index, target):
     :rval ROCData:
         A instance holding the computed curves.
     """
-    merged = roc_curve_for_fold(results, slice(0, -1), clf_index, target)
+    return ROCData_for_target(results, target, [clf_index])[0]
+
+
+def ROCData_for_target(results, target, clf_indices=None):
+    """
+    Compute ROC Curve(s) of several learners from evaluation results.
+
+    The curves of all learners (and folds) are computed together, with
+    the scores of each learner sorted only once.
+
+    :param Orange.evaluation.Results results:
+        Evaluation results.
+    :param int target:
+        Target class index (i.e. positive class).
+    :param list clf_indices:
+        Learner indices in the `results` (all learners by default).
+    :rval list of ROCData:
+        Instances holding the computed curves, one for each learner.
+    """
+    if clf_indices is None:
+        clf_indices = range(len(results.predicted))
+    positive = results.actual == target
+    scores = results.probabilities[list(clf_indices), :, target]
+    merged = roc_curves(positive, scores)
+    if results.folds is not None:
+        folds = roc_curves(positive, scores, results.folds)
+    else:
+        folds = merged
+    return [ROCData_from_curves(clf_merged, clf_folds)
+            for (clf_merged, ), clf_folds in zip(merged, folds)]
+
+
+def ROCData_from_curves(merged, folds):
+    """
+    Construct `ROCData` from the merged curve and the curves of folds,
+    given as tuples of (fpr, tpr, thresholds) arrays.
+    """
     merged_curve = ROCCurve(ROCPoints(*merged),
                             ROCPoints(*roc_curve_convex_hull(merged)))
 
-    folds = results.folds if results.folds is not None else [slice(0, -1)]
     fold_curves = []
-    for fold in folds:
-        # TODO: Check for no FP or no TP
-        points = roc_curve_for_fold(results, fold, clf_index, target)
+    for points in folds:
         hull = roc_curve_convex_hull(points)
         c = ROCCurve(ROCPoints(*points), ROCPoints(*hull))
         fold_curves.append(c)
@@ -129,6 +161,7 @@ def ROCData_from_results(results, clf_index, target):
     return ROCData(merged_curve, fold_curves, v_avg, t_avg)
 
 ROCData.from_results = staticmethod(ROCData_from_results)
+ROCData.for_target = staticmethod(ROCData_for_target)
 
 #: A curve item to be displayed in a plot
 PlotCurve = namedtuple(
@@ -450,8 +483,10 @@ class OWROCAnalysis(widget.OWWidget):
     def curve_data(self, target, clf_idx):
         """Return `ROCData' for the given target and classifier."""
         if (target, clf_idx) not in self._curve_data:
-            data = ROCData.from_results(self.results, clf_idx, target)
-            self._curve_data[target, clf_idx] = data
+            # curves of all classifiers are computed at once
+            data = ROCData.for_target(self.results, target)
+            for i, clf_data in enumerate(data):
+                self._curve_data[target, i] = clf_data
 
         return self._curve_data[target, clf_idx]
 
@@ -658,17 +693,10 @@ def interp(x, xp, fp, left=None, right=None):
 
 def roc_curve_for_fold(res, fold, clf_idx, target):
     fold_actual = res.actual[fold]
-    P = numpy.sum(fold_actual == target)
-    N = fold_actual.size - P
-
-    if P == 0 or N == 0:
-        # Undefined TP and FP rate
-        return numpy.array([]), numpy.array([]), numpy.array([])
-
     fold_probs = res.probabilities[clf_idx][fold][:, target]
-    return skl_metrics.roc_curve(
-        fold_actual, fold_probs, pos_label=target
-    )
+    # Empty for undefined TP and FP rate
+    (curve, ), = roc_curves(fold_actual == target, fold_probs)
+    return curve
 
 
 def roc_curve_vertical_average(curves, samples=10):
@@ -725,11 +753,13 @@ def roc_curve_convex_hull(curve):
         else:
             return numpy.inf
 
-    fpr, _, _ = curve
+    fpr, tpr, _ = curve
 
     if len(fpr) <= 2:
         return curve
-    points = map(roc_point._make, zip(*curve))
+    keep = hull_candidates(fpr, tpr)
+    points = map(roc_point._make,
+                 zip(*(numpy.asarray(values)[keep] for values in curve)))
 
     hull = deque([next(points)])
 
@@ -762,18 +792,17 @@ def convex_hull(curves):
         else:
             return numpy.inf
 
-    curves = [list(map(roc_point._make, zip(*curve))) for curve in curves]
-
-    merged_points = reduce(operator.iadd, curves, [])
-    merged_points = sorted(merged_points)
-
-    if len(merged_points) == 0:
-        return ROCPoints(numpy.array([]), numpy.array([]), numpy.array([]))
+    fpr, tpr, thresh = (numpy.hstack([numpy.asarray(curve[i], dtype=float)
+                                      for curve in curves] or [[]])
+                        for i in range(3))
+    order = numpy.lexsort((thresh, tpr, fpr))
+    fpr, tpr, thresh = fpr[order], tpr[order], thresh[order]
 
-    if len(merged_points) <= 2:
-        return ROCPoints._make(map(numpy.array, zip(*merged_points)))
+    if len(fpr) <= 2:
+        return ROCPoints(fpr, tpr, thresh)
 
-    points = iter(merged_points)
+    keep = hull_candidates(fpr, tpr)
+    points = map(roc_point._make, zip(fpr[keep], tpr[keep], thresh[keep]))
 
     hull = deque([next(points)])
 
@@ -794,6 +823,28 @@ def convex_hull(curves):
     return ROCPoints._make(map(numpy.array, zip(*hull)))
 
 
+def hull_candidates(fpr, tpr, max_passes=20):
+    """
+    Return the indices of points of a curve (ordered by `fpr`) that can lie
+    on its convex hull.
+
+    Points that lie strictly below the line through their neighbours are
+    removed with array operations, repeatedly (at most `max_passes` times);
+    the remaining points are then few enough to find the hull in a loop.
+    """
+    fpr, tpr = numpy.asarray(fpr), numpy.asarray(tpr)
+    keep = numpy.arange(len(fpr))
+    for _ in range(max_passes):
+        if len(keep) <= 2:
+            break
+        dx, dy = numpy.diff(fpr[keep]), numpy.diff(tpr[keep])
+        below = dx[:-1] * dy[1:] - dy[:-1] * dx[1:] > 0
+        if not below.any():
+            break
+        keep = keep[~numpy.r_[False, below, False]]
+    return keep
+
+
 def roc_iso_performance_line(slope, hull, tol=1e-5):
     """
     Return the indices where a line with `slope` touches the ROC convex hull.
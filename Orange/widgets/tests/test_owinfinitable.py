@@ -2,6 +2,9 @@ import unittest
 from unittest import TestCase
 from PyQt4.QtGui import QApplication
 
+import numpy as np
+
+from Orange.data.filter import FilterContinuous, Values
 from Orange.widgets.data.owinfinitable import OWInfiniTable
 
 class OWInfiniTableCase(TestCase):
@@ -28,6 +31,83 @@ class OWInfiniTableCase(TestCase):
 
         print(widget1.data.X)
 
+    def test_materialize(self):
+        widget = OWInfiniTable()
+        data = widget.data
+        data.stop_pulling = True
+        length_before = data.len_instantiated_data()
+
+        rows_materialized = data.materialize([1000, 1001, 1002])
+        self.assertEqual(data.len_instantiated_data(), length_before + 3)
+        for row_index, row_materialized in zip([1000, 1001, 1002],
+                                               rows_materialized):
+            self.assertEqual(data.row_mapping[row_index], row_materialized)
+            for key_id, variable in enumerate(data.domain.attributes):
+                self.assertEqual(data.X[row_materialized, key_id],
+                                 widget.pull_cell(row_index, variable))
+            self.assertEqual(data._Y[row_materialized, 0],
+                             widget.pull_cell(row_index, 'class'))
+
+        # Materialized rows are not materialized again.
+        data.materialize([1001, 1003, 1003])
+        self.assertEqual(data.len_instantiated_data(), length_before + 4)
+
+    def test_memory_budget(self):
+        widget = OWInfiniTable()
+        data = widget.data
+        data.stop_pulling = True
+        data.memory_budget = 50 * data._bytes_per_row()
+        self.assertEqual(data.max_rows_materialized(), 50)
+
+        data.materialize(range(2000, 2040))
+        for row_index in range(3000, 3100):
+            value = data[row_index][0]
+            self.assertLessEqual(data.len_instantiated_data(), 50)
+            # The accessed row is never evicted.
+            row_materialized = data.row_mapping[row_index]
+            self.assertEqual(data.X[row_materialized, 0], value)
+        # The least recently used rows have been evicted first.
+        self.assertNotIn(2000, data.row_mapping)
+        self.assertIn(3099, data.row_mapping)
+
+        # Evicted rows are pulled again when needed.
+        self.assertEqual(data[2000][0], widget.pull_cell(2000, data.domain[0]))
+
+    def test_filtered_rows(self):
+        widget = OWInfiniTable()
+        data = widget.data
+        data.stop_pulling = True
+        data.memory_budget = None
+        column = data.domain.attributes[0]
+        filter_ = Values([FilterContinuous(column, FilterContinuous.Greater,
+                                           ref=0)])
+        filtered = filter_(data)
+
+        rows_passing = [row_index for row_index in range(3000)
+                        if data[row_index][column] > 0]
+        for row_index, row_index_origin in enumerate(rows_passing[:50]):
+            self.assertEqual(filtered[row_index][column],
+                             data[row_index_origin][column])
+        # Every row of table_origin is scanned only once, in batches.
+        scanned = filtered.passing_rows_scanned
+        self.assertEqual(filtered.row_index_origin(10), rows_passing[10])
+        self.assertEqual(filtered.passing_rows_scanned, scanned)
+
+    def test_counter_based(self):
+        widget = OWInfiniTable()
+        widget.data.stop_pulling = True
+        if not widget.counter_based:
+            self.skipTest("Philox is not available")
+        variables = list(widget.data.domain)
+        block = widget.pull_rows(range(5000, 5100), variables)
+        # Every row is the same when generated on its own or in a block.
+        for offset in (0, 1, 50, 99):
+            np.testing.assert_array_equal(
+                widget.pull_rows([5000 + offset], variables)[0], block[offset])
+        self.assertEqual(widget.pull_cell(5001, variables[0]), block[1, 0])
+        mixed = widget.pull_rows([5099, 7, 5000, 5001], variables)
+        np.testing.assert_array_equal(mixed[[0, 2, 3]], block[[99, 0, 1]])
+
 
 if __name__ == '__main__':
     #unittest.main()